@@ -2,8 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas.abonnement import AbonnementCreate, AbonnementOut, AbonnementUpdate
-from app.services.abonnement_service import create_abonnement, get_abonnement, list_abonnements, update_abonnement, delete_abonnement
+from app.schemas.abonnement import AbonnementCreate, AbonnementOut, AbonnementStatus, AbonnementUpdate
+from app.services.abonnement_service import create_abonnement, get_abonnement, list_abonnements, update_abonnement, delete_abonnement, with_merkez_names, has_active_abonnement
 
 router = APIRouter(prefix="/abonnements", tags=["Abonnement"])
 
@@ -13,14 +13,18 @@ def create(payload: AbonnementCreate, db: Session = Depends(get_db)):
 
 @router.get("", response_model=list[AbonnementOut])
 def list_all(merkez_id: int | None = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return list_abonnements(db, merkez_id=merkez_id, skip=skip, limit=limit)
+    return with_merkez_names(db, list_abonnements(db, merkez_id=merkez_id, skip=skip, limit=limit))
+
+@router.get("/status/{merkez_id}", response_model=AbonnementStatus)
+def status(merkez_id: int, db: Session = Depends(get_db)):
+    return AbonnementStatus(merkez_id=merkez_id, active=has_active_abonnement(db, merkez_id))
 
 @router.get("/{abonnement_id}", response_model=AbonnementOut)
 def get_one(abonnement_id: int, db: Session = Depends(get_db)):
     a = get_abonnement(db, abonnement_id)
     if not a:
         raise HTTPException(status_code=404, detail="Abonnement not found")
-    return a
+    return with_merkez_names(db, [a])[0]
 
 @router.patch("/{abonnement_id}", response_model=AbonnementOut)
 def patch(abonnement_id: int, payload: AbonnementUpdate, db: Session = Depends(get_db)):
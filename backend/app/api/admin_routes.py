@@ -0,0 +1,46 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.deps import get_current_admin
+from app.core.sampler import ProfilerBusy, collapsed, sampler, speedscope
+from app.schemas.profiler import ProfilerStart
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(get_current_admin)])
+
+@router.post("/profiler/start")
+def start_profiler(payload: ProfilerStart, request: Request):
+    if payload.requests and not payload.route:
+        raise HTTPException(status_code=400, detail="A request count needs a route")
+    try:
+        profile = sampler.start(request.app, payload.seconds, payload.requests, payload.route, payload.interval_ms)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return profile.snapshot()
+
+@router.post("/profiler/stop")
+def stop_profiler():
+    profile = sampler.stop()
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile")
+    return profile.snapshot()
+
+@router.get("/profiler")
+def profiler_status():
+    profile = sampler.profile
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile")
+    return profile.snapshot()
+
+@router.get("/profiler/result")
+def profiler_result(format: Literal["collapsed", "speedscope"] = "collapsed"):
+    # the stacks so far while still running
+    profile = sampler.profile
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile")
+    if format == "speedscope":
+        return speedscope(profile)
+    return PlainTextResponse(collapsed(profile))
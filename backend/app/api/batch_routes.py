@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import get_db
+from app.schemas.batch import BatchIn, BatchOut
+from app.services.batch_service import BatchError, run_batch
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+@router.post("", response_model=BatchOut)
+def run(payload: BatchIn, db: Session = Depends(get_db)):
+    if len(payload.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_OPERATIONS} operations per batch")
+    try:
+        return {"results": run_batch(db, payload.operations)}
+    except BatchError as exc:
+        raise HTTPException(status_code=exc.status_code, detail={"index": exc.index, "detail": exc.detail})
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas.eleve import EleveCreate, EleveOut, EleveUpdate
-from app.services.eleve_service import create_eleve, get_eleve, list_eleves, update_eleve, delete_eleve
+from app.services.eleve_service import create_eleve, get_eleve, list_eleves, search_eleves, update_eleve, delete_eleve
 
 router = APIRouter(prefix="/eleves", tags=["Eleves"])
 
@@ -12,8 +12,20 @@ def create(payload: EleveCreate, db: Session = Depends(get_db)):
     return create_eleve(db, data=payload.model_dump())
 
 @router.get("", response_model=list[EleveOut])
-def list_all(merkez_id: int | None = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return list_eleves(db, merkez_id=merkez_id, skip=skip, limit=limit)
+def list_all(
+    merkez_id: int | None = None,
+    q: str | None = Query(None, min_length=2, max_length=200),  # prefix of prenom, nom or email
+    niveau: str | None = None,
+    statut: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    if q:
+        if merkez_id is None:
+            raise HTTPException(status_code=400, detail="Search needs a merkez_id")
+        return search_eleves(db, merkez_id, q, niveau=niveau, statut=statut, skip=skip, limit=limit)
+    return list_eleves(db, merkez_id=merkez_id, niveau=niveau, statut=statut, skip=skip, limit=limit)
 
 @router.get("/{eleve_id}", response_model=EleveOut)
 def get_one(eleve_id: int, db: Session = Depends(get_db)):
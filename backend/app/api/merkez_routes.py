@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.schemas.dashboard import DashboardOut
 from app.schemas.merkez import MerkezCreate, MerkezOut, MerkezUpdate
+from app.services.dashboard_service import ITEM_SCHEMAS, SECTIONS, get_dashboard
 from app.services.merkez_service import create_merkez, get_merkez, list_merkez, update_merkez, delete_merkez
 
 router = APIRouter(prefix="/merkez", tags=["Merkez"])
@@ -22,6 +24,36 @@ def get_one(merkez_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Merkez not found")
     return m
 
+def _csv(value: str | None) -> list[str] | None:
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+@router.get("/{merkez_id}/dashboard", response_model=DashboardOut, response_model_exclude_none=True)
+def dashboard(
+    merkez_id: int,
+    sections: str = ",".join(SECTIONS),
+    plannings_limit: int = Query(20, ge=1, le=200),
+    messages_limit: int = Query(20, ge=1, le=200),
+    abonnements_limit: int = Query(10, ge=1, le=100),
+    plannings_fields: str | None = None,
+    messages_fields: str | None = None,
+    abonnements_fields: str | None = None,
+    db: Session = Depends(get_db),
+):
+    limits = {"stats": 0, "plannings": plannings_limit, "messages": messages_limit, "abonnements": abonnements_limit}
+    fields = {"plannings": _csv(plannings_fields), "messages": _csv(messages_fields), "abonnements": _csv(abonnements_fields)}
+    wanted = {}
+    for name in _csv(sections) or []:
+        if name not in SECTIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown section {name!r}")
+        unknown = set(fields.get(name) or ()) - set(ITEM_SCHEMAS[name].model_fields) if name in ITEM_SCHEMAS else set()
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown {name} fields: {', '.join(sorted(unknown))}")
+        wanted[name] = (limits[name], fields.get(name))
+    snapshot = get_dashboard(db, merkez_id, wanted)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Merkez not found")
+    return snapshot
+
 @router.patch("/{merkez_id}", response_model=MerkezOut)
 def patch(merkez_id: int, payload: MerkezUpdate, db: Session = Depends(get_db)):
     m = get_merkez(db, merkez_id)
@@ -35,5 +67,5 @@ def remove(merkez_id: int, db: Session = Depends(get_db)):
     m = get_merkez(db, merkez_id)
     if not m:
         raise HTTPException(status_code=404, detail="Merkez not found")
-    delete_merkez(db, m)
-    return {"ok": True}
+    # deferred: hidden now, its rows are purged in the background
+    return {"ok": True, "deferred": delete_merkez(db, m)}
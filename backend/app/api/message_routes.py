@@ -11,28 +11,29 @@ from app.services.messages_service import (
     update_message,
     delete_message,
     mark_as_read,
+    with_merkez_names,
 )
 
 router = APIRouter(prefix="/messages", tags=["Messagerie"])
 
 @router.post("", response_model=MessageOut)
 def create(payload: MessageCreate, db: Session = Depends(get_db)):
-    return create_message(db, data=payload.model_dump())
+    return with_merkez_names(db, [create_message(db, data=payload.model_dump())])[0]
 
 @router.get("", response_model=list[MessageOut])
 def list_for_merkez(merkez_id: int, skip: int = 0, limit: int = 200, db: Session = Depends(get_db)):
-    return list_messages_for_merkez(db, merkez_id=merkez_id, skip=skip, limit=limit)
+    return with_merkez_names(db, list_messages_for_merkez(db, merkez_id=merkez_id, skip=skip, limit=limit))
 
 @router.get("/conversation", response_model=list[MessageOut])
 def conversation(merkez_a: int, merkez_b: int, skip: int = 0, limit: int = 200, db: Session = Depends(get_db)):
-    return list_conversation(db, merkez_a=merkez_a, merkez_b=merkez_b, skip=skip, limit=limit)
+    return with_merkez_names(db, list_conversation(db, merkez_a=merkez_a, merkez_b=merkez_b, skip=skip, limit=limit))
 
 @router.get("/{message_id}", response_model=MessageOut)
 def get_one(message_id: int, db: Session = Depends(get_db)):
     m = get_message(db, message_id)
     if not m:
         raise HTTPException(status_code=404, detail="Message not found")
-    return m
+    return with_merkez_names(db, [m])[0]
 
 @router.patch("/{message_id}", response_model=MessageOut)
 def patch(message_id: int, payload: MessageUpdate, db: Session = Depends(get_db)):
@@ -40,14 +41,14 @@ def patch(message_id: int, payload: MessageUpdate, db: Session = Depends(get_db)
     if not m:
         raise HTTPException(status_code=404, detail="Message not found")
     data = {k: v for k, v in payload.model_dump().items() if v is not None}
-    return update_message(db, m, data=data)
+    return with_merkez_names(db, [update_message(db, m, data=data)])[0]
 
 @router.patch("/{message_id}/read", response_model=MessageOut)
 def set_read(message_id: int, db: Session = Depends(get_db)):
     m = get_message(db, message_id)
     if not m:
         raise HTTPException(status_code=404, detail="Message not found")
-    return mark_as_read(db, m)
+    return with_merkez_names(db, [mark_as_read(db, m)])[0]
 
 @router.delete("/{message_id}")
 def remove(message_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core import admission
+from app.core.cache import cache
+from app.core.group_commit import group_commit
+from app.core.singleflight import singleflight
+from app.core.statements import compiled_cache_stats
+from app.database import get_db
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/admission")
+def admission_metrics():
+    return {"enabled": bool(admission.groups), "groups": admission.snapshot()}
+
+@router.get("/singleflight")
+def singleflight_metrics():
+    return singleflight.snapshot()
+
+@router.get("/group-commit")
+def group_commit_metrics():
+    return group_commit.snapshot()
+
+@router.get("/cache")
+def cache_metrics():
+    return cache.snapshot()
+
+@router.get("/compiled-cache")
+def compiled_cache_metrics():
+    return compiled_cache_stats.snapshot()
+
+@router.get("/tasks")
+def task_metrics(db: Session = Depends(get_db)):
+    from app.core.tasks import pool
+
+    return pool.snapshot(db)
@@ -1,26 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.database import get_db
 from app.schemas.planning import PlanningCreate, PlanningOut, PlanningUpdate
-from app.services.planning_service import create_planning, get_planning, list_plannings, update_planning, delete_planning
+from app.services.feed_service import InvalidFeedToken, decode_feed_token, feed_token, feed_validators, http_date, not_modified, render_feed
+from app.services.planning_service import create_planning, get_planning, list_plannings, update_planning, delete_planning, with_eleve_names
 
 router = APIRouter(prefix="/plannings", tags=["Plannings"])
 
 @router.post("", response_model=PlanningOut)
 def create(payload: PlanningCreate, db: Session = Depends(get_db)):
-    return create_planning(db, data=payload.model_dump())
+    return with_eleve_names(db, [create_planning(db, data=payload.model_dump())])[0]
 
 @router.get("", response_model=list[PlanningOut])
-def list_all(merkez_id: int | None = None, eleve_id: int | None = None, skip: int = 0, limit: int = 200, db: Session = Depends(get_db)):
-    return list_plannings(db, merkez_id=merkez_id, eleve_id=eleve_id, skip=skip, limit=limit)
+def list_all(
+    merkez_id: int | None = None,
+    eleve_id: int | None = None,
+    start: datetime | None = None,  # plannings starting in [start, end)
+    end: datetime | None = None,
+    skip: int = 0,
+    limit: int = 200,
+    db: Session = Depends(get_db),
+):
+    plannings = list_plannings(db, merkez_id=merkez_id, eleve_id=eleve_id, start=start, end=end, skip=skip, limit=limit)
+    return with_eleve_names(db, plannings)
+
+@router.get("/feed")
+def feed_url(merkez_id: int, eleve_id: int | None = None, db: Session = Depends(get_db)):
+    # subscription URL of the merkez's (or one eleve's) calendar
+    if feed_validators(db, merkez_id, eleve_id) is None:
+        raise HTTPException(status_code=404, detail="Eleve not found" if eleve_id is not None else "Merkez not found")
+    return {"url": f"{settings.API_PREFIX}/plannings/feed/{feed_token(merkez_id, eleve_id)}.ics"}
+
+@router.get("/feed/{token}.ics")
+def feed(
+    token: str,
+    if_none_match: str | None = Header(None),
+    if_modified_since: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    try:
+        merkez_id, eleve_id = decode_feed_token(token)
+    except InvalidFeedToken:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    validators = feed_validators(db, merkez_id, eleve_id)
+    if validators is None:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    headers = {"ETag": validators["etag"], "Last-Modified": http_date(validators["last_modified"]), "Cache-Control": "private, no-cache"}
+    if not_modified(validators, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(
+        render_feed(merkez_id, eleve_id, validators["name"]), media_type="text/calendar; charset=utf-8", headers=headers
+    )
 
 @router.get("/{planning_id}", response_model=PlanningOut)
 def get_one(planning_id: int, db: Session = Depends(get_db)):
     p = get_planning(db, planning_id)
     if not p:
         raise HTTPException(status_code=404, detail="Planning not found")
-    return p
+    return with_eleve_names(db, [p])[0]
 
 @router.patch("/{planning_id}", response_model=PlanningOut)
 def patch(planning_id: int, payload: PlanningUpdate, db: Session = Depends(get_db)):
@@ -28,7 +70,7 @@ def patch(planning_id: int, payload: PlanningUpdate, db: Session = Depends(get_d
     if not p:
         raise HTTPException(status_code=404, detail="Planning not found")
     data = {k: v for k, v in payload.model_dump().items() if v is not None}
-    return update_planning(db, p, data=data)
+    return with_eleve_names(db, [update_planning(db, p, data=data)])[0]
 
 @router.delete("/{planning_id}")
 def remove(planning_id: int, db: Session = Depends(get_db)):
@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas.merkez import PublicMerkez
-from app.services.merkez_service import list_public_merkez_filtered, get_merkez
+from app.services.merkez_service import list_public_merkez_filtered, get_public_merkez
+from app.services.similarity_service import list_similar
 
 router = APIRouter(prefix="/public/merkez", tags=["Public Merkez"])
 
@@ -39,7 +40,13 @@ def list_public(
 
 @router.get("/{merkez_id}", response_model=PublicMerkez)
 def get_public_one(merkez_id: int, db: Session = Depends(get_db)):
-    m = get_merkez(db, merkez_id)
-    if not m or not m.is_approved:
+    m = get_public_merkez(db, merkez_id)
+    if not m:
         raise HTTPException(status_code=404, detail="Merkez not found")
     return m
+
+@router.get("/{merkez_id}/similar", response_model=list[PublicMerkez])
+def get_similar(merkez_id: int, db: Session = Depends(get_db)):
+    if not get_public_merkez(db, merkez_id):
+        raise HTTPException(status_code=404, detail="Merkez not found")
+    return list_similar(db, merkez_id)
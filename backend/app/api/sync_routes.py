@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.sync import SyncOut
+from app.services.messages_service import with_merkez_names
+from app.services.planning_service import with_eleve_names
+from app.services.sync_service import InvalidSyncToken, sync_changes
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+@router.get("", response_model=SyncOut)
+def sync(merkez_id: int, since: str | None = None, limit: int | None = None, db: Session = Depends(get_db)):
+    try:
+        changes = sync_changes(db, merkez_id, since, limit=limit)
+    except InvalidSyncToken as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    with_eleve_names(db, changes["plannings"])
+    with_merkez_names(db, changes["messages"])
+    return changes
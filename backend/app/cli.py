@@ -0,0 +1,53 @@
+"""
+Commandes d'administration Maraakiz
+Usage:
+    python -m app.cli init-db     # apply the migrations (alembic upgrade head)
+    python -m app.cli check-db    # exit 1 if the database is not at the code's migration revision
+    python -m app.cli archive-messages   # move old messages to messages_archive now
+    python -m app.cli refresh-availability   # recompute disponibilite_immediate for every merkez
+    python -m app.cli refresh-similar [--full]   # recompute changed (or all) similar merkez lists
+"""
+import sys
+
+from app.core.schema import SCHEMA_REVISION, check_schema, init_schema
+from app.database import replicas
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    command = args[0] if args else ""
+    if command == "init-db":
+        init_schema()
+        # SQLite files standing in for replicas locally get the same schema; real replicas replicate it
+        for replica in replicas.engines:
+            if replica.dialect.name == "sqlite":
+                init_schema(replica)
+        print(f"Schema at revision {SCHEMA_REVISION}")
+        return 0
+    if command == "check-db":
+        return 0 if check_schema() else 1
+    if command == "archive-messages":
+        from app.jobs import archive_old_messages
+
+        print(f"{archive_old_messages()} messages archived")
+        return 0
+    if command == "refresh-availability":
+        from app.database import SessionLocal
+        from app.services.availability_service import rebuild_availability
+
+        with SessionLocal() as db:
+            rebuild_availability(db)
+        print("Availability recomputed")
+        return 0
+    if command == "refresh-similar":
+        from app.database import SessionLocal
+        from app.services.similarity_service import refresh_similar
+
+        with SessionLocal() as db:
+            count = refresh_similar(db, full="--full" in args)
+        print(f"{count} similar lists recomputed")
+        return 0
+    print(__doc__)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
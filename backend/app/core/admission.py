@@ -0,0 +1,198 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+from app.core.config import settings
+
+class Rejected(Exception):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+
+class RouteGroup:
+    # Concurrency limit + bounded FIFO wait queue. All state is touched from the event loop only.
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        reject_status: int = 503,
+        adaptive: bool = False,
+        target_latency_ms: float = 250.0,
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_limit = limit
+        self.min_limit = max(1, limit // 4)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.reject_status = reject_status
+        self.adaptive = adaptive
+        self.target_latency_ms = target_latency_ms
+
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._window: list[float] = []
+        self.latency_ewma_ms = 0.0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "completed": 0}
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            raise Rejected("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as exc:
+            # cancelled (client gone) or timed out after release() handed us the slot: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            if isinstance(exc, asyncio.TimeoutError):
+                self.stats["rejected_timeout"] += 1
+                raise Rejected("queue timeout") from None
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.stats["admitted"] += 1
+
+    def release(self, latency_ms: float) -> None:
+        self.stats["completed"] += 1
+        self.latency_ewma_ms = latency_ms if not self.latency_ewma_ms else 0.9 * self.latency_ewma_ms + 0.1 * latency_ms
+        if self.adaptive:
+            self._adapt(latency_ms)
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        # hand freed slots straight to the oldest waiters
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _adapt(self, latency_ms: float) -> None:
+        # AIMD on windowed p90 latency: shrink 10% when over target, grow by one when under it and saturated
+        self._window.append(latency_ms)
+        if len(self._window) < 20:
+            return
+        window = sorted(self._window)
+        self._window.clear()
+        p90 = window[int(len(window) * 0.9) - 1]
+        if p90 > self.target_latency_ms:
+            self.limit = max(self.min_limit, math.floor(self.limit * 0.9))
+        elif self.in_flight >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+
+    def retry_after(self) -> int:
+        per_request = (self.latency_ewma_ms or 1000.0) / 1000
+        return max(1, math.ceil(per_request * (len(self._waiters) + 1) / max(self.limit, 1)))
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queued_now": len(self._waiters),
+            "max_queue": self.max_queue,
+            "latency_ewma_ms": round(self.latency_ewma_ms, 2),
+            **self.stats,
+        }
+
+# path prefix -> group, first match wins; unmatched /api paths are "dashboard"
+GROUP_PREFIXES = [
+    ("/public/", "public"),
+    ("/auth/", "auth"),
+    ("/messages", "messaging"),
+]
+EXEMPT_PREFIXES = ["/metrics"]
+
+def parse_limits(spec: str) -> dict[str, tuple[int, int]]:
+    limits = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, values = item.strip().split("=")
+        concurrency, queue = values.split(":")
+        limits[name] = (int(concurrency), int(queue))
+    return limits
+
+def build_groups() -> dict[str, RouteGroup]:
+    return {
+        name: RouteGroup(
+            name,
+            limit=concurrency,
+            max_queue=queue,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+            # a login storm is the client's doing: answer it with 429, everything else is our overload
+            reject_status=429 if name == "auth" else 503,
+            adaptive=settings.ADMISSION_ADAPTIVE,
+            target_latency_ms=settings.ADMISSION_TARGET_LATENCY_MS,
+        )
+        for name, (concurrency, queue) in parse_limits(settings.ADMISSION_LIMITS).items()
+    }
+
+groups: dict[str, RouteGroup] = {}
+
+def group_for(path: str) -> RouteGroup | None:
+    prefix = settings.API_PREFIX
+    if not path.startswith(prefix + "/"):
+        return None
+    path = path[len(prefix):]
+    if any(path.startswith(p) for p in EXEMPT_PREFIXES):
+        return None
+    for route_prefix, name in GROUP_PREFIXES:
+        if path.startswith(route_prefix) or path == route_prefix.rstrip("/"):
+            return groups.get(name)
+    return groups.get("dashboard")
+
+class AdmissionControlMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+        if not groups:
+            groups.update(build_groups())
+
+    async def __call__(self, scope, receive, send):
+        group = group_for(scope["path"]) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await group.acquire()
+        except Rejected as exc:
+            await self._reject(send, group, exc.reason)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release((time.perf_counter() - started) * 1000)
+
+    async def _reject(self, send, group: RouteGroup, reason: str) -> None:
+        body = json.dumps({"detail": f"Server busy ({group.name}: {reason}), retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": group.reject_status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(group.retry_after()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+def snapshot() -> dict:
+    return {name: group.snapshot() for name, group in groups.items()}
@@ -0,0 +1,360 @@
+import contextvars
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.singleflight import call_key
+from app.database import from_primary
+
+logger = logging.getLogger("app.cache")
+
+MISSING = object()
+
+# inside deferred_invalidations(): (cache, namespace) pairs bumped when the block exits
+_deferred: contextvars.ContextVar[list | None] = contextvars.ContextVar("cache_deferred", default=None)
+
+# Shared-tier values are JSON: whoever can write the shared store can at worst serve stale data,
+# never run code in a worker. Cached values are column dicts, lists and scalars; the types JSON
+# lacks are tagged.
+_TAGS = {"dt": datetime.fromisoformat, "d": date.fromisoformat, "dec": Decimal}
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__t": "dt", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"__t": "d", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"__t": "dec", "v": str(value)}
+    raise TypeError(f"{type(value).__name__} is not cacheable")
+
+def _hook(obj: dict) -> Any:
+    tag = obj.get("__t")
+    return _TAGS[tag](obj["v"]) if tag in _TAGS and len(obj) == 2 else obj
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+def loads(raw: bytes) -> Any:
+    return json.loads(raw, object_hook=_hook)
+
+class CacheBackend:
+    # Shared tier: bytes in, bytes out. Versions are counters stored under their own keys.
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+class SQLiteBackend(CacheBackend):
+    # One file per host: every worker opens it (WAL), so a value or version bump written by one is seen by all
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._checked = False
+
+    def _claim(self) -> None:
+        # owner-only file (SQLite gives its -wal/-shm files the same mode); refuse one created by another user
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if hasattr(os, "getuid") and os.fstat(fd).st_uid != os.getuid():
+                raise PermissionError(f"cache file {self.path} is owned by another user")
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd, 0o600)
+        finally:
+            os.close(fd)
+        self._checked = True
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not self._checked:
+                self._claim()
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        row = self._conn().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, time.time() + ttl))
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+    def incr(self, key: str) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            version = int(row[0]) + 1 if row else 1
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, NULL)", (key, str(version).encode()))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+class RedisBackend(CacheBackend):
+    # Network tier for several hosts; `redis` is only imported when this backend is configured
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.url, socket_timeout=0.5)
+        return self._client
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(key, value, px=int(ttl * 1000))
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+class TieredCache:
+    # Keys live in namespaces; a namespace's current version is part of every key, so
+    # invalidate(namespace) is one counter bump in the shared tier that every worker picks
+    # up within `version_ttl` (old entries are simply never read again and expire).
+    def __init__(self, backend: CacheBackend | None, local_size: int, ttl: float, version_ttl: float, prefix: str = "") -> None:
+        self.backend = backend
+        self.local_size = local_size
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self.prefix = prefix
+        self._local: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._versions: dict[str, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "invalidations": 0, "errors": 0}
+        self.by_namespace: dict[str, dict[str, int]] = {}
+
+    def _shared(self, method: Callable, *args):
+        try:
+            return method(*args)
+        except Exception:  # noqa: BLE001 - a broken shared tier degrades to a miss, never to an error
+            self.stats["errors"] += 1
+            logger.warning("cache backend %s failed", type(self.backend).__name__, exc_info=True)
+            return None
+
+    def _count(self, namespace: str, stat: str) -> None:
+        self.stats[stat] += 1
+        family = self.by_namespace.setdefault(namespace.split(":", 1)[0], {"hits": 0, "misses": 0})
+        family["misses" if stat == "misses" else "hits"] += 1
+
+    def _version(self, namespace: str) -> int:
+        now = time.monotonic()
+        known = self._versions.get(namespace)
+        if known is not None and (self.backend is None or now - known[0] < self.version_ttl):
+            return known[1]
+        version = 0
+        if self.backend is not None:
+            raw = self._shared(self.backend.get, f"{self.prefix}{namespace}:version")
+            version = int(raw) if raw else 0
+        if len(self._versions) > 10 * self.local_size:
+            self._versions.clear()
+        self._versions[namespace] = (now, version)
+        return version
+
+    def _store_local(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._local[key] = (time.monotonic() + ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _get(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._local.move_to_end(key)
+                self._count(namespace, "local_hits")
+                return entry[1]
+        if self.backend is not None:
+            raw = self._shared(self.backend.get, self.prefix + key)
+            if raw is not None:
+                try:
+                    value = loads(raw)
+                except ValueError:  # not written by this code (or an older pickle entry): a miss
+                    self.stats["errors"] += 1
+                else:
+                    self._store_local(key, value, self.ttl)
+                    self._count(namespace, "shared_hits")
+                    return value
+        self._count(namespace, "misses")
+        return MISSING
+
+    def get_or_load(self, namespace: str, key: Any, load: Callable[[], Any], ttl: float | None = None) -> Any:
+        # version read before loading: a value loaded across an invalidation is stored under the old version
+        full_key = f"{namespace}:v{self._version(namespace)}:{key!r}"
+        value = self._get(namespace, full_key)
+        if value is not MISSING:
+            return value
+        value = load()
+        self._set(full_key, value, ttl or self.ttl)
+        return value
+
+    def get_many_or_load(self, entries: dict[Any, tuple[str, Any]], load: Callable[[list], dict], ttl: float | None = None) -> dict:
+        # get_or_load for entries {id: (namespace, key)}: the misses are loaded with one load(ids)
+        # returning {id: value}, the ids it leaves out are stored as None
+        full_keys = {id_: (namespace, f"{namespace}:v{self._version(namespace)}:{key!r}") for id_, (namespace, key) in entries.items()}
+        found = {id_: self._get(namespace, full_key) for id_, (namespace, full_key) in full_keys.items()}
+        missing = [id_ for id_, value in found.items() if value is MISSING]
+        if missing:
+            loaded = load(missing)
+            for id_ in missing:
+                found[id_] = loaded.get(id_)
+                self._set(full_keys[id_][1], found[id_], ttl or self.ttl)
+        return found
+
+    def _set(self, full_key: str, value: Any, ttl: float) -> None:
+        self._store_local(full_key, value, ttl)
+        if self.backend is not None:
+            self._shared(lambda: self.backend.set(self.prefix + full_key, dumps(value), ttl))
+        self.stats["sets"] += 1
+
+    def invalidate(self, namespace: str) -> None:
+        pending = _deferred.get()
+        if pending is not None:
+            pending.append((self, namespace))
+            return
+        version = self._versions.get(namespace, (0, 0))[1] + 1
+        if self.backend is not None:
+            version = self._shared(self.backend.incr, f"{self.prefix}{namespace}:version") or version
+        self._versions[namespace] = (time.monotonic(), version)
+        self.stats["invalidations"] += 1
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+        self._versions.clear()
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["local_hits"] + self.stats["shared_hits"] + self.stats["misses"]
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else "local",
+            "local_entries": len(self._local),
+            "hit_ratio": round((lookups - self.stats["misses"]) / lookups, 3) if lookups else None,
+            **self.stats,
+            "namespaces": self.by_namespace,
+        }
+
+@contextmanager
+def deferred_invalidations():
+    # for a transaction spanning several writes: invalidating before its commit would let a
+    # concurrent read cache the old rows again under the new version
+    pending: list = []
+    token = _deferred.set(pending)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+        for target, namespace in dict.fromkeys(pending):
+            target.invalidate(namespace)
+
+class NullCache(TieredCache):
+    def __init__(self) -> None:
+        super().__init__(None, 0, 0, 0)
+
+    def get_or_load(self, namespace: str, key: Any, load: Callable[[], Any], ttl: float | None = None) -> Any:
+        return load()
+
+    def get_many_or_load(self, entries: dict[Any, tuple[str, Any]], load: Callable[[list], dict], ttl: float | None = None) -> dict:
+        loaded = load(list(entries)) if entries else {}
+        return {id_: loaded.get(id_) for id_ in entries}
+
+def _build() -> TieredCache:
+    kind = settings.CACHE_BACKEND
+    if kind == "memory" and settings.WEB_CONCURRENCY > 1:
+        # other workers would never see this one's invalidations
+        if not settings.CACHE_SQLITE_PATH:
+            raise ValueError("CACHE_BACKEND=memory with WEB_CONCURRENCY > 1: set CACHE_SQLITE_PATH, a redis:// CACHE_BACKEND or none")
+        kind = "sqlite"
+    if kind == "none":
+        return NullCache()
+    backend: CacheBackend | None = None
+    if kind == "sqlite":
+        # no default path: a guessable file in a shared temp dir could be created by anyone first
+        if not settings.CACHE_SQLITE_PATH:
+            raise ValueError("CACHE_BACKEND=sqlite needs CACHE_SQLITE_PATH")
+        backend = SQLiteBackend(settings.CACHE_SQLITE_PATH)
+    elif kind.startswith("redis"):
+        backend = RedisBackend(kind)
+    elif kind != "memory":
+        raise ValueError(f"Unknown CACHE_BACKEND {kind!r}")
+    # one shared store may serve several databases (dev, bench): keep their keys apart
+    prefix = hashlib.sha1(settings.DATABASE_URL.encode()).hexdigest()[:8] + ":"
+    return TieredCache(backend, settings.CACHE_LOCAL_SIZE, settings.CACHE_TTL_SECONDS, settings.CACHE_VERSION_CHECK_SECONDS, prefix)
+
+cache = _build()
+
+# ORM rows are cached as plain column dicts and come back as detached instances
+
+def to_row(obj) -> dict | None:
+    if obj is None:
+        return None
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns}
+
+def from_row(model, row: dict | None):
+    if row is None:
+        return None
+    obj = model(**row)
+    make_transient_to_detached(obj)
+    return obj
+
+def cached(namespace: str | Callable[..., str], model, ttl: float | None = None) -> Callable:
+    # For read-only service functions `fn(db, ...)` returning a `model` instance, None, or a list of them.
+    # `namespace` may be a function of fn's arguments after `db`, to version entries per object.
+    def decorate(fn: Callable) -> Callable:
+        key_for = call_key(fn)
+        signature = inspect.signature(fn)
+
+        def namespace_for(args, kwargs) -> str:
+            if not callable(namespace):
+                return namespace
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return namespace(*list(bound.arguments.values())[1:])
+
+        def load(args, kwargs):
+            result = fn(*args, **kwargs)
+            return [to_row(obj) for obj in result] if isinstance(result, list) else to_row(result)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            fill = from_primary(args[0], lambda: load(args, kwargs))
+            rows = cache.get_or_load(namespace_for(args, kwargs), key_for(args, kwargs), fill, ttl)
+            return [from_row(model, row) for row in rows] if isinstance(rows, list) else from_row(model, rows)
+        return wrapper
+    return decorate
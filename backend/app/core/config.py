@@ -8,10 +8,118 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./maraakiz.db"
+    # Apply the migrations at startup (dev only); otherwise only the revision is checked
+    AUTO_CREATE_SCHEMA: bool = False
+    # Comma-separated read replica URLs; GET requests read from them when set
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_HEALTHCHECK_SECONDS: float = 10.0
+    READ_YOUR_WRITES_SECONDS: float = 5.0
 
     # JWT
     SECRET_KEY: str = "CHANGE_ME__PUT_A_LONG_RANDOM_SECRET"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Background jobs (periodic maintenance) run in-process when enabled
+    BACKGROUND_JOBS: bool = False
+    MESSAGE_ARCHIVE_AFTER_DAYS: int = 180
+    MESSAGE_ARCHIVE_BATCH_SIZE: int = 1000
+    MESSAGE_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    ABONNEMENT_EXPIRY_INTERVAL_SECONDS: int = 900
+    ABONNEMENT_EXPIRY_BATCH_SIZE: int = 500
+    AVAILABILITY_SWEEP_INTERVAL_SECONDS: int = 300
+    AVAILABILITY_SWEEP_BATCH_SIZE: int = 500
+
+    # Similar merkez (/api/public/merkez/{id}/similar), recomputed by a background job
+    SIMILAR_TOP_K: int = 6
+    SIMILAR_INTERVAL_SECONDS: int = 600
+    SIMILAR_CHUNK_ELEMENTS: int = 4_000_000  # scores held in memory at once (float32)
+    SIMILAR_LAG_SECONDS: float = 5.0
+    SIMILAR_DEBOUNCE_SECONDS: float = 30.0  # profile edits within this window share one refresh task
+
+    # /api/merkez/{id}/dashboard: sections run concurrently (own sessions) except on SQLite
+    DASHBOARD_PARALLEL: bool = True
+    DASHBOARD_WORKERS: int = 8
+    DASHBOARD_CACHE_TTL_SECONDS: float = 30.0
+
+    # /api/batch: operations per request, all run in one transaction
+    BATCH_MAX_OPERATIONS: int = 100
+
+    # Delta sync (/api/sync): changes younger than SYNC_LAG_SECONDS are sent again on the next call,
+    # so a transaction committing late is never skipped; older tokens than the retention need a reset
+    SYNC_LAG_SECONDS: float = 5.0
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+    TOMBSTONE_PURGE_INTERVAL_SECONDS: int = 86400
+
+    # iCalendar feeds (/api/plannings/feed/{token}.ics): plannings starting in this window
+    FEED_PAST_DAYS: int = 30
+    FEED_FUTURE_DAYS: int = 365
+    FEED_CACHE_TTL_SECONDS: float = 3600.0  # validators; every planning write invalidates them
+
+    # Admission control: "group=concurrency:queue" per route group (public, auth, messaging, dashboard)
+    ADMISSION_CONTROL: bool = False
+    ADMISSION_LIMITS: str = "public=16:32,auth=8:16,messaging=16:64,dashboard=32:128"
+    ADMISSION_QUEUE_TIMEOUT_MS: int = 2000
+    ADMISSION_ADAPTIVE: bool = False
+    ADMISSION_TARGET_LATENCY_MS: float = 250.0
+
+    # Identical concurrent public reads share one DB execution
+    SINGLE_FLIGHT: bool = True
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 10.0
+
+    # Cache for hot lookups: in-process LRU in front of a shared tier
+    # CACHE_BACKEND: "memory" (this process only), "sqlite" (file shared by the workers of one host),
+    # "redis://host:6379/0" (needs the redis package) or "none"
+    CACHE_BACKEND: str = "memory"
+    # worker processes per host (the variable uvicorn and gunicorn read): "memory" is per-process,
+    # so with more than one it becomes "sqlite" when CACHE_SQLITE_PATH is set and is refused otherwise
+    WEB_CONCURRENCY: int = 1
+    CACHE_SQLITE_PATH: str = ""  # required with "sqlite"; created owner-only (0600)
+    CACHE_LOCAL_SIZE: int = 2048
+    CACHE_TTL_SECONDS: float = 60.0
+    # how long a worker trusts its copy of a namespace version (= cross-worker invalidation delay)
+    CACHE_VERSION_CHECK_SECONDS: float = 1.0
+
+    # Task queue (app.core.tasks): worker threads in each API process; 0 when `python -m app.worker` runs it
+    TASK_WORKERS: int = 2
+    TASK_POLL_INTERVAL_SECONDS: float = 1.0
+    TASK_MAX_ATTEMPTS: int = 5
+    TASK_RETRY_BASE_SECONDS: float = 2.0
+    TASK_RETRY_MAX_SECONDS: float = 300.0
+    TASK_VISIBILITY_TIMEOUT_SECONDS: float = 300.0  # lease renewed while a task runs; one not renewed for this long is requeued
+    TASK_RETENTION_DAYS: int = 7
+    TASK_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # Merkez deletion: up to MERKEZ_DELETE_SYNC_MAX_ROWS child rows go in the request (ON DELETE
+    # CASCADE), bigger merkez are hidden at once and purged by a task in batches
+    MERKEZ_DELETE_SYNC_MAX_ROWS: int = 5000
+    MERKEZ_PURGE_BATCH_SIZE: int = 1000
+    MERKEZ_PURGE_BATCHES_PER_TASK: int = 50  # then the task requeues itself, leaving room for other tasks
+    MERKEZ_PURGE_SWEEP_INTERVAL_SECONDS: int = 3600
+
+    # Group commit: message/planning inserts are batched into one transaction by a writer thread
+    GROUP_COMMIT: bool = False
+    GROUP_COMMIT_MAX_BATCH: int = 100
+    GROUP_COMMIT_MAX_DELAY_MS: float = 5.0
+
+    # Lazy relationship loads raise instead of querying (set in production to catch N+1 patterns)
+    RAISE_ON_LAZY_LOAD: bool = False
+
+    # Compiled statements kept per engine: the filtered public listing alone has 512 shapes
+    SQL_COMPILED_CACHE_SIZE: int = 1500
+
+    # SQL profiling (dev/test only)
+    SQL_PROFILE: bool = False
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Sampling profiler (POST /api/admin/profiler/start, admins only): off until started
+    PROFILER_INTERVAL_MS: float = 10.0
+    PROFILER_MAX_SECONDS: float = 300.0  # also ends a request-count profile that never completes
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
 settings = Settings()
@@ -1,7 +1,6 @@
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -17,6 +16,8 @@ from fastapi.security import OAuth2PasswordBearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_PREFIX}/auth/login")
 
 def get_current_user_oauth2(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -34,3 +35,8 @@ def get_current_user_oauth2(db: Session = Depends(get_db), token: str = Depends(
     if not user:
         raise credentials_exception
     return user
+
+def get_current_admin(user: User = Depends(get_current_user_oauth2)) -> User:
+    if not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return user
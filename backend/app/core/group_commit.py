@@ -0,0 +1,117 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLocal, write_tracker
+
+logger = logging.getLogger("app.group_commit")
+
+@dataclass
+class _PendingInsert:
+    model: type
+    data: dict
+    future: Future = field(default_factory=Future)
+
+class GroupCommitWriter:
+    # Single writer thread: requests enqueue inserts, the writer commits up to `max_batch`
+    # rows (or whatever arrived within `max_delay` seconds) in one transaction and then
+    # resolves each request's future with its persisted row or its own error.
+    def __init__(self, max_batch: int, max_delay: float) -> None:
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: queue.Queue[_PendingInsert | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.stats = {"rows": 0, "batches": 0, "largest_batch": 0, "fallback_batches": 0, "errors": 0}
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                    self._thread.start()
+
+    def submit(self, model: type, data: dict) -> Future:
+        self._ensure_started()
+        pending = _PendingInsert(model=model, data=data)
+        self._queue.put(pending)
+        return pending.future
+
+    def insert(self, db: Session, model: type, data: dict):
+        obj = self.submit(model, data).result()
+        # the request's own session never wrote, so record the write for read-your-writes here
+        if "client_key" in db.info:
+            write_tracker.mark(db.info["client_key"], db.info.get("response"))
+        return obj
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: list[_PendingInsert]) -> None:
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        try:
+            with SessionLocal(expire_on_commit=False) as db:
+                objs = [item.model(**item.data) for item in batch]
+                db.add_all(objs)
+                db.commit()
+        except Exception:
+            # one bad row must not fail its neighbours: retry each row in its own transaction
+            self.stats["fallback_batches"] += 1
+            for item in batch:
+                self._commit_one(item)
+            return
+        self.stats["rows"] += len(batch)
+        for item, obj in zip(batch, objs):
+            item.future.set_result(obj)
+
+    def _commit_one(self, item: _PendingInsert) -> None:
+        try:
+            with SessionLocal(expire_on_commit=False) as db:
+                obj = item.model(**item.data)
+                db.add(obj)
+                db.commit()
+        except Exception as exc:
+            self.stats["errors"] += 1
+            item.future.set_exception(exc)
+            return
+        self.stats["rows"] += 1
+        item.future.set_result(obj)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "queued": self._queue.qsize(), "enabled": settings.GROUP_COMMIT}
+
+group_commit = GroupCommitWriter(max_batch=settings.GROUP_COMMIT_MAX_BATCH, max_delay=settings.GROUP_COMMIT_MAX_DELAY_MS / 1000)
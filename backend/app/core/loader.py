@@ -0,0 +1,43 @@
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+class BatchLoader:
+    # Resolves ids of one model with a single `IN (...)` query per batch, memoized for the session (= request)
+    def __init__(self, db: Session, model, columns: tuple = ()) -> None:
+        self.db = db
+        self.model = model
+        self.columns = columns
+        self._cache: dict[int, Any] = {}
+
+    def load_many(self, ids: Iterable[int | None]) -> dict[int, Any]:
+        wanted = {i for i in ids if i is not None}
+        missing = wanted - self._cache.keys()
+        if missing:
+            entity = [self.model.id, *self.columns] if self.columns else [self.model]
+            stmt = select(*entity).where(self.model.id.in_(missing))
+            result = self.db.execute(stmt)
+            for row in (result.all() if self.columns else result.scalars()):
+                self._cache[row.id] = row
+            for i in missing:
+                self._cache.setdefault(i, None)
+        return {i: self._cache[i] for i in wanted}
+
+    def load(self, id_: int | None) -> Any:
+        return self.load_many([id_]).get(id_) if id_ is not None else None
+
+def loader(db: Session, model, *columns) -> BatchLoader:
+    loaders = db.info.setdefault("loaders", {})
+    key = (model, tuple(c.key for c in columns))
+    if key not in loaders:
+        loaders[key] = BatchLoader(db, model, columns)
+    return loaders[key]
+
+def attach(objs: list, batch: BatchLoader, fk: str, dest: str, value: Callable[[Any], Any]) -> list:
+    # Collect every `obj.<fk>`, resolve them in one query, then set `obj.<dest>` for the response schema
+    found = batch.load_many(getattr(obj, fk) for obj in objs)
+    for obj in objs:
+        related = found.get(getattr(obj, fk))
+        setattr(obj, dest, value(related) if related is not None else None)
+    return objs
@@ -0,0 +1,228 @@
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    sql = _STRING.sub("?", statement)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    # IN (...) lists of any length share one shape
+    return _PARAM_LIST.sub("(?, ...)", sql)
+
+@dataclass
+class QueryRecord:
+    statement: str
+    parameters: Any
+    duration_ms: float
+
+    @property
+    def shape(self) -> str:
+        return normalize_sql(self.statement)
+
+@dataclass
+class QueryProfile:
+    label: str = ""
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    def shapes(self) -> dict[str, list[QueryRecord]]:
+        grouped: dict[str, list[QueryRecord]] = {}
+        for q in self.queries:
+            grouped.setdefault(q.shape, []).append(q)
+        return grouped
+
+    def n_plus_one(self, threshold: int | None = None) -> list[tuple[str, int]]:
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return [(shape, len(qs)) for shape, qs in self.shapes().items() if len(qs) >= threshold]
+
+@dataclass
+class ShapeStats:
+    shape: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+_current: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+
+class QueryProfiler:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._shapes: dict[str, ShapeStats] = {}
+        self._routes: dict[str, list[int]] = {}
+        self._collectors: list[QueryProfile] = []
+        self._engines: set[int] = set()
+
+    def install(self, engine: Engine) -> None:
+        if id(engine) in self._engines:
+            return
+        self._engines.add(id(engine))
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        record = QueryRecord(statement=statement, parameters=parameters, duration_ms=duration_ms)
+
+        current = _current.get()
+        if current is not None:
+            current.queries.append(record)
+
+        shape = record.shape
+        with self._lock:
+            for collector in self._collectors:
+                collector.queries.append(record)
+            stats = self._shapes.get(shape)
+            if stats is None:
+                stats = self._shapes[shape] = ShapeStats(shape=shape)
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+
+        if duration_ms >= settings.SQL_SLOW_QUERY_MS:
+            logger.warning(
+                "slow query (%.1f ms): %s\n  params: %r\n  plan: %s",
+                duration_ms, statement, parameters, self.explain(conn, statement, parameters),
+            )
+
+    def explain(self, conn, statement: str, parameters: Any) -> str:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return "-"
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        # raw DBAPI cursor so the EXPLAIN does not re-enter the engine events
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return "; ".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+        except Exception as exc:  # noqa: BLE001 - diagnostics must never break the query
+            return f"unavailable ({exc})"
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def profile(self, label: str = "") -> Iterator[QueryProfile]:
+        profile = QueryProfile(label=label)
+        token = _current.set(profile)
+        try:
+            yield profile
+        finally:
+            _current.reset(token)
+            self._finish(profile)
+
+    @contextmanager
+    def collect(self, label: str = "") -> Iterator[QueryProfile]:
+        # Process-wide capture, for tests driving the app through another thread (TestClient)
+        profile = QueryProfile(label=label)
+        with self._lock:
+            self._collectors.append(profile)
+        try:
+            yield profile
+        finally:
+            with self._lock:
+                self._collectors.remove(profile)
+
+    def _finish(self, profile: QueryProfile) -> None:
+        if profile.label:
+            with self._lock:
+                self._routes.setdefault(profile.label, []).append(profile.count)
+        for shape, count in profile.n_plus_one():
+            logger.warning("possible N+1 in %s: %d x %s", profile.label or "<block>", count, shape)
+
+    def report(self, top: int = 20) -> list[ShapeStats]:
+        with self._lock:
+            shapes = sorted(self._shapes.values(), key=lambda s: s.total_ms, reverse=True)
+        return shapes[:top]
+
+    def route_report(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            routes = {label: list(counts) for label, counts in self._routes.items()}
+        return {
+            label: {"requests": len(counts), "max_queries": max(counts), "avg_queries": sum(counts) / len(counts)}
+            for label, counts in routes.items()
+        }
+
+    def format_report(self, top: int = 20) -> str:
+        lines = [f"{'total ms':>10} {'count':>7} {'max ms':>8}  shape"]
+        for s in self.report(top):
+            lines.append(f"{s.total_ms:>10.1f} {s.count:>7} {s.max_ms:>8.1f}  {s.shape}")
+        routes = self.route_report()
+        if routes:
+            lines.append("")
+            lines.append(f"{'max q':>7} {'avg q':>7} {'reqs':>6}  route")
+            for label, r in sorted(routes.items(), key=lambda kv: kv[1]["max_queries"], reverse=True):
+                lines.append(f"{r['max_queries']:>7} {r['avg_queries']:>7.1f} {r['requests']:>6}  {label}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self._routes.clear()
+
+profiler = QueryProfiler()
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "") -> Iterator[QueryProfile]:
+    with profiler.collect(label) as profile:
+        yield profile
+    if profile.count > max_queries:
+        shapes = "\n".join(f"  {len(qs)} x {shape}" for shape, qs in profile.shapes().items())
+        raise QueryBudgetExceeded(
+            f"{label or 'block'} ran {profile.count} queries (budget {max_queries}):\n{shapes}"
+        )
+
+class QueryProfilerMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(profile.count).encode()))
+                headers.append((b"x-query-time-ms", f"{profile.total_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            profile.label = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+            profiler._finish(profile)
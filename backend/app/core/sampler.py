@@ -0,0 +1,186 @@
+import inspect
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.core.config import settings
+
+# On-demand wall-clock sampling profiler. Nothing is installed until start(): a thread then
+# reads every thread's stack each interval (sys._current_frames) and keeps the stacks running
+# a route endpoint, counted per route from the endpoint down. Request-count profiles wrap the
+# target route's ASGI app for the duration and put it back at stop.
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+Frame = tuple[str, str, int]  # function, file, first line
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+@dataclass
+class Profile:
+    interval: float
+    seconds: float
+    route: str | None = None
+    requests: int | None = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    stopped_by: str | None = None  # time, requests, stop
+    samples: int = 0
+    handled: int = 0
+    stacks: Counter = field(default_factory=Counter)  # (route label, frames root first) -> samples
+
+    def snapshot(self) -> dict:
+        by_route = Counter()
+        for (label, _), count in list(self.stacks.items()):
+            by_route[label] += count
+        return {
+            "running": self.finished_at is None,
+            "route": self.route,
+            "requests": self.requests,
+            "handled": self.handled,
+            "interval_ms": self.interval * 1000,
+            "started_at": self.started_at,
+            "seconds": round((self.finished_at or time.time()) - self.started_at, 3),
+            "stopped_by": self.stopped_by,
+            "samples": self.samples,
+            "routes": dict(by_route.most_common()),
+        }
+
+def _short(filename: str) -> str:
+    path = Path(filename)
+    if path.is_relative_to(BACKEND_DIR):
+        return str(path.relative_to(BACKEND_DIR))
+    parts = path.parts
+    return "/".join(parts[parts.index("site-packages") + 1:]) if "site-packages" in parts else filename
+
+def _frame_name(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({_short(filename)}:{line})"
+
+class SamplingProfiler:
+    def __init__(self) -> None:
+        self.profile: Profile | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._wrapped: list = []  # (route, original app) while counting requests
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, app, seconds: float | None = None, requests: int | None = None, route: str | None = None, interval_ms: float | None = None) -> Profile:
+        # route: path template ("/api/eleves"); requests: stop after that many of its requests
+        routes = [r for r in app.routes if hasattr(r, "endpoint") and (route is None or r.path == route)]
+        if route is not None and not routes:
+            raise LookupError(f"no route {route!r}")
+        endpoints = {
+            inspect.unwrap(r.endpoint).__code__: f"{','.join(sorted(getattr(r, 'methods', None) or ()))} {r.path}"
+            for r in routes
+            if hasattr(inspect.unwrap(r.endpoint), "__code__")
+        }
+        with self._lock:
+            if self._thread is not None:
+                raise ProfilerBusy("a profile is already running")
+            profile = Profile(
+                interval=(interval_ms or settings.PROFILER_INTERVAL_MS) / 1000,
+                seconds=min(seconds or settings.PROFILER_MAX_SECONDS, settings.PROFILER_MAX_SECONDS),
+                route=route,
+                requests=requests,
+            )
+            if requests:
+                for r in routes:
+                    self._wrapped.append((r, r.app))
+                    r.app = self._counting(r.app, profile)
+            self.profile = profile
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(profile, endpoints), name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return profile
+
+    def stop(self, reason: str = "stop") -> Profile | None:
+        thread = self._thread
+        if thread is not None:
+            self._finish(reason)
+            if thread is not threading.current_thread():
+                thread.join()
+        return self.profile
+
+    def _finish(self, reason: str) -> None:
+        with self._lock:
+            if self._thread is None:
+                return
+            for route, original in self._wrapped:
+                route.app = original
+            self._wrapped = []
+            self.profile.finished_at = time.time()
+            self.profile.stopped_by = reason
+            self._stop.set()
+            self._thread = None
+
+    def _counting(self, inner, profile: Profile):
+        async def app(scope, receive, send):
+            try:
+                await inner(scope, receive, send)
+            finally:
+                profile.handled += 1
+                if profile.handled >= profile.requests:
+                    self._finish("requests")
+        return app
+
+    def _run(self, profile: Profile, endpoints: dict) -> None:
+        own = threading.get_ident()
+        deadline = time.monotonic() + profile.seconds
+        while not self._stop.wait(profile.interval):
+            if time.monotonic() >= deadline:
+                self._finish("time")
+                break
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack: list[Frame] = []
+                label = None
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    label = endpoints.get(code)
+                    if label is not None:
+                        break  # above the endpoint: server and framework plumbing
+                    frame = frame.f_back
+                if label is not None:
+                    profile.stacks[(label, tuple(reversed(stack)))] += 1
+            profile.samples += 1
+
+def collapsed(profile: Profile) -> str:
+    # one "route;frame;...;frame count" line per stack (flamegraph.pl, speedscope, inferno)
+    lines = [
+        ";".join([label, *(_frame_name(f) for f in frames)]) + f" {count}"
+        for (label, frames), count in sorted(list(profile.stacks.items()), key=lambda item: -item[1])
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+def speedscope(profile: Profile) -> dict:
+    # https://www.speedscope.app file format: one sampled profile per route, weights in ms
+    frames: dict[Frame, int] = {}
+    routes: dict[str, tuple[list, list]] = {}
+    for (label, stack), count in list(profile.stacks.items()):
+        samples, weights = routes.setdefault(label, ([], []))
+        samples.append([frames.setdefault(f, len(frames)) for f in stack])
+        weights.append(round(count * profile.interval * 1000, 3))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": [{"name": name, "file": _short(filename), "line": line} for name, filename, line in frames]},
+        "profiles": [
+            {"type": "sampled", "name": label, "unit": "milliseconds", "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights}
+            for label, (samples, weights) in sorted(routes.items(), key=lambda item: -sum(item[1][1]))
+        ],
+        "name": f"maraakiz profile {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(profile.started_at))}",
+        "activeProfileIndex": 0,
+        "exporter": "maraakiz sampler",
+    }
+
+sampler = SamplingProfiler()
@@ -0,0 +1,95 @@
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+logger = logging.getLogger("app.scheduler")
+
+@dataclass
+class PeriodicJob:
+    name: str
+    interval: float
+    fn: Callable[[], object]
+    next_run: float = 0.0
+
+class Scheduler:
+    # One daemon thread running periodic maintenance jobs; a failing job is logged and retried next interval.
+    # Every API process may run one: a job only runs where its lease in job_leases was won, so once
+    # per interval across all of them.
+    def __init__(self) -> None:
+        self.jobs: list[PeriodicJob] = []
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def every(self, seconds: float, fn: Callable[[], object], name: str | None = None, initial_delay: float = 0.0) -> None:
+        # registering a name again replaces the job (register_jobs may run more than once)
+        name = name or fn.__name__
+        self.jobs = [job for job in self.jobs if job.name != name]
+        self.jobs.append(PeriodicJob(name=name, interval=seconds, fn=fn, next_run=time.monotonic() + initial_delay))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.next_run > now:
+                    continue
+                started = time.monotonic()
+                try:
+                    if not self._lease(job):
+                        job.next_run = time.monotonic() + job.interval
+                        continue
+                    result = job.fn()
+                    logger.info("job %s done in %.2fs: %s", job.name, time.monotonic() - started, result)
+                except Exception:
+                    logger.exception("job %s failed", job.name)
+                job.next_run = time.monotonic() + job.interval
+                if self._stop.is_set():
+                    return
+            wait = min((job.next_run for job in self.jobs), default=now + 60) - time.monotonic()
+            self._stop.wait(max(wait, 0.05))
+
+    def _lease(self, job: PeriodicJob) -> bool:
+        # conditional UPDATE of the job's row (INSERT the first time): one process wins per
+        # interval. The lease is a bit shorter than the interval so the winner's next turn finds
+        # it expired; when the winner dies, another process takes over at its next turn.
+        from sqlalchemy import select, update
+        from sqlalchemy.exc import IntegrityError
+
+        from app.database import SessionLocal
+        from app.models.job_lease import JobLease
+
+        now = datetime.utcnow()
+        values = {"locked_by": self.worker_id, "locked_until": now + timedelta(seconds=job.interval * 0.9)}
+        with SessionLocal() as db:
+            won = db.execute(
+                update(JobLease).where(JobLease.name == job.name, JobLease.locked_until <= now).values(**values),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            if not won and db.scalar(select(JobLease.name).where(JobLease.name == job.name)) is None:
+                db.add(JobLease(name=job.name, **values))
+                won = 1
+            try:
+                db.commit()
+            except IntegrityError:
+                return False  # another process inserted it first
+        return bool(won)
+
+scheduler = Scheduler()
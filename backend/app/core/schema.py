@@ -0,0 +1,65 @@
+import logging
+from pathlib import Path
+
+from sqlalchemy import Engine, inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from app.database import engine
+
+# Latest revision in migrations/versions: bump with every new migration (checked at startup
+# without importing alembic; benchmarks.explain_plans asserts it matches the scripts)
+SCHEMA_REVISION = "0011"
+# Databases created with create_all before migrations existed are stamped here whatever their
+# schema_version: 0001 is the original schema and 0001a only adds the objects they lack
+BASELINE_REVISION = "0001"
+
+logger = logging.getLogger("app.schema")
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+def alembic_config(bind: Engine | None = None):
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["engine"] = bind
+    return config
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def init_schema(bind: Engine = engine) -> None:
+    from alembic import command
+
+    config = alembic_config(bind)
+    tables = inspect(bind).get_table_names()
+    if "alembic_version" not in tables and "merkez" in tables:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+def current_revision(bind: Engine = engine) -> str | None:
+    try:
+        with bind.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+def check_schema(bind: Engine = engine) -> bool:
+    revision = current_revision(bind)
+    if revision != SCHEMA_REVISION:
+        logger.error(
+            "Database schema is at revision %s, expected %s: run `python -m app.cli init-db` (alembic upgrade head)",
+            revision, SCHEMA_REVISION,
+        )
+        return False
+    return True
+
+def require_schema(bind: Engine = engine) -> None:
+    # A worker must not serve requests against a schema its models do not match
+    if not check_schema(bind):
+        raise SchemaOutOfDate(f"database schema is not at revision {SCHEMA_REVISION}")
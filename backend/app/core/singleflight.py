@@ -0,0 +1,128 @@
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Hashable
+
+from app.core.config import settings
+
+class SingleFlightTimeout(TimeoutError):
+    pass
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+class SingleFlight:
+    # Concurrent identical calls share one execution: the first caller runs it, the others wait for its result or error
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._futures: dict[Hashable, asyncio.Future] = {}
+        self.stats = {"calls": 0, "leaders": 0, "shared": 0, "errors": 0, "timeouts": 0}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["leaders"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                self.stats["timeouts"] += 1
+                raise SingleFlightTimeout(f"gave up waiting for in-flight {key[:2]!r}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs):
+        future = self._futures.get(key)
+        self.stats["calls"] += 1
+        if future is not None:
+            self.stats["shared"] += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise SingleFlightTimeout(f"gave up waiting for in-flight {key[:2]!r}")
+
+        self.stats["leaders"] += 1
+        future = self._futures[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            self.stats["errors"] += 1
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._futures[key]
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "in_flight": len(self._calls) + len(self._futures)}
+
+singleflight = SingleFlight(timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS)
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+def call_key(fn: Callable) -> Callable[[tuple, dict], Hashable]:
+    # For service functions `fn(db, ...)`: the key is the function plus its normalized
+    # arguments (defaults applied, `db` excluded), so f(x, limit=50) == f(x).
+    signature = inspect.signature(fn)
+    name = (fn.__module__, fn.__qualname__)
+
+    def key_for(args, kwargs) -> Hashable:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return name + tuple((k, _freeze(v)) for k, v in list(bound.arguments.items())[1:])
+    return key_for
+
+def coalesce(fn: Callable) -> Callable:
+    # For read-only service functions
+    key_for = call_key(fn)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if not settings.SINGLE_FLIGHT:
+                return await fn(*args, **kwargs)
+            return await singleflight.do_async(key_for(args, kwargs), fn, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not settings.SINGLE_FLIGHT:
+            return fn(*args, **kwargs)
+        return singleflight.do(key_for(args, kwargs), fn, *args, **kwargs)
+    return wrapper
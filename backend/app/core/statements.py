@@ -0,0 +1,56 @@
+import functools
+from typing import Callable
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import default
+
+# Statement templates: a hot query is built once per shape (which optional filters are set),
+# with bindparam() placeholders for every value, and executed with a parameter dict. The
+# statement object is reused, so its compiled-cache key is computed once (memoized on the
+# object) instead of rebuilding and re-traversing the whole select() on every call.
+
+_templates: list = []
+
+def template(build: Callable) -> Callable:
+    # `build(*shape)` -> statement; the shape arguments must be hashable and few (flags, names, models)
+    cached = functools.cache(build)
+    _templates.append(cached)
+    return cached
+
+_OUTCOMES = {
+    default.CACHE_HIT: "hits",
+    default.CACHE_MISS: "misses",
+    default.NO_CACHE_KEY: "no_cache_key",
+    default.CACHING_DISABLED: "disabled",
+}
+
+class CompiledCacheStats:
+    # How each statement executed against an engine got its compiled form
+    def __init__(self) -> None:
+        self.engines: list[Engine] = []
+        self.counts = {name: 0 for name in _OUTCOMES.values()}
+
+    def install(self, engine: Engine) -> None:
+        self.engines.append(engine)
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        outcome = _OUTCOMES.get(getattr(context, "cache_hit", None))
+        if outcome is not None:
+            self.counts[outcome] += 1
+
+    def reset(self) -> None:
+        self.counts = dict.fromkeys(self.counts, 0)
+
+    def snapshot(self) -> dict:
+        lookups = self.counts["hits"] + self.counts["misses"]
+        caches = [e._compiled_cache for e in self.engines if e._compiled_cache is not None]
+        return {
+            **self.counts,
+            "hit_ratio": round(self.counts["hits"] / lookups, 3) if lookups else None,
+            "entries": sum(len(c) for c in caches),
+            "capacity": sum(c.capacity for c in caches),
+            "templates": sum(t.cache_info().currsize for t in _templates),
+        }
+
+compiled_cache_stats = CompiledCacheStats()
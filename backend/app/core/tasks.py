@@ -0,0 +1,243 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import delete, exists, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.queued_task import QueuedTask
+
+logger = logging.getLogger("app.tasks")
+
+# Durable task queue on the `task_queue` table. A service calls enqueue() inside its own
+# transaction (the task exists iff the write committed); worker threads, in the API process
+# (TASK_WORKERS) or in `python -m app.worker`, claim due tasks, run them in their own session
+# and retry failures with exponential backoff.
+
+TASKS: dict[str, tuple[Callable, int]] = {}
+
+def task(name: str | None = None, max_attempts: int | None = None) -> Callable:
+    # registers `fn(db, **payload)`; definitions live in app.tasks
+    def register(fn: Callable) -> Callable:
+        TASKS[name or fn.__name__] = (fn, max_attempts or settings.TASK_MAX_ATTEMPTS)
+        return fn
+    return register
+
+def enqueue(db: Session, name: str, payload: dict | None = None, dedup_key: str | None = None, delay: float = 0.0) -> None:
+    # One INSERT ... SELECT in the caller's transaction, skipped when a task with the same
+    # dedup_key is still queued. The caller commits. Two transactions both passing the NOT EXISTS
+    # (REPEATABLE READ) meet uq_task_queue_queued_dedup: the savepoint keeps the caller's writes.
+    now = datetime.utcnow()
+    row = {
+        "name": name,
+        "payload": payload or {},
+        "status": "queued",
+        "dedup_key": dedup_key,
+        "attempts": 0,
+        "max_attempts": TASKS[name][1] if name in TASKS else settings.TASK_MAX_ATTEMPTS,
+        "run_at": now + timedelta(seconds=delay),
+        "created_at": now,
+    }
+    table = QueuedTask.__table__
+    source = select(*(literal(value, table.c[column].type).label(column) for column, value in row.items()))
+    if dedup_key is None:
+        db.execute(insert(table).from_select(list(row), source))
+    else:
+        source = source.where(~exists().where(table.c.queued_dedup_key == dedup_key))
+        try:
+            with db.begin_nested():
+                db.execute(insert(table).from_select(list(row), source))
+        except IntegrityError:
+            return  # queued by a concurrent transaction
+    if pool.threads:
+        pool.wake()
+
+def _backoff(attempts: int) -> float:
+    delay = min(settings.TASK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.TASK_RETRY_MAX_SECONDS)
+    return delay + random.uniform(0, settings.TASK_RETRY_BASE_SECONDS)
+
+class TaskWorkerPool:
+    def __init__(self) -> None:
+        self.threads: list[threading.Thread] = []
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._reaped_at = 0.0
+        self.stats = {"claimed": 0, "done": 0, "retried": 0, "failed": 0, "requeued_stale": 0}
+
+    def start(self, workers: int) -> None:
+        with self._lock:
+            if self.threads:
+                return
+            self._stop.clear()
+            for i in range(workers):
+                thread = threading.Thread(target=self._run, name=f"task-worker-{i}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ran = self.run_once()
+            except Exception:  # noqa: BLE001 - the database may be briefly unavailable: wait and retry
+                logger.exception("task worker loop failed")
+                ran = False
+            if not ran:
+                self._wake.wait(settings.TASK_POLL_INTERVAL_SECONDS)
+                self._wake.clear()
+
+    def _fence(self, queued: QueuedTask) -> tuple:
+        # this claim still holds the task: a task requeued by _reap and claimed again has other
+        # locked_by/attempts, so the first run can neither extend its lease nor record its outcome
+        return (
+            QueuedTask.id == queued.id,
+            QueuedTask.status == "running",
+            QueuedTask.locked_by == self.worker_id,
+            QueuedTask.attempts == queued.attempts,
+        )
+
+    def _heartbeat(self, queued: QueuedTask, done: threading.Event) -> None:
+        # extends locked_at while the task runs, so _reap only requeues tasks whose worker died
+        interval = settings.TASK_VISIBILITY_TIMEOUT_SECONDS / 3
+        while not done.wait(interval):
+            try:
+                with SessionLocal() as db:
+                    db.execute(
+                        update(QueuedTask).where(*self._fence(queued)).values(locked_at=datetime.utcnow()),
+                        execution_options={"synchronize_session": False},
+                    )
+                    db.commit()
+            except Exception:  # noqa: BLE001 - next beat retries; the lease lasts three intervals
+                logger.warning("task %s #%s heartbeat failed", queued.name, queued.id, exc_info=True)
+
+    def _update(self, db: Session, where: tuple, values: dict) -> int:
+        # Putting a task back in the queue meets uq_task_queue_queued_dedup when an identical task
+        # (same dedup_key) was queued meanwhile: that one runs instead and this one is closed
+        try:
+            result = db.execute(update(QueuedTask).where(*where).values(**values), execution_options={"synchronize_session": False})
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            error = "superseded by a queued task with the same dedup_key"
+            if values.get("last_error"):
+                error = f"{error}; last error: {values['last_error']}"
+            values = {**values, "status": "failed", "finished_at": datetime.utcnow(), "last_error": error[:2000]}
+            result = db.execute(update(QueuedTask).where(*where).values(**values), execution_options={"synchronize_session": False})
+            db.commit()
+        return result.rowcount
+
+    def _reap(self, db: Session, now: datetime) -> None:
+        # tasks left running by a dead worker (no heartbeat for a whole timeout) go back to the queue
+        # (their attempt counts)
+        timeout = settings.TASK_VISIBILITY_TIMEOUT_SECONDS
+        if time.monotonic() - self._reaped_at < timeout / 10:
+            return
+        self._reaped_at = time.monotonic()
+        stale = (QueuedTask.status == "running", QueuedTask.locked_at < now - timedelta(seconds=timeout))
+        for task_id in db.execute(select(QueuedTask.id).where(*stale)).scalars().all():
+            self.stats["requeued_stale"] += self._update(db, (QueuedTask.id == task_id, *stale), {"status": "queued", "locked_by": None, "locked_at": None})
+
+    def _claim(self, db: Session) -> QueuedTask | None:
+        # optimistic: the conditional UPDATE only matches for the first worker to get there
+        now = datetime.utcnow()
+        self._reap(db, now)
+        candidates = db.execute(
+            select(QueuedTask.id)
+            .where(QueuedTask.status == "queued", QueuedTask.run_at <= now)
+            .order_by(QueuedTask.run_at)
+            .limit(max(len(self.threads), 1) * 2)
+        ).scalars().all()
+        for task_id in candidates:
+            claimed = db.execute(
+                update(QueuedTask)
+                .where(QueuedTask.id == task_id, QueuedTask.status == "queued")
+                .values(status="running", locked_by=self.worker_id, locked_at=now, attempts=QueuedTask.attempts + 1),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+            if claimed.rowcount:
+                self.stats["claimed"] += 1
+                queued = db.get(QueuedTask, task_id)
+                db.expunge(queued)  # a rollback in _update must not expire the claimed attempts
+                return queued
+        return None
+
+    def run_once(self) -> bool:
+        # claims and runs one due task; False when there was none
+        import app.tasks  # noqa: F401 - registers the task functions
+
+        with SessionLocal() as db:
+            queued = self._claim(db)
+            if queued is None:
+                return False
+            values: dict = {"locked_by": None, "locked_at": None}
+            registered = TASKS.get(queued.name)
+            done = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(queued, done), name=f"task-heartbeat-{queued.id}", daemon=True)
+            heartbeat.start()
+            try:
+                if registered is None:
+                    raise LookupError(f"unknown task {queued.name!r}")
+                with SessionLocal() as work:
+                    registered[0](work, **queued.payload)
+            except Exception as exc:  # noqa: BLE001 - recorded on the task and retried
+                values["last_error"] = "".join(traceback.format_exception_only(type(exc), exc)).strip()[:2000]
+                if registered is None or queued.attempts >= queued.max_attempts:
+                    values.update(status="failed", finished_at=datetime.utcnow())
+                    self.stats["failed"] += 1
+                    logger.error("task %s #%s failed for good: %s", queued.name, queued.id, values["last_error"])
+                else:
+                    values.update(status="queued", run_at=datetime.utcnow() + timedelta(seconds=_backoff(queued.attempts)))
+                    self.stats["retried"] += 1
+                    logger.warning("task %s #%s failed (attempt %s), retrying: %s", queued.name, queued.id, queued.attempts, values["last_error"])
+            else:
+                values.update(status="done", finished_at=datetime.utcnow(), last_error=None)
+                self.stats["done"] += 1
+            finally:
+                done.set()
+                heartbeat.join()
+            if not self._update(db, self._fence(queued), values):
+                logger.warning("task %s #%s lost its lease (requeued by the reaper), outcome not recorded", queued.name, queued.id)
+            return True
+
+    def snapshot(self, db: Session) -> dict:
+        depth = dict(db.execute(select(QueuedTask.status, func.count()).group_by(QueuedTask.status)).all())
+        oldest = db.execute(select(func.min(QueuedTask.run_at)).where(QueuedTask.status == "queued")).scalar()
+        return {
+            "workers": len(self.threads),
+            "depth": {status: depth.get(status, 0) for status in ("queued", "running", "done", "failed")},
+            # how late the most overdue queued task is (0: workers keep up)
+            "lag_seconds": round(max((datetime.utcnow() - oldest).total_seconds(), 0.0), 1) if oldest else 0.0,
+            **self.stats,
+        }
+
+pool = TaskWorkerPool()
+
+def purge_finished(db: Session, older_than: datetime | None = None) -> int:
+    older_than = older_than or datetime.utcnow() - timedelta(days=settings.TASK_RETENTION_DAYS)
+    result = db.execute(
+        delete(QueuedTask).where(QueuedTask.status.in_(("done", "failed")), QueuedTask.finished_at < older_than),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return result.rowcount
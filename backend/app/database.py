@@ -1,18 +1,227 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import functools
+import hashlib
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+
 from app.core.config import settings
+from app.core.statements import compiled_cache_stats
+
+logger = logging.getLogger("app.database")
+
+def _create_engine(url: str) -> Engine:
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    bind = create_engine(url, echo=False, future=True, connect_args=connect_args, query_cache_size=settings.SQL_COMPILED_CACHE_SIZE)
+    compiled_cache_stats.install(bind)
+    if url.startswith("sqlite"):
+        # SQLite ignores foreign keys unless asked, per connection: ON DELETE CASCADE needs them
+        event.listen(bind, "connect", _sqlite_foreign_keys)
+    return bind
+
+def _sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+engine = _create_engine(settings.DATABASE_URL)
+
+class ReplicaPool:
+    # Replicas in rotation; a background thread re-checks them every check_interval, so a request
+    # never waits on a health check (a replica failing a read is taken out at once, see RoutingSession)
+    def __init__(self, engines: list[Engine], check_interval: float) -> None:
+        self.engines = engines
+        self.check_interval = check_interval
+        self._healthy: list[Engine] = list(engines)
+        self._cycle = itertools.count()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _is_up(self, replica: Engine) -> bool:
+        try:
+            with replica.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except Exception:  # noqa: BLE001 - any failure takes the replica out of rotation
+            return False
+
+    def refresh(self) -> None:
+        self._healthy = [replica for replica in self.engines if self._is_up(replica)]
+
+    def start(self) -> None:
+        if not self.engines or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            self.refresh()
+
+    def pick(self) -> Engine | None:
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._cycle) % len(healthy)]
+
+    def mark_down(self, replica: Engine) -> None:
+        logger.warning("replica %s failed, reading from the primary until its next health check", replica.url)
+        self._healthy = [e for e in self._healthy if e is not replica]
+
+replicas = ReplicaPool([_create_engine(url) for url in settings.replica_urls], settings.REPLICA_HEALTHCHECK_SECONDS)
+
+class RoutingSession(Session):
+    # Reads go to a replica only for read-only sessions without a recent write from the same client;
+    # flushes and INSERT/UPDATE/DELETE always go to the primary. A session reads from one replica
+    # (picked on its first read) so a request never mixes snapshots of two replicas.
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+            return engine
+        if self.info.get("read_only") and not self.info.get("sticky"):
+            if "replica" not in self.info:
+                self.info["replica"] = replicas.pick()
+            if self.info["replica"] is not None:
+                return self.info["replica"]
+        return engine
+
+    def _on_replica(self, run, *args, **kwargs):
+        # A read failing on the replica's connection marks it down and is retried on the primary,
+        # unless the session also holds uncommitted primary writes (the rollback would drop them)
+        try:
+            return run(*args, **kwargs)
+        except DBAPIError as exc:
+            replica = self.info.get("replica")
+            if replica is None or not (isinstance(exc, OperationalError) or exc.connection_invalidated):
+                raise
+            replicas.mark_down(replica)
+            self.info["replica"] = None
+            if self.info.get("wrote") or self.new or self.dirty or self.deleted:
+                raise
+            self.rollback()
+            return run(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._on_replica(super().execute, *args, **kwargs)
 
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+    def scalars(self, *args, **kwargs):
+        return self._on_replica(super().scalars, *args, **kwargs)
 
-engine = create_engine(settings.DATABASE_URL, echo=False, future=True, connect_args=connect_args)
+    def scalar(self, *args, **kwargs):
+        return self._on_replica(super().scalar, *args, **kwargs)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+# expire_on_commit=False: write services already hold the committed values, no reload needed
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, future=True)
 
 class Base(DeclarativeBase):
     pass
 
-def get_db():
+# Relationships are never needed by the responses: related names come from app.core.loader
+RELATIONSHIP_LAZY = "raise_on_sql" if settings.RAISE_ON_LAZY_LOAD else "select"
+
+class WriteTracker:
+    # Read-your-writes: clients that committed recently keep reading from the primary
+    COOKIE = "maraakiz_rw"
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._last_write: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def client_key(request: Request) -> str | None:
+        # a digest, never the bearer token itself: these keys stay in memory for the whole window.
+        # No fallback to the client address: behind a proxy it would pin every client to the
+        # primary; anonymous clients rely on the cookie alone.
+        auth = request.headers.get("authorization")
+        if auth:
+            return hashlib.sha256(auth.encode()).hexdigest()
+        return None
+
+    def mark(self, key: str | None, response: Response | None = None) -> None:
+        now = time.time()
+        if key is not None:
+            with self._lock:
+                self._last_write[key] = now
+                if len(self._last_write) > 10_000:
+                    self._last_write = {k: t for k, t in self._last_write.items() if now - t < self.window}
+        if response is not None:
+            # cookie carries the window across workers
+            response.set_cookie(self.COOKIE, f"{now + self.window:.0f}", max_age=int(self.window) + 1, httponly=True)
+
+    def is_sticky(self, request: Request) -> bool:
+        until = request.cookies.get(self.COOKIE)
+        if until and until.isdigit() and int(until) > time.time():
+            return True
+        key = self.client_key(request)
+        last = self._last_write.get(key) if key is not None else None
+        return last is not None and time.time() - last < self.window
+
+write_tracker = WriteTracker(settings.READ_YOUR_WRITES_SECONDS)
+
+@event.listens_for(RoutingSession, "after_commit")
+def _track_write(session: Session) -> None:
+    if session.info.pop("wrote", False) and "client_key" in session.info:
+        write_tracker.mark(session.info["client_key"], session.info.get("response"))
+
+@contextmanager
+def read_only(db: Session):
+    previous = db.info.get("read_only", False)
+    db.info["read_only"] = True
+    try:
+        yield db
+    finally:
+        db.info["read_only"] = previous
+
+@contextmanager
+def primary_reads(db: Session):
+    # reads in this block use the primary, as in the read-your-writes window
+    previous = db.info.get("sticky", False)
+    db.info["sticky"] = True
+    try:
+        yield db
+    finally:
+        db.info["sticky"] = previous
+
+def from_primary(db: Session, load: Callable[..., Any]) -> Callable[..., Any]:
+    # cache fills: a lagging replica's rows would be cached under the version the write just
+    # bumped, and served to everyone (the writer included) until the TTL
+    def run(*args):
+        with primary_reads(db):
+            return load(*args)
+    return run
+
+def replica_reads(fn):
+    # For service functions that only read and tolerate replica lag
+    @functools.wraps(fn)
+    def wrapper(db: Session, *args, **kwargs):
+        with read_only(db):
+            return fn(db, *args, **kwargs)
+    return wrapper
+
+def get_db(request: Request, response: Response):
     db = SessionLocal()
+    db.info["client_key"] = write_tracker.client_key(request)
+    db.info["response"] = response
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        db.info["read_only"] = True
+    if replicas.engines and write_tracker.is_sticky(request):
+        db.info["sticky"] = True
     try:
         yield db
     finally:
@@ -0,0 +1,54 @@
+from app.core.config import settings
+from app.core.scheduler import Scheduler
+from app.database import SessionLocal
+
+def archive_old_messages() -> int:
+    from app.services.message_archive_service import archive_messages
+
+    with SessionLocal() as db:
+        return archive_messages(db)
+
+def expire_abonnements() -> int:
+    from app.services.abonnement_service import deactivate_expired_abonnements
+
+    with SessionLocal() as db:
+        return deactivate_expired_abonnements(db)
+
+def sweep_availability() -> int:
+    from app.services.availability_service import sweep_availability as sweep
+
+    with SessionLocal() as db:
+        return sweep(db)
+
+def purge_tombstones() -> int:
+    from app.services.sync_service import purge_tombstones as purge
+
+    with SessionLocal() as db:
+        return purge(db)
+
+def refresh_similar() -> int:
+    from app.services.similarity_service import refresh_similar as refresh
+
+    with SessionLocal() as db:
+        return refresh(db)
+
+def purge_tasks() -> int:
+    from app.core.tasks import purge_finished
+
+    with SessionLocal() as db:
+        return purge_finished(db)
+
+def sweep_deleted_merkez() -> int:
+    from app.services.merkez_purge_service import sweep_deleted
+
+    with SessionLocal() as db:
+        return sweep_deleted(db)
+
+def register_jobs(scheduler: Scheduler) -> None:
+    scheduler.every(settings.MESSAGE_ARCHIVE_INTERVAL_SECONDS, archive_old_messages, initial_delay=60)
+    scheduler.every(settings.ABONNEMENT_EXPIRY_INTERVAL_SECONDS, expire_abonnements, initial_delay=5)
+    scheduler.every(settings.AVAILABILITY_SWEEP_INTERVAL_SECONDS, sweep_availability, initial_delay=10)
+    scheduler.every(settings.TOMBSTONE_PURGE_INTERVAL_SECONDS, purge_tombstones, initial_delay=120)
+    scheduler.every(settings.SIMILAR_INTERVAL_SECONDS, refresh_similar, initial_delay=30)
+    scheduler.every(settings.TASK_PURGE_INTERVAL_SECONDS, purge_tasks, initial_delay=300)
+    scheduler.every(settings.MERKEZ_PURGE_SWEEP_INTERVAL_SECONDS, sweep_deleted_merkez, initial_delay=600)
@@ -1,21 +1,76 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
-from app.database import Base, engine
-from app.models import user, merkez, eleve, planning, abonnement, message  # noqa: F401
-
-from app.api.auth_routes import router as auth_router
-from app.api.merkez_routes import router as merkez_router
-from app.api.eleve_routes import router as eleve_router
-from app.api.planning_routes import router as planning_router
-from app.api.abonnement_routes import router as abonnement_router
-from app.api.message_routes import router as message_router
-from app.api.stats_routes import router as stats_router
-from app.api.public_merkez_routes import router as public_merkez_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.core.schema import init_schema, require_schema
+
+    # Migrations are explicit (`python -m app.cli init-db` / `alembic upgrade head`): refuse to
+    # start on an older or newer schema
+    if settings.AUTO_CREATE_SCHEMA:
+        init_schema()
+    else:
+        require_schema()
+
+    if settings.BACKGROUND_JOBS:
+        from app.core.scheduler import scheduler
+        from app.jobs import register_jobs
+
+        register_jobs(scheduler)
+        scheduler.start()
+    if settings.TASK_WORKERS:
+        from app.core.tasks import pool
+
+        pool.start(settings.TASK_WORKERS)
+    from app.database import replicas
+
+    replicas.start()
+    try:
+        yield
+    finally:
+        replicas.stop()
+        if settings.DASHBOARD_PARALLEL:
+            from app.services.dashboard_service import shutdown_executor
+
+            shutdown_executor()
+        if settings.BACKGROUND_JOBS:
+            scheduler.stop()
+        if settings.TASK_WORKERS:
+            pool.stop()
+        if settings.GROUP_COMMIT:
+            from app.core.group_commit import group_commit
+
+            group_commit.stop()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.APP_NAME)
+    from app import models  # noqa: F401 - all mappers must be registered before the first query
+
+    from app.api.auth_routes import router as auth_router
+    from app.api.merkez_routes import router as merkez_router
+    from app.api.eleve_routes import router as eleve_router
+    from app.api.planning_routes import router as planning_router
+    from app.api.abonnement_routes import router as abonnement_router
+    from app.api.message_routes import router as message_router
+    from app.api.stats_routes import router as stats_router
+    from app.api.public_merkez_routes import router as public_merkez_router
+    from app.api.metrics_routes import router as metrics_router
+    from app.api.sync_routes import router as sync_router
+    from app.api.batch_routes import router as batch_router
+    from app.api.admin_routes import router as admin_router
+    from app.core.singleflight import SingleFlightTimeout
+
+    app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
+
+    if settings.ADMISSION_CONTROL:
+        from app.core.admission import AdmissionControlMiddleware
+
+        # added before CORS so shed responses still carry CORS headers
+        app.add_middleware(AdmissionControlMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -25,6 +80,22 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.SQL_PROFILE:
+        import atexit
+        import logging
+
+        from app.core.profiling import QueryProfilerMiddleware, profiler
+        from app.database import engine, replicas
+
+        for bind in [engine, *replicas.engines]:
+            profiler.install(bind)
+        app.add_middleware(QueryProfilerMiddleware)
+        atexit.register(lambda: logging.getLogger("app.sql").warning("SQL profile report\n%s", profiler.format_report()))
+
+    @app.exception_handler(SingleFlightTimeout)
+    def singleflight_timeout(request, exc: SingleFlightTimeout):
+        return JSONResponse({"detail": "Upstream read timed out, retry later"}, status_code=503, headers={"Retry-After": "1"})
+
     @app.get("/", tags=["Health"])
     def health():
         return {"status": "ok", "name": settings.APP_NAME}
@@ -37,10 +108,20 @@ def create_app() -> FastAPI:
     app.include_router(message_router, prefix=settings.API_PREFIX)
     app.include_router(stats_router, prefix=settings.API_PREFIX)
     app.include_router(public_merkez_router, prefix=settings.API_PREFIX)
+    app.include_router(metrics_router, prefix=settings.API_PREFIX)
+    app.include_router(sync_router, prefix=settings.API_PREFIX)
+    app.include_router(batch_router, prefix=settings.API_PREFIX)
+    app.include_router(admin_router, prefix=settings.API_PREFIX)
 
     return app
 
-app = create_app()
+_app: FastAPI | None = None
 
-# Create tables (dev only). For prod, prefer Alembic migrations.
-Base.metadata.create_all(bind=engine)
+def __getattr__(name: str):
+    # `uvicorn app.main:app` still works, but the app is only built when first asked for
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,4 +3,8 @@ from app.models.merkez import Merkez
 from app.models.eleve import Eleve
 from app.models.planning import Planning
 from app.models.abonnement import Abonnement
-from app.models.message import Message
+from app.models.message import Message, MessageArchive
+from app.models.tombstone import Tombstone
+from app.models.merkez_similar import MerkezSimilar
+from app.models.queued_task import QueuedTask
+from app.models.job_lease import JobLease
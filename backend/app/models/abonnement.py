@@ -1,14 +1,18 @@
 from datetime import datetime, date
-from sqlalchemy import DateTime, ForeignKey, String, Boolean, Date
+from sqlalchemy import DateTime, ForeignKey, String, Boolean, Date, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, RELATIONSHIP_LAZY
 
 class Abonnement(Base):
     __tablename__ = "abonnements"
+    __table_args__ = (
+        # expiry sweep: active subscriptions ordered by end date
+        Index("ix_abonnements_active_end", "is_active", "end_date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id"), index=True, nullable=False)
+    merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id", ondelete="CASCADE"), index=True, nullable=False)
     plan_name: Mapped[str] = mapped_column(String(120), default="6e_mois")
 
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -19,4 +23,4 @@ class Abonnement(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    merkez = relationship("Merkez", back_populates="abonnements")
+    merkez = relationship("Merkez", back_populates="abonnements", lazy=RELATIONSHIP_LAZY)
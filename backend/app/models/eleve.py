@@ -1,15 +1,23 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, RELATIONSHIP_LAZY
 
 class Eleve(Base):
     __tablename__ = "eleves"
+    __table_args__ = (
+        Index("ix_eleves_merkez_id_id", "merkez_id", "id"),
+        Index("ix_eleves_merkez_updated", "merkez_id", "updated_at"),  # /api/sync
+        # search: prefix range on each key within the merkez
+        Index("ix_eleves_merkez_search_nom", "merkez_id", "search_nom"),
+        Index("ix_eleves_merkez_search_prenom", "merkez_id", "search_prenom"),
+        Index("ix_eleves_merkez_search_email", "merkez_id", "search_email"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id"), index=True, nullable=False)
-    merkez = relationship("Merkez", back_populates="eleves")
+    merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id", ondelete="CASCADE"), nullable=False)
+    merkez = relationship("Merkez", back_populates="eleves", lazy=RELATIONSHIP_LAZY)
 
     prenom: Mapped[str] = mapped_column(String(120), nullable=False)
     nom: Mapped[str] = mapped_column(String(120), nullable=False)
@@ -20,7 +28,12 @@ class Eleve(Base):
     remarques: Mapped[str | None] = mapped_column(Text, nullable=True)
     lien_visio: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
+    # prenom/nom/email without accents, case or punctuation differences (eleve_service.search_keys)
+    search_prenom: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    search_nom: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    search_email: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    plannings = relationship("Planning", back_populates="eleve", cascade="all, delete-orphan")
+    plannings = relationship("Planning", back_populates="eleve", cascade="all, delete-orphan", passive_deletes=True, lazy=RELATIONSHIP_LAZY)
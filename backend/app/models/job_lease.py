@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+class JobLease(Base):
+    # One row per periodic job (app.core.scheduler): the process holding the lease runs the job,
+    # every other process skips it until locked_until
+    __tablename__ = "job_leases"
+
+    name: Mapped[str] = mapped_column(String(120), primary_key=True)
+    locked_by: Mapped[str] = mapped_column(String(120), nullable=False)
+    locked_until: Mapped[datetime] = mapped_column(DateTime, nullable=False)
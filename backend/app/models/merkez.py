@@ -1,17 +1,23 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, RELATIONSHIP_LAZY
 
 class Merkez(Base):
     __tablename__ = "merkez"
+    __table_args__ = (
+        # public listings: approved merkez newest first, optionally by the main filters
+        Index("ix_merkez_approved_id", "is_approved", "id"),
+        Index("ix_merkez_approved_type", "is_approved", "type_enseignement", "id"),
+        Index("ix_merkez_approved_dispo", "is_approved", "disponibilite_immediate", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
-    # Owner account
-    owner_user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), unique=True, nullable=False)
-    owner = relationship("User", back_populates="merkez")
+    # Owner account (NULL once the merkez is marked deleted, see app.services.merkez_purge_service)
+    owner_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), unique=True, nullable=True)
+    owner = relationship("User", back_populates="merkez", lazy=RELATIONSHIP_LAZY)
 
     # Public profile
     nom: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -29,20 +35,28 @@ class Merkez(Base):
 
     prix_min: Mapped[int] = mapped_column(Integer, default=0)
     prix_max: Mapped[int] = mapped_column(Integer, default=0)
+    # Derived from plannings (app.services.availability_service), never set by clients
     disponibilite_immediate: Mapped[bool] = mapped_column(Boolean, default=False)
+    next_available_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
 
     # Extra sections
     cursus: Mapped[str | None] = mapped_column(Text, nullable=True)
     livres_programmes: Mapped[str | None] = mapped_column(Text, nullable=True)
     adherer_credo_case: Mapped[bool] = mapped_column(Boolean, default=False)  # must be True to be approved
     is_approved: Mapped[bool] = mapped_column(Boolean, default=False)
+    # set by delete_merkez for large merkez: hidden right away, rows purged in batches by a task
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    # Relations
-    eleves = relationship("Eleve", back_populates="merkez", cascade="all, delete-orphan")
-    plannings = relationship("Planning", back_populates="merkez", cascade="all, delete-orphan")
-    abonnements = relationship("Abonnement", back_populates="merkez", cascade="all, delete-orphan")
-    messages_sent = relationship("Message", foreign_keys="[Message.sender_merkez_id]", back_populates="sender_merkez")
-    messages_received = relationship("Message", foreign_keys="[Message.receiver_merkez_id]", back_populates="receiver_merkez")
+    # Relations: children go with the merkez through ON DELETE CASCADE, never loaded for it (passive_deletes)
+    eleves = relationship("Eleve", back_populates="merkez", cascade="all, delete-orphan", passive_deletes=True, lazy=RELATIONSHIP_LAZY)
+    plannings = relationship("Planning", back_populates="merkez", cascade="all, delete-orphan", passive_deletes=True, lazy=RELATIONSHIP_LAZY)
+    abonnements = relationship("Abonnement", back_populates="merkez", cascade="all, delete-orphan", passive_deletes=True, lazy=RELATIONSHIP_LAZY)
+    messages_sent = relationship(
+        "Message", foreign_keys="[Message.sender_merkez_id]", back_populates="sender_merkez", cascade="all, delete-orphan", passive_deletes=True, lazy=RELATIONSHIP_LAZY
+    )
+    messages_received = relationship(
+        "Message", foreign_keys="[Message.receiver_merkez_id]", back_populates="receiver_merkez", cascade="all, delete-orphan", passive_deletes=True, lazy=RELATIONSHIP_LAZY
+    )
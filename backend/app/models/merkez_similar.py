@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Float, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+class MerkezSimilar(Base):
+    # Top SIMILAR_TOP_K neighbours of each approved merkez, written by app.services.similarity_service
+    __tablename__ = "merkez_similar"
+
+    merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id", ondelete="CASCADE"), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)  # 0 = most similar
+    similar_id: Mapped[int] = mapped_column(ForeignKey("merkez.id", ondelete="CASCADE"), nullable=False, index=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -1,23 +1,41 @@
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, Integer, Text, Boolean
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text, Boolean
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, RELATIONSHIP_LAZY
 
-class Message(Base):
-    __tablename__ = "messages"
+class MessageColumns:
+    @declared_attr.directive
+    def __table_args__(cls):
+        # conversations: (sender, receiver) pairs by date; inbox: the receiver side of the OR by date
+        return (
+            Index(f"ix_{cls.__tablename__}_sender_receiver_created", "sender_merkez_id", "receiver_merkez_id", "created_at"),
+            Index(f"ix_{cls.__tablename__}_receiver_created", "receiver_merkez_id", "created_at"),
+            # /api/sync, one per side of the OR
+            Index(f"ix_{cls.__tablename__}_sender_updated", "sender_merkez_id", "updated_at"),
+            Index(f"ix_{cls.__tablename__}_receiver_updated", "receiver_merkez_id", "updated_at"),
+            # ids move to messages_archive: SQLite must never hand out an id again once `messages` is emptied
+            {"sqlite_autoincrement": cls.__tablename__ == "messages"},
+        )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
     # For now: Merkez <-> Merkez messaging (extend later for Eleve users if needed)
-    sender_merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id"), index=True, nullable=False)
-    receiver_merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id"), index=True, nullable=False)
+    sender_merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id", ondelete="CASCADE"), nullable=False)
+    receiver_merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id", ondelete="CASCADE"), nullable=False)
 
     content: Mapped[str] = mapped_column(Text, nullable=False)
     is_read: Mapped[bool] = mapped_column(Boolean, default=False)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    sender_merkez = relationship("Merkez", foreign_keys=[sender_merkez_id], back_populates="messages_sent")
-    receiver_merkez = relationship("Merkez", foreign_keys=[receiver_merkez_id], back_populates="messages_received")
+class Message(MessageColumns, Base):
+    __tablename__ = "messages"
+
+    sender_merkez = relationship("Merkez", foreign_keys="[Message.sender_merkez_id]", back_populates="messages_sent", lazy=RELATIONSHIP_LAZY)
+    receiver_merkez = relationship("Merkez", foreign_keys="[Message.receiver_merkez_id]", back_populates="messages_received", lazy=RELATIONSHIP_LAZY)
+
+class MessageArchive(MessageColumns, Base):
+    # Cold storage: messages older than MESSAGE_ARCHIVE_AFTER_DAYS, same ids as in `messages`
+    __tablename__ = "messages_archive"
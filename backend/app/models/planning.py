@@ -1,16 +1,23 @@
 from datetime import datetime
-from sqlalchemy import DateTime, Integer, ForeignKey, String, Text, Boolean
+from sqlalchemy import DateTime, Integer, ForeignKey, Index, String, Text, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, RELATIONSHIP_LAZY
 
 class Planning(Base):
     __tablename__ = "plannings"
+    __table_args__ = (
+        # calendars: a merkez's / an eleve's plannings ordered by start
+        Index("ix_plannings_merkez_start", "merkez_id", "start_at"),
+        Index("ix_plannings_eleve_start", "eleve_id", "start_at"),
+        Index("ix_plannings_merkez_slot_start", "merkez_id", "is_available_slot", "start_at"),
+        Index("ix_plannings_merkez_updated", "merkez_id", "updated_at"),  # /api/sync
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
-    merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id"), index=True, nullable=False)
-    eleve_id: Mapped[int | None] = mapped_column(ForeignKey("eleves.id"), index=True, nullable=True)
+    merkez_id: Mapped[int] = mapped_column(ForeignKey("merkez.id", ondelete="CASCADE"), nullable=False)
+    eleve_id: Mapped[int | None] = mapped_column(ForeignKey("eleves.id", ondelete="CASCADE"), nullable=True)
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -24,5 +31,5 @@ class Planning(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    merkez = relationship("Merkez", back_populates="plannings")
-    eleve = relationship("Eleve", back_populates="plannings")
+    merkez = relationship("Merkez", back_populates="plannings", lazy=RELATIONSHIP_LAZY)
+    eleve = relationship("Eleve", back_populates="plannings", lazy=RELATIONSHIP_LAZY)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import JSON, Computed, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+class QueuedTask(Base):
+    # Durable background work (app.core.tasks): queued -> running -> done, or back to queued
+    # with a later run_at after a failure, until failed after max_attempts
+    __tablename__ = "task_queue"
+    __table_args__ = (
+        Index("ix_task_queue_status_run_at", "status", "run_at"),
+        Index("uq_task_queue_queued_dedup", "queued_dedup_key", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(120), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    # at most one queued task per key; a running one does not count (it may have read stale data)
+    dedup_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # dedup_key while queued, NULL otherwise: its unique index enforces the rule above
+    queued_dedup_key: Mapped[str | None] = mapped_column(
+        String(255), Computed("CASE WHEN status = 'queued' THEN dedup_key END"), nullable=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    run_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
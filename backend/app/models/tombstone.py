@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+class Tombstone(Base):
+    # Deleted eleves/plannings/messages, kept SYNC_TOMBSTONE_RETENTION_DAYS for /api/sync clients
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_merkez_deleted", "merkez_id", "deleted_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    merkez_id: Mapped[int] = mapped_column(Integer, nullable=False)  # no FK: outlives the merkez rows
+    entity: Mapped[str] = mapped_column(String(20), nullable=False)  # eleves, plannings, messages
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
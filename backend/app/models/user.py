@@ -2,7 +2,7 @@ from datetime import datetime
 from sqlalchemy import String, DateTime, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, RELATIONSHIP_LAZY
 
 class User(Base):
     __tablename__ = "users"
@@ -15,4 +15,4 @@ class User(Base):
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    merkez = relationship("Merkez", back_populates="owner", uselist=False)
+    merkez = relationship("Merkez", back_populates="owner", uselist=False, lazy=RELATIONSHIP_LAZY)
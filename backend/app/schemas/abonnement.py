@@ -17,8 +17,13 @@ class AbonnementUpdate(BaseModel):
     end_date: date | None = None
     is_active: bool | None = None
 
+class AbonnementStatus(BaseModel):
+    merkez_id: int
+    active: bool
+
 class AbonnementOut(AbonnementBase):
     id: int
     merkez_id: int
     created_at: datetime
     updated_at: datetime
+    merkez_nom: str | None = None
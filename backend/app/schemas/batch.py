@@ -0,0 +1,23 @@
+from typing import Any, Literal
+from pydantic import BaseModel, Field
+
+class BatchOperation(BaseModel):
+    entity: Literal["eleve", "planning", "message", "abonnement"]
+    action: Literal["create", "update", "delete"]
+    # update/delete target; "$<ref>" points at the row created by an earlier operation
+    id: int | str | None = None
+    data: dict[str, Any] = {}
+    # name later operations use as "$<ref>" in `id` or in *_id fields of `data` (the index works too)
+    ref: str | None = Field(default=None, pattern=r"^\w+$")
+
+class BatchIn(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1)
+
+class BatchResult(BaseModel):
+    index: int
+    ref: str | None = None
+    id: int | None = None
+    data: dict[str, Any] | None = None
+
+class BatchOut(BaseModel):
+    results: list[BatchResult]
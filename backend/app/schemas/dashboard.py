@@ -0,0 +1,17 @@
+from typing import Any
+from pydantic import BaseModel
+
+class DashboardStats(BaseModel):
+    eleves: int
+    messages: int
+    plannings: int
+    unread_messages: int
+    active_abonnement: bool
+
+class DashboardOut(BaseModel):
+    merkez_id: int
+    # only the requested sections are present; list items only carry the requested fields
+    stats: DashboardStats | None = None
+    plannings: list[dict[str, Any]] | None = None
+    messages: list[dict[str, Any]] | None = None
+    abonnements: list[dict[str, Any]] | None = None
@@ -18,7 +18,6 @@ class MerkezBase(BaseModel):
 
     prix_min: int = 0
     prix_max: int = 0
-    disponibilite_immediate: bool = False
 
     cursus: str | None = None
     livres_programmes: str | None = None
@@ -42,7 +41,6 @@ class MerkezUpdate(BaseModel):
 
     prix_min: int | None = None
     prix_max: int | None = None
-    disponibilite_immediate: bool | None = None
 
     cursus: str | None = None
     livres_programmes: str | None = None
@@ -54,6 +52,8 @@ class MerkezOut(MerkezBase):
     id: int
     owner_user_id: int
     is_approved: bool
+    disponibilite_immediate: bool
+    next_available_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -75,6 +75,7 @@ class PublicMerkez(BaseModel):
     prix_min: int
     prix_max: int
     disponibilite_immediate: bool
+    next_available_at: datetime | None = None
 
     cursus: str | None = None
     livres_programmes: str | None = None
@@ -20,3 +20,5 @@ class MessageOut(MessageBase):
     is_read: bool
     created_at: datetime
     updated_at: datetime
+    sender_nom: str | None = None
+    receiver_nom: str | None = None
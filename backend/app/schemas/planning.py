@@ -29,3 +29,4 @@ class PlanningOut(PlanningBase):
     eleve_id: int | None = None
     created_at: datetime
     updated_at: datetime
+    eleve_nom: str | None = None
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+class ProfilerStart(BaseModel):
+    # seconds, or the next `requests` requests of `route` (a path template such as /api/eleves)
+    seconds: float | None = Field(default=None, gt=0)
+    requests: int | None = Field(default=None, ge=1)
+    route: str | None = None
+    interval_ms: float | None = Field(default=None, ge=1, le=1000)
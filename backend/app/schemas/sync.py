@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+from app.schemas.eleve import EleveOut
+from app.schemas.message import MessageOut
+from app.schemas.planning import PlanningOut
+
+class SyncOut(BaseModel):
+    token: str
+    # True: `since` was missing or too old, this is a full snapshot and the local copy must be replaced
+    reset: bool
+    # True: more changes are waiting, call again with `token` right away
+    has_more: bool
+    eleves: list[EleveOut] = []
+    plannings: list[PlanningOut] = []
+    messages: list[MessageOut] = []
+    deleted: dict[str, list[int]] = {}
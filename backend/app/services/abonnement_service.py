@@ -1,35 +1,93 @@
-from datetime import datetime
+from datetime import date, datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, bindparam
 
+from app.core.cache import cache
+from app.database import from_primary
+from app.core.config import settings
+from app.core.loader import attach, loader
+from app.core.statements import template
 from app.models.abonnement import Abonnement
+from app.models.merkez import Merkez
+from app.services.dashboard_service import invalidate_dashboard
+from app.services.merkez_purge_service import not_deleted
+from app.services.write_service import commit, insert_returning, update_returning
+
+def _flag_namespace(merkez_id: int) -> str:
+    return f"abonnement_active:{merkez_id}"
+
+def invalidate_active_flag(merkez_id: int) -> None:
+    cache.invalidate(_flag_namespace(merkez_id))
+    invalidate_dashboard(merkez_id)
+
+def has_active_abonnement(db: Session, merkez_id: int) -> bool:
+    today = date.today()
+
+    def load() -> bool:
+        stmt = select(Abonnement.id).where(
+            Abonnement.merkez_id == merkez_id,
+            Abonnement.is_active == True,  # noqa: E712
+            or_(Abonnement.end_date.is_(None), Abonnement.end_date >= today),
+        )
+        return db.execute(stmt.limit(1)).first() is not None
+    # keyed by day: an answer never outlives the date it was computed for
+    return cache.get_or_load(_flag_namespace(merkez_id), today, from_primary(db, load))
+
+def deactivate_expired_abonnements(db: Session, today: date | None = None, batch_size: int | None = None) -> int:
+    today = today or date.today()
+    batch_size = batch_size or settings.ABONNEMENT_EXPIRY_BATCH_SIZE
+    total = 0
+    while True:
+        # range scan on ix_abonnements_active_end
+        rows = db.execute(
+            select(Abonnement.id, Abonnement.merkez_id)
+            .where(Abonnement.is_active == True, Abonnement.end_date < today)  # noqa: E712
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        db.execute(
+            update(Abonnement)
+            .where(Abonnement.id.in_([r.id for r in rows]))
+            .values(is_active=False, updated_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        for merkez_id in {r.merkez_id for r in rows}:
+            invalidate_active_flag(merkez_id)
+        total += len(rows)
+    return total
 
 def create_abonnement(db: Session, data: dict) -> Abonnement:
-    abo = Abonnement(**data)
-    db.add(abo)
-    db.commit()
-    db.refresh(abo)
+    abo = insert_returning(db, Abonnement, data)
+    invalidate_active_flag(abo.merkez_id)
     return abo
 
 def get_abonnement(db: Session, abonnement_id: int) -> Abonnement | None:
     return db.get(Abonnement, abonnement_id)
 
-def list_abonnements(db: Session, merkez_id: int | None = None, skip: int = 0, limit: int = 100) -> list[Abonnement]:
+@template
+def _abonnements_page(by_merkez: bool):
     stmt = select(Abonnement)
-    if merkez_id is not None:
-        stmt = stmt.where(Abonnement.merkez_id == merkez_id)
-    stmt = stmt.order_by(Abonnement.id.desc()).offset(skip).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+    if by_merkez:
+        stmt = stmt.where(Abonnement.merkez_id == bindparam("merkez_id"), not_deleted(bindparam("merkez_id")))
+    else:
+        stmt = stmt.where(not_deleted(Abonnement.merkez_id))
+    return stmt.order_by(Abonnement.id.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+
+def list_abonnements(db: Session, merkez_id: int | None = None, skip: int = 0, limit: int = 100) -> list[Abonnement]:
+    stmt = _abonnements_page(merkez_id is not None)
+    return list(db.execute(stmt, {"merkez_id": merkez_id, "skip": skip, "limit": limit}).scalars().all())
+
+def with_merkez_names(db: Session, abos: list[Abonnement]) -> list[Abonnement]:
+    return attach(abos, loader(db, Merkez, Merkez.nom), "merkez_id", "merkez_nom", lambda m: m.nom)
 
 def update_abonnement(db: Session, abo: Abonnement, data: dict) -> Abonnement:
-    for k, v in data.items():
-        setattr(abo, k, v)
-    abo.updated_at = datetime.utcnow()
-    db.add(abo)
-    db.commit()
-    db.refresh(abo)
+    abo = update_returning(db, abo, {**data, "updated_at": datetime.utcnow()})
+    invalidate_active_flag(abo.merkez_id)
     return abo
 
 def delete_abonnement(db: Session, abo: Abonnement) -> None:
     db.delete(abo)
-    db.commit()
+    commit(db)
+    invalidate_active_flag(abo.merkez_id)
@@ -0,0 +1,95 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select, update, func, or_
+
+from app.core.config import settings
+from app.core.tasks import enqueue
+from app.models.merkez import Merkez
+from app.models.planning import Planning
+from app.services.merkez_service import invalidate_availability
+from app.services.write_service import commit
+
+# Merkez.disponibilite_immediate / next_available_at are derived from plannings:
+# "has an upcoming is_available_slot" and the start of the earliest one.
+
+def _upcoming_slots(now: datetime):
+    return Planning.is_available_slot == True, Planning.start_at > now  # noqa: E712
+
+def slot_added(db: Session, merkez_id: int, start_at: datetime, now: datetime | None = None) -> None:
+    # A new upcoming slot can only move next_available_at earlier: one conditional UPDATE, no read
+    if start_at <= (now or datetime.utcnow()):
+        return
+    result = db.execute(
+        update(Merkez)
+        .where(Merkez.id == merkez_id, or_(Merkez.next_available_at.is_(None), Merkez.next_available_at > start_at))
+        .values(next_available_at=start_at, disponibilite_immediate=True),
+        execution_options={"synchronize_session": False},
+    )
+    commit(db)
+    if result.rowcount:
+        invalidate_availability(db, merkez_id)
+
+def refresh_availability(db: Session, merkez_ids, now: datetime | None = None) -> None:
+    ids = sorted(set(merkez_ids))
+    if not ids:
+        return
+    now = now or datetime.utcnow()
+    # range scan on ix_plannings_merkez_slot_start per merkez
+    next_at = dict(
+        db.execute(
+            select(Planning.merkez_id, func.min(Planning.start_at))
+            .where(Planning.merkez_id.in_(ids), *_upcoming_slots(now))
+            .group_by(Planning.merkez_id)
+        ).all()
+    )
+    # Core executemany: a merkez deleted in the meantime is simply not matched
+    merkez = Merkez.__table__
+    db.execute(
+        update(merkez)
+        .where(merkez.c.id == bindparam("merkez_id"))
+        .values(next_available_at=bindparam("next_at"), disponibilite_immediate=bindparam("available")),
+        [{"merkez_id": i, "next_at": next_at.get(i), "available": i in next_at} for i in ids],
+    )
+    commit(db)
+    invalidate_availability(db, *ids)
+
+def refresh_later(db: Session, merkez_ids) -> None:
+    # hands refresh_availability to the task queue, in the caller's transaction: call it before
+    # the write that removes the slots commits (or inside atomic()), so the task exists iff the
+    # write does
+    for merkez_id in sorted(set(merkez_ids)):
+        enqueue(db, "refresh_availability", {"merkez_ids": [merkez_id]}, dedup_key=f"availability:{merkez_id}")
+
+def slot_changed(db: Session, merkez_id: int, before: tuple[bool, datetime] | None, after: tuple[bool, datetime] | None) -> None:
+    # before/after: (is_available_slot, start_at) of the planning; None when created/deleted
+    now = datetime.utcnow()
+    if before is not None and before[0] and before[1] > now:
+        # the removed/moved slot may have been the earliest one: recomputed by a task
+        refresh_later(db, [merkez_id])
+        commit(db)
+    elif after is not None and after[0]:
+        slot_added(db, merkez_id, after[1], now)
+
+def sweep_availability(db: Session, now: datetime | None = None, batch_size: int | None = None) -> int:
+    # Slots passing into the past: only merkez whose next_available_at is due (index range scan)
+    now = now or datetime.utcnow()
+    batch_size = batch_size or settings.AVAILABILITY_SWEEP_BATCH_SIZE
+    total = 0
+    while True:
+        ids = list(db.execute(select(Merkez.id).where(Merkez.next_available_at <= now).limit(batch_size)).scalars())
+        if not ids:
+            break
+        refresh_availability(db, ids, now)
+        total += len(ids)
+    return total
+
+def rebuild_availability(db: Session, now: datetime | None = None) -> None:
+    # Full recompute in one set-based UPDATE (after bulk loads or imports)
+    now = now or datetime.utcnow()
+    upcoming = select(func.min(Planning.start_at)).where(Planning.merkez_id == Merkez.id, *_upcoming_slots(now)).scalar_subquery()
+    db.execute(
+        update(Merkez).values(next_available_at=upcoming, disponibilite_immediate=upcoming.is_not(None)),
+        execution_options={"synchronize_session": False},
+    )
+    commit(db)
+    invalidate_availability(db, *db.execute(select(Merkez.id)).scalars())
@@ -0,0 +1,99 @@
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.schemas.abonnement import AbonnementCreate, AbonnementOut, AbonnementUpdate
+from app.schemas.batch import BatchOperation
+from app.schemas.eleve import EleveCreate, EleveOut, EleveUpdate
+from app.schemas.message import MessageCreate, MessageOut, MessageUpdate
+from app.schemas.planning import PlanningCreate, PlanningOut, PlanningUpdate
+from app.services import abonnement_service, eleve_service, messages_service, planning_service
+from app.services.write_service import batch
+
+class BatchError(Exception):
+    def __init__(self, index: int, status_code: int, detail) -> None:
+        super().__init__(detail)
+        self.index = index
+        self.status_code = status_code
+        self.detail = detail
+
+class Entity:
+    def __init__(self, get, create, update, delete, create_schema: type[BaseModel], update_schema: type[BaseModel], out_schema: type[BaseModel]) -> None:
+        self.get, self.create, self.update, self.delete = get, create, update, delete
+        self.create_schema, self.update_schema, self.out_schema = create_schema, update_schema, out_schema
+
+# the same services (and validation schemas) as the eleve, planning, message and abonnement routes
+ENTITIES = {
+    "eleve": Entity(
+        eleve_service.get_eleve, eleve_service.create_eleve, eleve_service.update_eleve, eleve_service.delete_eleve,
+        EleveCreate, EleveUpdate, EleveOut,
+    ),
+    "planning": Entity(
+        planning_service.get_planning, planning_service.create_planning, planning_service.update_planning, planning_service.delete_planning,
+        PlanningCreate, PlanningUpdate, PlanningOut,
+    ),
+    "message": Entity(
+        messages_service.get_message, messages_service.create_message, messages_service.update_message, messages_service.delete_message,
+        MessageCreate, MessageUpdate, MessageOut,
+    ),
+    "abonnement": Entity(
+        abonnement_service.get_abonnement, abonnement_service.create_abonnement, abonnement_service.update_abonnement,
+        abonnement_service.delete_abonnement, AbonnementCreate, AbonnementUpdate, AbonnementOut,
+    ),
+}
+
+def _resolve(value, ids: dict[str, int], index: int):
+    if isinstance(value, str) and value.startswith("$"):
+        if value[1:] not in ids:
+            raise BatchError(index, 400, f"Unknown reference {value!r}: only earlier operations can be referenced")
+        return ids[value[1:]]
+    return value
+
+def _run(db: Session, index: int, op: BatchOperation, ids: dict[str, int]):
+    # a constraint the database rejects (a merkez_id that does not exist, ...) names its operation too
+    try:
+        return _apply(db, index, op, ids)
+    except IntegrityError as exc:
+        raise BatchError(index, 409, f"Rejected by the database: {str(exc.orig).splitlines()[0]}")
+
+def _apply(db: Session, index: int, op: BatchOperation, ids: dict[str, int]):
+    entity = ENTITIES[op.entity]
+    data = {k: _resolve(v, ids, index) if k.endswith("_id") else v for k, v in op.data.items()}
+    try:
+        if op.action == "create":
+            return entity.create(db, data=entity.create_schema(**data).model_dump())
+        payload = entity.update_schema(**data) if op.action == "update" else None
+    except ValidationError as exc:
+        raise BatchError(index, 422, exc.errors(include_url=False, include_context=False))
+
+    target_id = _resolve(op.id, ids, index)
+    if not isinstance(target_id, int):
+        raise BatchError(index, 400, f"{op.action} needs an id")
+    obj = entity.get(db, target_id)
+    if obj is None:
+        raise BatchError(index, 404, f"{op.entity.capitalize()} not found")
+    if op.action == "delete":
+        entity.delete(db, obj)
+        return None
+    # only the fields the operation sets: an explicit null clears an optional field
+    data = payload.model_dump(exclude_unset=True)
+    required = [k for k, v in data.items() if v is None and not obj.__table__.c[k].nullable]
+    if required:
+        raise BatchError(index, 422, f"{', '.join(required)} cannot be null")
+    return entity.update(db, obj, data=data)
+
+def run_batch(db: Session, operations: list[BatchOperation]) -> list[dict]:
+    # All or nothing: the first failing operation rolls back the ones before it
+    results = []
+    ids: dict[str, int] = {}
+    with batch(db):
+        for index, op in enumerate(operations):
+            obj = _run(db, index, op, ids)
+            result = {"index": index, "ref": op.ref, "id": None, "data": None}
+            if obj is not None:
+                ids[str(index)] = result["id"] = obj.id
+                if op.ref:
+                    ids[op.ref] = obj.id
+                result["data"] = ENTITIES[op.entity].out_schema.model_validate(obj).model_dump(mode="json")
+            results.append(result)
+    return results
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, or_, exists
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.database import SessionLocal, engine, from_primary
+from app.models.abonnement import Abonnement
+from app.models.eleve import Eleve
+from app.models.merkez import Merkez
+from app.models.message import Message, MessageArchive
+from app.models.planning import Planning
+from app.schemas.abonnement import AbonnementOut
+from app.schemas.message import MessageOut
+from app.schemas.planning import PlanningOut
+
+SECTIONS = ("stats", "plannings", "messages", "abonnements")
+ITEM_SCHEMAS = {"plannings": PlanningOut, "messages": MessageOut, "abonnements": AbonnementOut}
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+def _dashboard_namespace(merkez_id: int) -> str:
+    return f"dashboard:{merkez_id}"
+
+def invalidate_dashboard(*merkez_ids: int) -> None:
+    # called by every write service touching a merkez's eleves, plannings, messages or abonnements
+    for merkez_id in set(merkez_ids):
+        cache.invalidate(_dashboard_namespace(merkez_id))
+
+def _stats(db: Session, merkez_id: int, limit: int) -> dict:
+    # every counter in one statement: scalar subqueries, each an index range scan
+    def count(model, *where):
+        return select(func.count(model.id)).where(*where).scalar_subquery()
+
+    def messages(model, *where):
+        return count(model, or_(model.sender_merkez_id == merkez_id, model.receiver_merkez_id == merkez_id), *where)
+
+    def unread(model):
+        return count(model, model.receiver_merkez_id == merkez_id, model.is_read == False)  # noqa: E712
+
+    today = date.today()
+    row = db.execute(
+        select(
+            count(Eleve, Eleve.merkez_id == merkez_id).label("eleves"),
+            (messages(Message) + messages(MessageArchive)).label("messages"),
+            count(Planning, Planning.merkez_id == merkez_id).label("plannings"),
+            (unread(Message) + unread(MessageArchive)).label("unread_messages"),
+            exists().where(
+                Abonnement.merkez_id == merkez_id,
+                Abonnement.is_active == True,  # noqa: E712
+                or_(Abonnement.end_date.is_(None), Abonnement.end_date >= today),
+            ).label("active_abonnement"),
+        )
+    ).one()
+    return {**row._mapping, "active_abonnement": bool(row.active_abonnement)}
+
+def _plannings(db: Session, merkez_id: int, limit: int) -> list:
+    from app.services.planning_service import list_plannings, with_eleve_names
+
+    return with_eleve_names(db, list_plannings(db, merkez_id=merkez_id, limit=limit))
+
+def _messages(db: Session, merkez_id: int, limit: int) -> list:
+    from app.services.messages_service import list_messages_for_merkez, with_merkez_names
+
+    return with_merkez_names(db, list_messages_for_merkez(db, merkez_id=merkez_id, limit=limit))
+
+def _abonnements(db: Session, merkez_id: int, limit: int) -> list:
+    from app.services.abonnement_service import list_abonnements
+
+    return list_abonnements(db, merkez_id=merkez_id, limit=limit)
+
+LOADERS = {"stats": _stats, "plannings": _plannings, "messages": _messages, "abonnements": _abonnements}
+
+def _serialize(section: str, result, fields: list[str] | None):
+    schema = ITEM_SCHEMAS.get(section)
+    if schema is None:
+        return result
+    items = [schema.model_validate(obj).model_dump(mode="json") for obj in result]
+    if fields:
+        items = [{k: item[k] for k in fields} for item in items]
+    return items
+
+def _load_section(db: Session, merkez_id: int, section: str, limit: int, fields: list[str] | None):
+    return _serialize(section, LOADERS[section](db, merkez_id, limit), fields)
+
+def _in_own_session(db: Session, *args):
+    with SessionLocal() as own:
+        # same replica as the request: every section reads the same snapshot
+        own.info.update({k: db.info[k] for k in ("read_only", "sticky", "replica") if k in db.info})
+        return _load_section(own, *args)
+
+def _get_executor() -> ThreadPoolExecutor:
+    # created on the first parallel dashboard (startup stays side-effect free), shut down by lifespan
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+        return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _load_sections(db: Session, merkez_id: int, wanted: dict[str, tuple[int, list[str] | None]]) -> dict:
+    # SQLite serializes on one file anyway: sections run one after the other in the request's session
+    if not settings.DASHBOARD_PARALLEL or engine.dialect.name == "sqlite" or len(wanted) < 2:
+        return {name: _load_section(db, merkez_id, name, limit, fields) for name, (limit, fields) in wanted.items()}
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(_in_own_session, db, merkez_id, name, limit, fields)
+        for name, (limit, fields) in wanted.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+def get_dashboard(db: Session, merkez_id: int, wanted: dict[str, tuple[int, list[str] | None]]) -> dict | None:
+    # wanted: section -> (limit, fields or None for all); cached per merkez until one of its writes
+    def load():
+        merkez = db.get(Merkez, merkez_id)
+        if merkez is None or merkez.deleted_at is not None:
+            return None
+        return {"merkez_id": merkez_id, **_load_sections(db, merkez_id, wanted)}
+
+    key = tuple((name, limit, tuple(fields or ())) for name, (limit, fields) in sorted(wanted.items()))
+    return cache.get_or_load(_dashboard_namespace(merkez_id), key, from_primary(db, load), ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
@@ -1,35 +1,159 @@
+import re
+import unicodedata
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, bindparam, and_, func, or_, literal, union_all
 
+from app.core.statements import template
 from app.models.eleve import Eleve
+from app.models.planning import Planning
+from app.services.availability_service import refresh_later
+from app.services.dashboard_service import invalidate_dashboard
+from app.services.feed_service import invalidate_feeds
+from app.services.merkez_purge_service import not_deleted
+from app.services.sync_service import record_deletions
+from app.services.write_service import commit, insert_returning, update_returning
+
+# Search keys: prenom, nom and email folded (accents, case, hyphens/apostrophes as spaces) into
+# search_* columns, written with the row itself; a search is a prefix range on each key.
+_SEPARATORS = re.compile(r"[\s\-'\u2019]+")
+_SEARCH_KEYS = {"prenom": Eleve.search_prenom, "nom": Eleve.search_nom, "email": Eleve.search_email}
+SEARCH_MAX_TOKENS = 4
+
+def normalize(value: str) -> str:
+    value = "".join(c for c in unicodedata.normalize("NFKD", value) if not unicodedata.combining(c))
+    return _SEPARATORS.sub(" ", value.casefold()).strip()
+
+def search_keys(data: dict) -> dict:
+    # search_* values for the fields present in `data`
+    return {
+        column.key: normalize(data[field])[: column.type.length] if data[field] else None
+        for field, column in _SEARCH_KEYS.items()
+        if field in data
+    }
 
 def create_eleve(db: Session, data: dict) -> Eleve:
-    eleve = Eleve(**data)
-    db.add(eleve)
-    db.commit()
-    db.refresh(eleve)
+    eleve = insert_returning(db, Eleve, {**data, **search_keys(data)})
+    invalidate_dashboard(eleve.merkez_id)
+    invalidate_feeds(eleve.merkez_id)
     return eleve
 
 def get_eleve(db: Session, eleve_id: int) -> Eleve | None:
     return db.get(Eleve, eleve_id)
 
-def list_eleves(db: Session, merkez_id: int | None = None, skip: int = 0, limit: int = 100) -> list[Eleve]:
+def _filtered(stmt, filters: tuple[str, ...]):
+    for name in filters:
+        stmt = stmt.where(getattr(Eleve, name) == bindparam(name))
+    return stmt
+
+@template
+def _eleves_page(by_merkez: bool, filters: tuple[str, ...]):
     stmt = select(Eleve)
-    if merkez_id is not None:
-        stmt = stmt.where(Eleve.merkez_id == merkez_id)
-    stmt = stmt.order_by(Eleve.id.desc()).offset(skip).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+    if by_merkez:
+        stmt = stmt.where(Eleve.merkez_id == bindparam("merkez_id"), not_deleted(bindparam("merkez_id")))
+    else:
+        stmt = stmt.where(not_deleted(Eleve.merkez_id))
+    return _filtered(stmt, filters).order_by(Eleve.id.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+
+def list_eleves(
+    db: Session,
+    merkez_id: int | None = None,
+    niveau: str | None = None,
+    statut: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[Eleve]:
+    params = {name: value for name, value in {"niveau": niveau, "statut": statut}.items() if value}
+    stmt = _eleves_page(merkez_id is not None, tuple(params))
+    return list(db.execute(stmt, {**params, "merkez_id": merkez_id, "skip": skip, "limit": limit}).scalars().all())
+
+def _starts_with(column, name: str):
+    # column LIKE 'prefix%' as a range the (merkez_id, key) index can seek
+    return and_(column >= bindparam(name), column < bindparam(f"{name}_end"))
+
+# name matches before email matches, each in key order (so an exact match comes first)
+_SEARCH_RANK = {"prenom": "0", "nom": "0", "email": "1"}
+
+@template
+def _search_page(tokens: int, filters: tuple[str, ...]):
+    # One branch per key, read in (merkez_id, key) index order and cut at `window` (skip + limit)
+    # rows, so a short prefix never sorts every match of a big merkez. A row matching several
+    # keys is kept once, at its best rank || key; the page is cut after that. The first `window`
+    # rows of each branch hold the first `window` distinct rows: a row ahead of another in its
+    # best branch is ahead of it overall.
+    branches = []
+    for field, key in _SEARCH_KEYS.items():
+        branch = select(Eleve.id, (literal(_SEARCH_RANK[field]) + key).label("sort_key")).where(
+            Eleve.merkez_id == bindparam("merkez_id"), _starts_with(key, "t0")
+        )
+        if tokens > 1:
+            # every other token starts one of the keys, or the whole query starts one (compound names)
+            keys = list(_SEARCH_KEYS.values())
+            branch = branch.where(or_(
+                *(_starts_with(k, "q") for k in keys),
+                and_(*(or_(*(_starts_with(k, f"t{i}") for k in keys)) for i in range(1, tokens))),
+            ))
+        branches.append(select(_filtered(branch, filters).order_by(key, Eleve.id).limit(bindparam("window")).subquery()))
+    hits = union_all(*branches).subquery()
+    best = func.min(hits.c.sort_key).label("sort_key")
+    page = (
+        select(hits.c.id, best)
+        .group_by(hits.c.id)
+        .order_by(best, hits.c.id)
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+        .subquery()
+    )
+    return (
+        select(Eleve)
+        .join(page, page.c.id == Eleve.id)
+        .where(not_deleted(bindparam("merkez_id")))
+        .order_by(page.c.sort_key, Eleve.id)
+    )
+
+def _prefix_end(prefix: str) -> str:
+    # smallest string above every string starting with `prefix`
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def search_eleves(
+    db: Session,
+    merkez_id: int,
+    q: str,
+    niveau: str | None = None,
+    statut: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[Eleve]:
+    # accent- and case-insensitive prefix search on prenom, nom and email, best matches first
+    query = normalize(q)
+    if not query:
+        return list_eleves(db, merkez_id=merkez_id, niveau=niveau, statut=statut, skip=skip, limit=limit)
+    tokens = query.split(" ")[:SEARCH_MAX_TOKENS]
+    params = {name: value for name, value in {"niveau": niveau, "statut": statut}.items() if value}
+    for name, prefix in [("q", query), *((f"t{i}", token) for i, token in enumerate(tokens))]:
+        params[name], params[f"{name}_end"] = prefix, _prefix_end(prefix)
+    stmt = _search_page(len(tokens), tuple(name for name in ("niveau", "statut") if name in params))
+    params.update(merkez_id=merkez_id, window=skip + limit, skip=skip, limit=limit)
+    return list(db.execute(stmt, params).scalars().all())
 
 def update_eleve(db: Session, eleve: Eleve, data: dict) -> Eleve:
-    for k, v in data.items():
-        setattr(eleve, k, v)
-    eleve.updated_at = datetime.utcnow()
-    db.add(eleve)
-    db.commit()
-    db.refresh(eleve)
+    eleve = update_returning(db, eleve, {**data, **search_keys(data), "updated_at": datetime.utcnow()})
+    invalidate_dashboard(eleve.merkez_id)
+    invalidate_feeds(eleve.merkez_id)
     return eleve
 
 def delete_eleve(db: Session, eleve: Eleve) -> None:
+    # the eleve's plannings go with it (cascade): sync clients must drop them too
+    plannings = db.execute(
+        select(Planning.id, Planning.merkez_id, Planning.is_available_slot, Planning.start_at).where(Planning.eleve_id == eleve.id)
+    ).all()
+    record_deletions(db, "plannings", [(p.id, p.merkez_id) for p in plannings])
+    now = datetime.utcnow()
+    slots_gone = [p.merkez_id for p in plannings if p.is_available_slot and p.start_at > now]
+    if slots_gone:
+        refresh_later(db, slots_gone)
+    record_deletions(db, "eleves", [(eleve.id, eleve.merkez_id)])
     db.delete(eleve)
-    db.commit()
+    commit(db)
+    invalidate_dashboard(eleve.merkez_id)
+    invalidate_feeds(eleve.merkez_id)
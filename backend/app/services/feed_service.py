@@ -0,0 +1,177 @@
+import hashlib
+import hmac
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterator
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, bindparam
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.statements import template
+from app.database import SessionLocal, from_primary
+from app.models.eleve import Eleve
+from app.models.merkez import Merkez
+from app.models.planning import Planning
+from app.models.tombstone import Tombstone
+
+# iCalendar feeds of a merkez's or an eleve's plannings over a window of FEED_PAST_DAYS back and
+# FEED_FUTURE_DAYS ahead. The validators (ETag, Last-Modified) are cached per merkez until a
+# planning write, so a polling calendar client gets its 304 without reading the plannings.
+
+class InvalidFeedToken(ValueError):
+    pass
+
+def _sign(payload: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"feed:{payload}".encode(), hashlib.sha256).hexdigest()[:24]
+
+def feed_token(merkez_id: int, eleve_id: int | None = None) -> str:
+    # long-lived (calendar subscriptions): rotating SECRET_KEY revokes every feed URL
+    payload = f"m{merkez_id}" + (f"e{eleve_id}" if eleve_id is not None else "")
+    return f"{payload}-{_sign(payload)}"
+
+def decode_feed_token(token: str) -> tuple[int, int | None]:
+    payload, _, signature = token.rpartition("-")
+    if not payload.startswith("m") or not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidFeedToken("invalid feed token")
+    merkez, _, eleve = payload[1:].partition("e")
+    try:
+        return int(merkez), int(eleve) if eleve else None
+    except ValueError as exc:
+        raise InvalidFeedToken("invalid feed token") from exc
+
+def _feed_namespace(merkez_id: int) -> str:
+    return f"feed:{merkez_id}"
+
+def invalidate_feeds(*merkez_ids: int) -> None:
+    # called by the planning writes and the eleve/merkez writes (feed names, cascaded deletes)
+    for merkez_id in set(merkez_ids):
+        cache.invalidate(_feed_namespace(merkez_id))
+
+def feed_window(now: datetime | None = None) -> tuple[datetime, datetime]:
+    # whole days, so the window (and with it the ETag) moves once a day
+    today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=settings.FEED_PAST_DAYS), today + timedelta(days=settings.FEED_FUTURE_DAYS + 1)
+
+def _in_window(by_eleve: bool):
+    owner = Planning.eleve_id == bindparam("eleve_id") if by_eleve else Planning.merkez_id == bindparam("merkez_id")
+    return owner, Planning.start_at >= bindparam("start"), Planning.start_at < bindparam("end")
+
+@template
+def _validator_stmt(by_eleve: bool):
+    # one statement: the owner rows and index range reads of the window and the deletions
+    where = _in_window(by_eleve)
+    stmt = select(
+        Merkez.nom,
+        Merkez.updated_at,
+        Merkez.deleted_at,
+        select(func.max(Planning.updated_at)).where(*where).scalar_subquery(),
+        select(func.count()).select_from(Planning).where(*where).scalar_subquery(),
+        select(func.max(Tombstone.deleted_at))
+        .where(Tombstone.merkez_id == bindparam("merkez_id"), Tombstone.entity == "plannings")
+        .scalar_subquery(),
+    ).where(Merkez.id == bindparam("merkez_id"))
+    if by_eleve:
+        stmt = stmt.add_columns(
+            select(Eleve.prenom + " " + Eleve.nom)
+            .where(Eleve.id == bindparam("eleve_id"), Eleve.merkez_id == bindparam("merkez_id"))
+            .scalar_subquery()
+        )
+    return stmt
+
+def feed_validators(db: Session, merkez_id: int, eleve_id: int | None = None, now: datetime | None = None) -> dict | None:
+    # {"etag", "last_modified", "name"}; None when the merkez (or the eleve) is gone
+    start, end = feed_window(now)
+
+    def load():
+        row = db.execute(
+            _validator_stmt(eleve_id is not None), {"merkez_id": merkez_id, "eleve_id": eleve_id, "start": start, "end": end}
+        ).first()
+        if row is None or row[2] is not None or (eleve_id is not None and row[6] is None):
+            return None
+        nom, merkez_updated, _, updated, count, deleted = row[:6]
+        name = nom if eleve_id is None else f"{nom} - {row[6]}"
+        last_modified = max(t for t in (updated, deleted, merkez_updated) if t is not None)
+        version = f"{merkez_id}:{eleve_id}:{start:%Y%m%d}:{count}:{updated}:{deleted}:{name}"
+        return {
+            "etag": f'"{hashlib.sha1(version.encode()).hexdigest()[:20]}"',
+            "last_modified": last_modified.replace(microsecond=0),
+            "name": name,
+        }
+
+    return cache.get_or_load(_feed_namespace(merkez_id), ("feed", eleve_id, start.date()), from_primary(db, load), ttl=settings.FEED_CACHE_TTL_SECONDS)
+
+def not_modified(validators: dict, if_none_match: str | None, if_modified_since: str | None) -> bool:
+    # If-None-Match wins over If-Modified-Since (RFC 9110)
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or validators["etag"] in tags
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and validators["last_modified"] <= since.astimezone(timezone.utc).replace(tzinfo=None)
+    return False
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+@template
+def _feed_rows(by_eleve: bool):
+    return (
+        select(Planning.id, Planning.title, Planning.description, Planning.start_at, Planning.end_at, Planning.updated_at, Planning.is_available_slot)
+        .where(*_in_window(by_eleve))
+        .order_by(Planning.start_at)
+    )
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+def _fold(line: str) -> str:
+    # content lines are at most 75 octets, continued with CRLF + space (RFC 5545 3.1)
+    data = line.encode()
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start = [], 0
+    while start < len(data):
+        end = min(start + (75 if not parts else 74), len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:  # never split a UTF-8 sequence
+            end -= 1
+        parts.append(data[start:end].decode())
+        start = end
+    return "\r\n ".join(parts) + "\r\n"
+
+def _ical_utc(value: datetime) -> str:
+    # updated_at is written with utcnow()
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+def _ical_local(value: datetime) -> str:
+    # start_at/end_at are the merkez's wall-clock times, stored naive: floating times (RFC 5545
+    # 3.3.5), shown at the same hour in whatever zone the calendar client is in
+    return value.strftime("%Y%m%dT%H%M%S")
+
+def render_feed(merkez_id: int, eleve_id: int | None, name: str, now: datetime | None = None, chunk: int = 200) -> Iterator[str]:
+    # runs while the response streams, after the request's session is closed: own session,
+    # rows fetched `chunk` at a time
+    start, end = feed_window(now)
+    host = settings.APP_NAME.lower().replace(" ", "-")
+    yield "".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Maraakiz//Plannings//FR", "CALSCALE:GREGORIAN", "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ))
+    params = {"merkez_id": merkez_id, "eleve_id": eleve_id, "start": start, "end": end}
+    with SessionLocal() as db:
+        result = db.execute(_feed_rows(eleve_id is not None), params, execution_options={"yield_per": chunk})
+        for rows in result.partitions():
+            lines = []
+            for p in rows:
+                lines += ["BEGIN:VEVENT", f"UID:planning-{p.id}@{host}", f"DTSTAMP:{_ical_utc(p.updated_at)}", f"LAST-MODIFIED:{_ical_utc(p.updated_at)}"]
+                lines += [f"DTSTART:{_ical_local(p.start_at)}", f"DTEND:{_ical_local(p.end_at)}", f"SUMMARY:{_escape(p.title)}"]
+                if p.description:
+                    lines.append(f"DESCRIPTION:{_escape(p.description)}")
+                if p.is_available_slot:
+                    lines.append("TRANSP:TRANSPARENT")  # an open slot, not a busy session
+                lines.append("END:VEVENT")
+            yield "".join(_fold(line) for line in lines)
+    yield "END:VCALENDAR\r\n"
@@ -0,0 +1,93 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete, exists, literal
+
+from app.core.config import settings
+from app.core.tasks import enqueue
+from app.models.abonnement import Abonnement
+from app.models.eleve import Eleve
+from app.models.merkez import Merkez
+from app.models.message import Message, MessageArchive
+from app.models.planning import Planning
+from app.models.tombstone import Tombstone
+from app.services.write_service import commit
+
+# Removing a merkez: every child row goes through ON DELETE CASCADE. Small merkez are deleted
+# in the request; big ones get deleted_at (hidden everywhere) and the purge_merkez task deletes
+# their rows in short transactions of MERKEZ_PURGE_BATCH_SIZE before the merkez row itself.
+# Marking frees the owner account at once (owner_user_id set to NULL) so it can create a new merkez.
+
+def not_deleted(merkez_id):
+    # for child listings: the rows of a merkez waiting for its purge are hidden (one primary key
+    # lookup of the parent, per row or once when `merkez_id` is a parameter)
+    return ~exists().where(Merkez.id == merkez_id, Merkez.deleted_at.is_not(None))
+
+def _children(merkez_id: int) -> list:
+    # (model, rows of the merkez, other side whose sync clients must drop the row), in purge order:
+    # plannings before eleves so an eleve batch never cascades into an unbounded number of plannings
+    return [
+        (Planning, Planning.merkez_id == merkez_id, None),
+        (Eleve, Eleve.merkez_id == merkez_id, None),
+        (Abonnement, Abonnement.merkez_id == merkez_id, None),
+        (Message, Message.sender_merkez_id == merkez_id, Message.receiver_merkez_id),
+        (Message, Message.receiver_merkez_id == merkez_id, Message.sender_merkez_id),
+        (MessageArchive, MessageArchive.sender_merkez_id == merkez_id, MessageArchive.receiver_merkez_id),
+        (MessageArchive, MessageArchive.receiver_merkez_id == merkez_id, MessageArchive.sender_merkez_id),
+    ]
+
+def count_children(db: Session, merkez_id: int, limit: int) -> int:
+    # stops counting past `limit`: each count reads at most limit + 1 index entries
+    total = 0
+    for model, where, _ in _children(merkez_id):
+        total += len(db.execute(select(model.id).where(where).limit(limit + 1 - total)).all())
+        if total > limit:
+            break
+    return total
+
+def _tombstone_messages(db: Session, model, where, other, merkez_id: int, now: datetime) -> None:
+    # the other merkez's sync clients drop the conversation; one INSERT ... SELECT
+    source = select(literal("messages"), model.id, other, literal(now)).where(where, other != merkez_id)
+    db.execute(insert(Tombstone).from_select(["entity", "entity_id", "merkez_id", "deleted_at"], source))
+
+def delete_now(db: Session, merkez: Merkez) -> None:
+    now = datetime.utcnow()
+    for model, where, other in _children(merkez.id):
+        if other is not None:
+            _tombstone_messages(db, model, where, other, merkez.id, now)
+    # passive_deletes: no child is loaded, the database cascades
+    db.delete(merkez)
+    enqueue(db, "refresh_similar", dedup_key="similar", delay=settings.SIMILAR_DEBOUNCE_SECONDS)
+    commit(db)
+
+def purge_merkez(db: Session, merkez_id: int, batch_size: int | None = None, max_batches: int | None = None) -> bool:
+    # True once the merkez row is gone; idempotent, safe to rerun after a crash
+    if db.execute(select(Merkez.deleted_at).where(Merkez.id == merkez_id)).scalar() is None:
+        return True  # already purged (or never marked deleted)
+    batch_size = batch_size or settings.MERKEZ_PURGE_BATCH_SIZE
+    batches = 0
+    for model, where, other in _children(merkez_id):
+        while True:
+            if max_batches is not None and batches >= max_batches:
+                return False
+            ids = list(db.execute(select(model.id).where(where).limit(batch_size)).scalars())
+            if not ids:
+                break
+            if other is not None:
+                _tombstone_messages(db, model, model.id.in_(ids), other, merkez_id, datetime.utcnow())
+            db.execute(delete(model).where(model.id.in_(ids)), execution_options={"synchronize_session": False})
+            db.commit()
+            batches += 1
+    db.execute(delete(Merkez).where(Merkez.id == merkez_id), execution_options={"synchronize_session": False})
+    db.commit()
+    return True
+
+def schedule_purge(db: Session, merkez_id: int, delay: float = 0.0) -> None:
+    enqueue(db, "purge_merkez", {"merkez_id": merkez_id}, dedup_key=f"purge_merkez:{merkez_id}", delay=delay)
+
+def sweep_deleted(db: Session) -> int:
+    # requeues purges lost to a failed task (dedup skips those still queued)
+    ids = list(db.execute(select(Merkez.id).where(Merkez.deleted_at.is_not(None)).order_by(Merkez.deleted_at)).scalars())
+    for merkez_id in ids:
+        schedule_purge(db, merkez_id)
+    db.commit()
+    return len(ids)
@@ -1,41 +1,134 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
 
+from app.core.cache import cache, cached, deferred_invalidations, from_row, to_row
+from app.core.config import settings
+from app.core.singleflight import call_key, coalesce
+from app.core.statements import template
+from app.core.tasks import enqueue
+from app.database import from_primary
 from app.models.merkez import Merkez
+from app.models.merkez_similar import MerkezSimilar
+from app.services.dashboard_service import invalidate_dashboard
+from app.services.feed_service import invalidate_feeds
+from app.services.merkez_purge_service import count_children, delete_now, schedule_purge
+from app.services.write_service import insert_returning, update_returning
+
+# Public listings cache the ids of a page and take the rows from the profile entries: a merkez
+# write can change any page, a derived availability change only the pages filtered on it
+PUBLIC_MERKEZ = "merkez_public"
+PUBLIC_MERKEZ_AVAILABLE = "merkez_public_available"
+# fields the similar merkez lists depend on (app.services.similarity_service)
+SIMILARITY_FIELDS = {
+    "type_enseignement", "format_cours", "mode_enseignement", "niveau", "langue", "public_cible", "prix_min", "prix_max", "is_approved",
+}
+
+def public_profile_namespace(merkez_id: int) -> str:
+    return f"merkez_profile:{merkez_id}"
+
+def similar_namespace(merkez_id: int) -> str:
+    # bumped when the list is recomputed or when one of the merkez it shows changes
+    return f"merkez_similar:{merkez_id}"
+
+def invalidate_public_merkez(db: Session, *merkez_ids: int) -> None:
+    # Listings, the profiles of these merkez and the similar lists showing them (index range scan on
+    # ix_merkez_similar_similar_id); call it before a delete, whose cascade drops the similar rows
+    _invalidate(db, merkez_ids, (PUBLIC_MERKEZ, PUBLIC_MERKEZ_AVAILABLE))
+
+def invalidate_availability(db: Session, *merkez_ids: int) -> None:
+    # next_available_at / disponibilite_immediate changed: the other pages keep their ids
+    _invalidate(db, merkez_ids, (PUBLIC_MERKEZ_AVAILABLE,))
+
+def _invalidate(db: Session, merkez_ids, listings: tuple[str, ...]) -> None:
+    ids = sorted(set(merkez_ids))
+    for namespace in listings:
+        cache.invalidate(namespace)
+    for merkez_id in ids:
+        cache.invalidate(public_profile_namespace(merkez_id))
+    for start in range(0, len(ids), 500):
+        shown_by = db.execute(select(MerkezSimilar.merkez_id).where(MerkezSimilar.similar_id.in_(ids[start:start + 500])))
+        for merkez_id in set(shown_by.scalars()):
+            cache.invalidate(similar_namespace(merkez_id))
 
 def create_merkez(db: Session, data: dict) -> Merkez:
-    merkez = Merkez(**data)
     # approval rule: can only be approved if checkbox is true
-    if merkez.is_approved and not merkez.adherer_credo_case:
-        merkez.is_approved = False
-    db.add(merkez)
-    db.commit()
-    db.refresh(merkez)
+    if data.get("is_approved") and not data.get("adherer_credo_case"):
+        data = {**data, "is_approved": False}
+    merkez = insert_returning(db, Merkez, data)
+    cache.invalidate(PUBLIC_MERKEZ)
+    cache.invalidate(PUBLIC_MERKEZ_AVAILABLE)
+    cache.invalidate(public_profile_namespace(merkez.id))  # drops a cached 404 for this id
+    invalidate_dashboard(merkez.id)  # drops a cached 404 for this id
+    invalidate_feeds(merkez.id)
     return merkez
 
 def get_merkez(db: Session, merkez_id: int) -> Merkez | None:
-    return db.get(Merkez, merkez_id)
+    merkez = db.get(Merkez, merkez_id)
+    return merkez if merkez is not None and merkez.deleted_at is None else None
+
+@cached(public_profile_namespace, Merkez)
+@coalesce
+def get_public_merkez(db: Session, merkez_id: int) -> Merkez | None:
+    merkez = db.get(Merkez, merkez_id)
+    if not merkez or not merkez.is_approved:
+        return None
+    return merkez
+
+_profile_key = call_key(get_public_merkez)
 
 def list_merkez(db: Session, skip: int = 0, limit: int = 50) -> list[Merkez]:
-    stmt = select(Merkez).offset(skip).limit(limit).order_by(Merkez.id.desc())
+    stmt = select(Merkez).where(Merkez.deleted_at.is_(None)).offset(skip).limit(limit).order_by(Merkez.id.desc())
     return list(db.execute(stmt).scalars().all())
 
 def update_merkez(db: Session, merkez: Merkez, data: dict) -> Merkez:
-    for k, v in data.items():
-        setattr(merkez, k, v)
-    merkez.updated_at = datetime.utcnow()
+    data = {**data, "updated_at": datetime.utcnow()}
     # approval rule
-    if getattr(merkez, "is_approved", False) and not getattr(merkez, "adherer_credo_case", False):
-        merkez.is_approved = False
-    db.add(merkez)
-    db.commit()
-    db.refresh(merkez)
+    if data.get("is_approved", merkez.is_approved) and not data.get("adherer_credo_case", merkez.adherer_credo_case):
+        data["is_approved"] = False
+    if SIMILARITY_FIELDS & data.keys():
+        enqueue(db, "refresh_similar", dedup_key="similar", delay=settings.SIMILAR_DEBOUNCE_SECONDS)
+    merkez = update_returning(db, merkez, data)
+    invalidate_public_merkez(db, merkez.id)
+    if "nom" in data:
+        invalidate_feeds(merkez.id)  # calendar name
     return merkez
 
-def delete_merkez(db: Session, merkez: Merkez) -> None:
-    db.delete(merkez)
-    db.commit()
+def delete_merkez(db: Session, merkez: Merkez) -> bool:
+    # True when the rows are purged later by the purge_merkez task (the merkez is hidden already)
+    deferred = count_children(db, merkez.id, settings.MERKEZ_DELETE_SYNC_MAX_ROWS) > settings.MERKEZ_DELETE_SYNC_MAX_ROWS
+    with deferred_invalidations():  # bumped once the delete is committed
+        invalidate_public_merkez(db, merkez.id)
+        if deferred:
+            now = datetime.utcnow()
+            schedule_purge(db, merkez.id)
+            enqueue(db, "refresh_similar", dedup_key="similar", delay=settings.SIMILAR_DEBOUNCE_SECONDS)
+            update_returning(db, merkez, {"deleted_at": now, "is_approved": False, "owner_user_id": None, "updated_at": now})
+        else:
+            delete_now(db, merkez)
+        invalidate_dashboard(merkez.id)
+        invalidate_feeds(merkez.id)
+    return deferred
+
+_RANGE_FILTERS = {"prix_min": lambda: Merkez.prix_min >= bindparam("prix_min"), "prix_max": lambda: Merkez.prix_max <= bindparam("prix_max")}
+
+@template
+def _public_listing(filters: tuple[str, ...]):
+    stmt = select(Merkez.id).where(Merkez.is_approved == True)  # noqa: E712
+    for name in filters:
+        stmt = stmt.where(_RANGE_FILTERS[name]() if name in _RANGE_FILTERS else getattr(Merkez, name) == bindparam(name))
+    return stmt.order_by(Merkez.id.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+
+@coalesce
+def _listing_ids(db: Session, filters: tuple[tuple[str, object], ...], skip: int, limit: int) -> list[int]:
+    params = dict(filters)
+    stmt = _public_listing(tuple(params))
+    return list(db.execute(stmt, {**params, "skip": skip, "limit": limit}).scalars())
+
+def _public_rows(db: Session, ids: list[int]) -> dict[int, dict]:
+    # the misses of a page in one primary key lookup, stored as get_public_merkez entries
+    stmt = select(Merkez).where(Merkez.id.in_(ids), Merkez.is_approved == True)  # noqa: E712
+    return {merkez.id: to_row(merkez) for merkez in db.execute(stmt).scalars()}
 
 def list_public_merkez_filtered(
     db: Session,
@@ -51,25 +144,29 @@ def list_public_merkez_filtered(
     skip: int = 0,
     limit: int = 50,
 ) -> list[Merkez]:
-    stmt = select(Merkez).where(Merkez.is_approved == True)  # noqa: E712
-    if type_enseignement:
-        stmt = stmt.where(Merkez.type_enseignement == type_enseignement)
-    if format_cours:
-        stmt = stmt.where(Merkez.format_cours == format_cours)
-    if mode_enseignement:
-        stmt = stmt.where(Merkez.mode_enseignement == mode_enseignement)
-    if niveau:
-        stmt = stmt.where(Merkez.niveau == niveau)
-    if langue:
-        stmt = stmt.where(Merkez.langue == langue)
-    if public_cible:
-        stmt = stmt.where(Merkez.public_cible == public_cible)
-    if prix_min is not None:
-        stmt = stmt.where(Merkez.prix_min >= prix_min)
-    if prix_max is not None:
-        stmt = stmt.where(Merkez.prix_max <= prix_max)
-    if disponibilite_immediate is not None:
-        stmt = stmt.where(Merkez.disponibilite_immediate == disponibilite_immediate)
-
-    stmt = stmt.order_by(Merkez.id.desc()).offset(skip).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+    # text filters apply when non-empty, the others when given
+    params = {
+        name: value
+        for name, value in {
+            "type_enseignement": type_enseignement,
+            "format_cours": format_cours,
+            "mode_enseignement": mode_enseignement,
+            "niveau": niveau,
+            "langue": langue,
+            "public_cible": public_cible,
+        }.items()
+        if value
+    }
+    params.update(
+        (name, value)
+        for name, value in {"prix_min": prix_min, "prix_max": prix_max, "disponibilite_immediate": disponibilite_immediate}.items()
+        if value is not None
+    )
+    filters = tuple(sorted(params.items()))
+    namespace = PUBLIC_MERKEZ if disponibilite_immediate is None else PUBLIC_MERKEZ_AVAILABLE
+    ids = cache.get_or_load(namespace, (filters, skip, limit), from_primary(db, lambda: _listing_ids(db, filters, skip, limit)))
+    rows = cache.get_many_or_load(
+        {merkez_id: (public_profile_namespace(merkez_id), _profile_key((db, merkez_id), {})) for merkez_id in ids},
+        from_primary(db, lambda missing: _public_rows(db, missing)),
+    )
+    return [from_row(Merkez, rows[merkez_id]) for merkez_id in ids if rows[merkez_id] is not None]
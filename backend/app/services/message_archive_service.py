@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete
+
+from app.core.config import settings
+from app.models.message import Message, MessageArchive
+
+def archive_messages(
+    db: Session,
+    older_than: datetime | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+) -> int:
+    older_than = older_than or datetime.utcnow() - timedelta(days=settings.MESSAGE_ARCHIVE_AFTER_DAYS)
+    batch_size = batch_size or settings.MESSAGE_ARCHIVE_BATCH_SIZE
+    columns = [c.name for c in Message.__table__.columns]
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            db.execute(
+                select(Message.id).where(Message.created_at < older_than).order_by(Message.created_at).limit(batch_size)
+            ).scalars()
+        )
+        if not ids:
+            break
+        # one short transaction per batch keeps locks and undo small
+        db.execute(insert(MessageArchive).from_select(columns, select(*Message.__table__.c).where(Message.id.in_(ids))))
+        db.execute(delete(Message).where(Message.id.in_(ids)), execution_options={"synchronize_session": False})
+        db.commit()
+        moved += len(ids)
+        batches += 1
+    return moved
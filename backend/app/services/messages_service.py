@@ -1,61 +1,97 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, func, bindparam
 
-from app.models.message import Message
+from app.core.config import settings
+from app.core.group_commit import group_commit
+from app.core.loader import attach, loader
+from app.core.statements import template
+from app.models.merkez import Merkez
+from app.models.message import Message, MessageArchive
+from app.services.dashboard_service import invalidate_dashboard
+from app.services.merkez_purge_service import not_deleted
+from app.services.sync_service import record_deletions
+from app.services.write_service import commit, in_batch, insert_returning, update_returning
 
 def create_message(db: Session, data: dict) -> Message:
-    msg = Message(**data)
-    db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    if settings.GROUP_COMMIT and not in_batch(db):
+        msg = group_commit.insert(db, Message, data)
+    else:
+        msg = insert_returning(db, Message, data)
+    invalidate_dashboard(msg.sender_merkez_id, msg.receiver_merkez_id)
     return msg
 
-def get_message(db: Session, message_id: int) -> Message | None:
-    return db.get(Message, message_id)
+def get_message(db: Session, message_id: int) -> Message | MessageArchive | None:
+    return db.get(Message, message_id) or db.get(MessageArchive, message_id)
+
+# `where` and `order_by` are module-level functions of the model so pages and counts are templates
+# (a conversation with a merkez waiting for its purge is hidden from both sides)
+def _for_merkez(m):
+    sides = or_(m.sender_merkez_id == bindparam("merkez_id"), m.receiver_merkez_id == bindparam("merkez_id"))
+    return sides & not_deleted(m.sender_merkez_id) & not_deleted(m.receiver_merkez_id)
+
+def _between(m):
+    a, b = bindparam("merkez_a"), bindparam("merkez_b")
+    sides = or_((m.sender_merkez_id == a) & (m.receiver_merkez_id == b), (m.sender_merkez_id == b) & (m.receiver_merkez_id == a))
+    return sides & not_deleted(a) & not_deleted(b)
+
+def _newest_first(m):
+    return m.created_at.desc()
+
+def _oldest_first(m):
+    return m.created_at.asc()
+
+@template
+def _page_stmt(model, where, order_by):
+    return select(model).where(where(model)).order_by(order_by(model)).offset(bindparam("skip")).limit(bindparam("limit"))
+
+@template
+def _count_stmt(model, where):
+    return select(func.count(model.id)).where(where(model))
+
+def _page(db: Session, model, where, order_by, params: dict, skip: int, limit: int) -> list:
+    return list(db.execute(_page_stmt(model, where, order_by), {**params, "skip": skip, "limit": limit}).scalars().all())
+
+def _page_across(db: Session, first, second, where, order_by, params: dict, skip: int, limit: int) -> list:
+    # Pages over `first` then `second` as if they were one table; `second` is only
+    # queried once the page runs past the end of `first`.
+    rows = _page(db, first, where, order_by, params, skip, limit)
+    if len(rows) == limit:
+        return rows
+    if rows:
+        first_total = skip + len(rows)
+    else:
+        first_total = db.execute(_count_stmt(first, where), params).scalar_one()
+    return rows + _page(db, second, where, order_by, params, max(0, skip - first_total), limit - len(rows))
 
 def list_messages_for_merkez(db: Session, merkez_id: int, skip: int = 0, limit: int = 200) -> list[Message]:
-    stmt = (
-        select(Message)
-        .where(or_(Message.sender_merkez_id == merkez_id, Message.receiver_merkez_id == merkez_id))
-        .order_by(Message.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-    return list(db.execute(stmt).scalars().all())
+    # newest first: hot table, then the archive when paging past it
+    return _page_across(db, Message, MessageArchive, _for_merkez, _newest_first, {"merkez_id": merkez_id}, skip, limit)
 
 def list_conversation(db: Session, merkez_a: int, merkez_b: int, skip: int = 0, limit: int = 200) -> list[Message]:
-    stmt = (
-        select(Message)
-        .where(
-            or_(
-                (Message.sender_merkez_id == merkez_a) & (Message.receiver_merkez_id == merkez_b),
-                (Message.sender_merkez_id == merkez_b) & (Message.receiver_merkez_id == merkez_a),
-            )
-        )
-        .order_by(Message.created_at.asc())
-        .offset(skip)
-        .limit(limit)
-    )
-    return list(db.execute(stmt).scalars().all())
+    # oldest first: archived messages come before the hot ones
+    params = {"merkez_a": merkez_a, "merkez_b": merkez_b}
+    return _page_across(db, MessageArchive, Message, _between, _oldest_first, params, skip, limit)
+
+def with_merkez_names(db: Session, msgs: list[Message]) -> list[Message]:
+    names = loader(db, Merkez, Merkez.nom)
+    names.load_many([id_ for m in msgs for id_ in (m.sender_merkez_id, m.receiver_merkez_id)])
+    attach(msgs, names, "sender_merkez_id", "sender_nom", lambda m: m.nom)
+    return attach(msgs, names, "receiver_merkez_id", "receiver_nom", lambda m: m.nom)
 
 def update_message(db: Session, msg: Message, data: dict) -> Message:
-    for k, v in data.items():
-        setattr(msg, k, v)
-    msg.updated_at = datetime.utcnow()
-    db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    msg = update_returning(db, msg, {**data, "updated_at": datetime.utcnow()})
+    invalidate_dashboard(msg.sender_merkez_id, msg.receiver_merkez_id)
     return msg
 
 def delete_message(db: Session, msg: Message) -> None:
+    sides = {msg.sender_merkez_id, msg.receiver_merkez_id}
+    record_deletions(db, "messages", [(msg.id, merkez_id) for merkez_id in sides])
     db.delete(msg)
-    db.commit()
+    commit(db)
+    invalidate_dashboard(*sides)
 
 def mark_as_read(db: Session, msg: Message) -> Message:
-    msg.is_read = True
-    msg.updated_at = datetime.utcnow()
-    db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    msg = update_returning(db, msg, {"is_read": True, "updated_at": datetime.utcnow()})
+    invalidate_dashboard(msg.sender_merkez_id, msg.receiver_merkez_id)
     return msg
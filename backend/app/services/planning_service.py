@@ -1,37 +1,87 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
 
+from app.core.config import settings
+from app.core.group_commit import group_commit
+from app.core.loader import attach, loader
+from app.core.statements import template
+from app.models.eleve import Eleve
 from app.models.planning import Planning
+from app.services.availability_service import slot_changed
+from app.services.dashboard_service import invalidate_dashboard
+from app.services.feed_service import invalidate_feeds
+from app.services.merkez_purge_service import not_deleted
+from app.services.sync_service import record_deletions
+from app.services.write_service import atomic, commit, in_batch, insert_returning, update_returning
+
+def _slot(planning: Planning) -> tuple[bool, datetime]:
+    return planning.is_available_slot, planning.start_at
 
 def create_planning(db: Session, data: dict) -> Planning:
-    planning = Planning(**data)
-    db.add(planning)
-    db.commit()
-    db.refresh(planning)
+    # a batch needs the row in its own transaction: no hand-off to the group commit writer
+    if settings.GROUP_COMMIT and not in_batch(db):
+        planning = group_commit.insert(db, Planning, data)
+    else:
+        planning = insert_returning(db, Planning, data)
+    slot_changed(db, planning.merkez_id, None, _slot(planning))
+    invalidate_dashboard(planning.merkez_id)
+    invalidate_feeds(planning.merkez_id)
     return planning
 
 def get_planning(db: Session, planning_id: int) -> Planning | None:
     return db.get(Planning, planning_id)
 
-def list_plannings(db: Session, merkez_id: int | None = None, eleve_id: int | None = None, skip: int = 0, limit: int = 200) -> list[Planning]:
+@template
+def _plannings_page(by_merkez: bool, by_eleve: bool, since: bool, until: bool):
     stmt = select(Planning)
-    if merkez_id is not None:
-        stmt = stmt.where(Planning.merkez_id == merkez_id)
-    if eleve_id is not None:
-        stmt = stmt.where(Planning.eleve_id == eleve_id)
-    stmt = stmt.order_by(Planning.start_at.desc()).offset(skip).limit(limit)
-    return list(db.execute(stmt).scalars().all())
+    if by_merkez:
+        stmt = stmt.where(Planning.merkez_id == bindparam("merkez_id"), not_deleted(bindparam("merkez_id")))
+    else:
+        stmt = stmt.where(not_deleted(Planning.merkez_id))
+    if by_eleve:
+        stmt = stmt.where(Planning.eleve_id == bindparam("eleve_id"))
+    if since:
+        stmt = stmt.where(Planning.start_at >= bindparam("start"))
+    if until:
+        stmt = stmt.where(Planning.start_at < bindparam("end"))
+    return stmt.order_by(Planning.start_at.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+
+def list_plannings(
+    db: Session,
+    merkez_id: int | None = None,
+    eleve_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    skip: int = 0,
+    limit: int = 200,
+) -> list[Planning]:
+    # start/end: plannings starting in [start, end), a range on the (merkez_id, start_at) index
+    stmt = _plannings_page(merkez_id is not None, eleve_id is not None, start is not None, end is not None)
+    params = {"merkez_id": merkez_id, "eleve_id": eleve_id, "start": start, "end": end, "skip": skip, "limit": limit}
+    return list(db.execute(stmt, params).scalars().all())
+
+def with_eleve_names(db: Session, plannings: list[Planning]) -> list[Planning]:
+    eleves = loader(db, Eleve, Eleve.prenom, Eleve.nom)
+    return attach(plannings, eleves, "eleve_id", "eleve_nom", lambda e: f"{e.prenom} {e.nom}")
 
 def update_planning(db: Session, planning: Planning, data: dict) -> Planning:
-    for k, v in data.items():
-        setattr(planning, k, v)
-    planning.updated_at = datetime.utcnow()
-    db.add(planning)
-    db.commit()
-    db.refresh(planning)
+    before = _slot(planning)
+    # the availability refresh is queued in the planning's transaction
+    with atomic(db):
+        planning = update_returning(db, planning, {**data, "updated_at": datetime.utcnow()})
+        if "is_available_slot" in data or "start_at" in data:
+            slot_changed(db, planning.merkez_id, before, _slot(planning))
+    invalidate_dashboard(planning.merkez_id)
+    invalidate_feeds(planning.merkez_id)
     return planning
 
 def delete_planning(db: Session, planning: Planning) -> None:
-    db.delete(planning)
-    db.commit()
+    before = _slot(planning)
+    with atomic(db):
+        record_deletions(db, "plannings", [(planning.id, planning.merkez_id)])
+        db.delete(planning)
+        commit(db)
+        slot_changed(db, planning.merkez_id, before, None)
+    invalidate_dashboard(planning.merkez_id)
+    invalidate_feeds(planning.merkez_id)
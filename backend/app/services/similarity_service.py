@@ -0,0 +1,156 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, insert, bindparam
+
+from app.core.cache import cache, cached
+from app.core.config import settings
+from app.core.statements import template
+from app.models.merkez import Merkez
+from app.models.merkez_similar import MerkezSimilar
+from app.services.merkez_service import similar_namespace
+from app.services.write_service import commit
+
+# "Similar institutes": each approved merkez is a vector of its teaching attributes and price
+# band, every block normalized so a dot product is a cosine in [0, 1]. Neighbours are
+# computed offline (numpy, only imported here) and read back as one indexed query.
+
+FEATURES = ("type_enseignement", "format_cours", "mode_enseignement", "niveau", "langue", "public_cible")
+# midpoint of prix_min..prix_max
+PRICE_BANDS = (10, 25, 50, 100, 200)
+
+@template
+def _similar_stmt():
+    return (
+        select(Merkez)
+        .join(MerkezSimilar, MerkezSimilar.similar_id == Merkez.id)
+        .where(MerkezSimilar.merkez_id == bindparam("merkez_id"), Merkez.is_approved == True)  # noqa: E712
+        .order_by(MerkezSimilar.rank)
+    )
+
+@cached(similar_namespace, Merkez)
+def list_similar(db: Session, merkez_id: int) -> list[Merkez]:
+    return list(db.execute(_similar_stmt(), {"merkez_id": merkez_id}).scalars().all())
+
+def _encode(rows):
+    import numpy as np
+
+    blocks = []
+    for column in range(len(FEATURES)):
+        values = [{v.strip() for v in row[column].split(",") if v.strip()} for row in rows]
+        vocabulary = {v: i for i, v in enumerate(sorted(set().union(*values)))}
+        block = np.zeros((len(rows), max(len(vocabulary), 1)), dtype=np.float32)
+        for i, row_values in enumerate(values):
+            for v in row_values:
+                block[i, vocabulary[v]] = 1.0
+        blocks.append(block)
+    middle = np.array([(row[-2] + row[-1]) / 2 for row in rows], dtype=np.float32)
+    bands = np.zeros((len(rows), len(PRICE_BANDS) + 1), dtype=np.float32)
+    bands[np.arange(len(rows)), np.searchsorted(PRICE_BANDS, middle)] = 1.0
+    blocks.append(bands)
+
+    for block in blocks:
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block /= np.where(norms == 0, 1, norms)
+    return np.hstack(blocks) / np.sqrt(len(blocks))
+
+def _chunks(n_queries: int, n_rows: int):
+    # a chunk of queries x all rows stays under SIMILAR_CHUNK_ELEMENTS scores
+    size = max(1, settings.SIMILAR_CHUNK_ELEMENTS // max(n_rows, 1))
+    for start in range(0, n_queries, size):
+        yield start, min(start + size, n_queries)
+
+def _top_k(vectors, ids, positions, k: int) -> dict[int, list[tuple[int, float]]]:
+    # neighbours of ids[positions]: best score first, ties by id
+    import numpy as np
+
+    found = {}
+    for start, end in _chunks(len(positions), len(ids)):
+        chunk = positions[start:end]
+        # rounded: equal profiles must tie exactly for the id order to apply
+        scores = np.round(vectors[chunk] @ vectors.T, 5)
+        scores[np.arange(len(chunk)), chunk] = -np.inf
+        kth = np.partition(scores, len(ids) - k, axis=1)[:, len(ids) - k]
+        for row, position in enumerate(chunk):
+            candidates = np.flatnonzero(scores[row] >= kth[row])
+            order = np.lexsort((ids[candidates], -scores[row, candidates]))[:k]
+            found[int(ids[position])] = [(int(ids[c]), float(scores[row, c])) for c in candidates[order]]
+    return found
+
+def _beaten(vectors, positions, thresholds):
+    # for every row: whether any of `positions` scores at least its threshold (a tie can win on id)
+    import numpy as np
+
+    best = np.full(len(vectors), -np.inf, dtype=np.float32)
+    for start, end in _chunks(len(positions), len(vectors)):
+        np.maximum(best, np.round(vectors[positions[start:end]] @ vectors.T, 5).max(axis=0), out=best)
+    return best >= thresholds
+
+def refresh_similar(db: Session, full: bool = False, now: datetime | None = None) -> int:
+    # Recomputes the lists of changed merkez (updated since their list was computed) and of the
+    # merkez those changes can reach: a changed or removed neighbour, or a changed merkez now
+    # scoring above their k-th neighbour. Returns the number of lists rewritten.
+    import numpy as np
+
+    now = now or datetime.utcnow()
+    k_max = settings.SIMILAR_TOP_K
+    rows = db.execute(
+        select(Merkez.id, Merkez.updated_at, *(getattr(Merkez, f) for f in FEATURES), Merkez.prix_min, Merkez.prix_max)
+        .where(Merkez.is_approved == True)  # noqa: E712
+        .order_by(Merkez.id)
+    ).all()
+    approved = {row.id for row in rows}
+
+    current: dict[int, list] = defaultdict(list)
+    for merkez_id, similar_id, score, computed_at in db.execute(
+        select(MerkezSimilar.merkez_id, MerkezSimilar.similar_id, MerkezSimilar.score, MerkezSimilar.computed_at).order_by(
+            MerkezSimilar.merkez_id, MerkezSimilar.rank
+        )
+    ):
+        current[merkez_id].append((similar_id, score, computed_at))
+    removed = set(current) - approved
+
+    k = min(k_max, len(rows) - 1)
+    if k >= 1:
+        ids = np.array([row.id for row in rows])
+        vectors = _encode([row[2:] for row in rows])
+    if k < 1:
+        affected: set[int] = set()
+    elif full:
+        affected = set(approved)
+    else:
+        # a commit landing just after its updated_at was read must still count as a change
+        lag = timedelta(seconds=settings.SIMILAR_LAG_SECONDS)
+        changed = {
+            row.id for row in rows
+            if row.id not in current or row.updated_at is None or row.updated_at > current[row.id][0][2] - lag
+        }
+        affected = changed | {
+            merkez_id for merkez_id, neighbours in current.items()
+            if merkez_id in approved and (len(neighbours) < k or any(s in changed or s not in approved for s, _, _ in neighbours))
+        }
+        if changed:
+            thresholds = np.array([current[i][-1][1] if i in current else -np.inf for i in ids.tolist()], dtype=np.float32)
+            positions = np.flatnonzero(np.isin(ids, list(changed)))
+            affected |= set(ids[_beaten(vectors, positions, thresholds)].tolist())
+
+    if not affected and not removed:
+        return 0
+    lists: dict[int, list[tuple[int, float]]] = {}
+    if affected:
+        lists = _top_k(vectors, ids, np.flatnonzero(np.isin(ids, list(affected))), k)
+
+    stale = sorted(affected | removed)
+    for start in range(0, len(stale), 500):
+        db.execute(delete(MerkezSimilar).where(MerkezSimilar.merkez_id.in_(stale[start:start + 500])))
+    values = [
+        {"merkez_id": merkez_id, "rank": rank, "similar_id": similar_id, "score": score, "computed_at": now}
+        for merkez_id, neighbours in lists.items()
+        for rank, (similar_id, score) in enumerate(neighbours)
+    ]
+    if values:
+        db.execute(insert(MerkezSimilar), values)
+    commit(db)
+    for merkez_id in stale:
+        cache.invalidate(similar_namespace(merkez_id))
+    return len(lists)
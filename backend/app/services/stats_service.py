@@ -1,24 +1,31 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, bindparam, or_
 
+from app.core.statements import template
+from app.database import replica_reads
 from app.models.eleve import Eleve
-from app.models.message import Message
+from app.models.message import Message, MessageArchive
 from app.models.planning import Planning
 
+@template
+def _count(model, by_merkez: bool):
+    stmt = select(func.count(model.id))
+    if by_merkez:
+        merkez_id = bindparam("merkez_id")
+        if model in (Message, MessageArchive):
+            stmt = stmt.where(or_(model.sender_merkez_id == merkez_id, model.receiver_merkez_id == merkez_id))
+        else:
+            stmt = stmt.where(model.merkez_id == merkez_id)
+    return stmt
+
+@replica_reads
 def count_eleves(db: Session, merkez_id: int | None = None) -> int:
-    stmt = select(func.count(Eleve.id))
-    if merkez_id is not None:
-        stmt = stmt.where(Eleve.merkez_id == merkez_id)
-    return int(db.execute(stmt).scalar_one())
+    return int(db.execute(_count(Eleve, merkez_id is not None), {"merkez_id": merkez_id}).scalar_one())
 
+@replica_reads
 def count_messages(db: Session, merkez_id: int | None = None) -> int:
-    stmt = select(func.count(Message.id))
-    if merkez_id is not None:
-        stmt = stmt.where((Message.sender_merkez_id == merkez_id) | (Message.receiver_merkez_id == merkez_id))
-    return int(db.execute(stmt).scalar_one())
+    return sum(int(db.execute(_count(model, merkez_id is not None), {"merkez_id": merkez_id}).scalar_one()) for model in (Message, MessageArchive))
 
+@replica_reads
 def count_plannings(db: Session, merkez_id: int | None = None) -> int:
-    stmt = select(func.count(Planning.id))
-    if merkez_id is not None:
-        stmt = stmt.where(Planning.merkez_id == merkez_id)
-    return int(db.execute(stmt).scalar_one())
+    return int(db.execute(_count(Planning, merkez_id is not None), {"merkez_id": merkez_id}).scalar_one())
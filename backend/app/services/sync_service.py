@@ -0,0 +1,122 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete, or_, and_
+
+from app.core.config import settings
+from app.models.eleve import Eleve
+from app.models.message import Message, MessageArchive
+from app.models.planning import Planning
+from app.models.tombstone import Tombstone
+
+# A sync token carries, per entity, the (updated_at, id) of the last row the client has:
+# the next call resumes after it with a keyset scan on (merkez_id, updated_at).
+
+class InvalidSyncToken(ValueError):
+    pass
+
+EPOCH = (datetime(1970, 1, 1), 0)
+ENTITIES = ("eleves", "plannings", "messages", "deleted")
+
+def _sign(payload: bytes) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), payload, hashlib.sha256).hexdigest()[:32]
+
+def encode_token(merkez_id: int, synced_at: datetime, cursors: dict[str, tuple[datetime, int]]) -> str:
+    body = {"m": merkez_id, "t": synced_at.isoformat(), "c": {name: [ts.isoformat(), id_] for name, (ts, id_) in cursors.items()}}
+    payload = base64.urlsafe_b64encode(json.dumps(body, separators=(",", ":")).encode())
+    return f"{payload.decode()}.{_sign(payload)}"
+
+def decode_token(token: str, merkez_id: int) -> tuple[datetime, dict[str, tuple[datetime, int]]]:
+    try:
+        payload, signature = token.encode().rsplit(b".", 1)
+        if not hmac.compare_digest(signature.decode(), _sign(payload)):
+            raise InvalidSyncToken("bad signature")
+        body = json.loads(base64.urlsafe_b64decode(payload))
+        synced_at = datetime.fromisoformat(body["t"])
+        cursors = {name: (datetime.fromisoformat(ts), int(id_)) for name, (ts, id_) in body["c"].items()}
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise InvalidSyncToken("invalid sync token") from exc
+    if body["m"] != merkez_id:
+        raise InvalidSyncToken("sync token belongs to another merkez")
+    return synced_at, cursors
+
+def record_deletions(db: Session, entity: str, rows: list[tuple[int, int]]) -> None:
+    # rows: (entity_id, merkez_id); written in the deleting transaction, committed with it
+    if rows:
+        now = datetime.utcnow()
+        db.execute(insert(Tombstone), [{"entity": entity, "entity_id": e, "merkez_id": m, "deleted_at": now} for e, m in rows])
+
+def purge_tombstones(db: Session, older_than: datetime | None = None) -> int:
+    older_than = older_than or datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = db.execute(delete(Tombstone).where(Tombstone.deleted_at < older_than), execution_options={"synchronize_session": False})
+    db.commit()
+    return result.rowcount
+
+def _after(ts_col, id_col, cursor: tuple[datetime, int]):
+    ts, id_ = cursor
+    # the leading >= gives the planner a range on (merkez_id, updated_at)
+    return and_(ts_col >= ts, or_(ts_col > ts, id_col > id_))
+
+def _changes(db: Session, models, where, cursor, limit: int, ts: str = "updated_at") -> list:
+    # limit + 1 rows per table, merged in (ts, id) order across tables (hot + archive share ids)
+    rows = []
+    for model in models:
+        ts_col = getattr(model, ts)
+        stmt = select(model).where(where(model), _after(ts_col, model.id, cursor)).order_by(ts_col, model.id).limit(limit + 1)
+        rows.extend(db.execute(stmt).scalars())
+    rows.sort(key=lambda r: (getattr(r, ts), r.id))
+    return rows[: limit + 1]
+
+def sync_changes(db: Session, merkez_id: int, since: str | None, limit: int | None = None) -> dict:
+    limit = limit or settings.SYNC_PAGE_SIZE
+    now = datetime.utcnow()
+    high_water = (now - timedelta(seconds=settings.SYNC_LAG_SECONDS), 0)
+    horizon = now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    synced_at, cursors = decode_token(since, merkez_id) if since else (None, {})
+    # last sync older than the tombstone retention: deletions may be gone, start over
+    reset = synced_at is None or synced_at < horizon
+    if reset:
+        cursors = {}
+    cursors = {name: cursors.get(name, EPOCH) for name in ENTITIES}
+
+    found = {
+        "eleves": _changes(db, [Eleve], lambda m: m.merkez_id == merkez_id, cursors["eleves"], limit),
+        "plannings": _changes(db, [Planning], lambda m: m.merkez_id == merkez_id, cursors["plannings"], limit),
+        "messages": _changes(
+            db, [Message, MessageArchive],
+            lambda m: or_(m.sender_merkez_id == merkez_id, m.receiver_merkez_id == merkez_id),
+            cursors["messages"], limit,
+        ),
+        "deleted": [] if reset else _changes(db, [Tombstone], lambda m: m.merkez_id == merkez_id, cursors["deleted"], limit, ts="deleted_at"),
+    }
+
+    has_more = False
+    for name, rows in found.items():
+        ts = "deleted_at" if name == "deleted" else "updated_at"
+        if len(rows) > limit:
+            has_more = True
+            found[name] = rows = rows[:limit]
+            cursors[name] = (getattr(rows[-1], ts), rows[-1].id)
+        elif rows:
+            # rows newer than the high-water mark are sent again next time (late commits)
+            cursors[name] = min((getattr(rows[-1], ts), rows[-1].id), high_water)
+    if reset:
+        # a fresh snapshot has nothing to delete locally: only deletions from now on matter
+        cursors["deleted"] = max(cursors["deleted"], high_water)
+
+    deleted: dict[str, list[int]] = {}
+    for t in found["deleted"]:
+        deleted.setdefault(t.entity, []).append(t.entity_id)
+    return {
+        "token": encode_token(merkez_id, now, cursors),
+        "reset": reset,
+        "has_more": has_more,
+        "eleves": found["eleves"],
+        "plannings": found["plannings"],
+        "messages": found["messages"],
+        "deleted": deleted,
+    }
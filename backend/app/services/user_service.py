@@ -3,17 +3,17 @@ from sqlalchemy import select
 
 from app.models.user import User
 from app.core.security import hash_password, verify_password
+from app.services.write_service import insert_returning
 
 def get_user_by_email(db: Session, email: str) -> User | None:
+    # auth path: never cached, so a password hash never leaves the database and a deactivated or
+    # demoted account loses its rights on its next request (one unique-index lookup)
     stmt = select(User).where(User.email == email)
     return db.execute(stmt).scalars().first()
 
 def create_user(db: Session, email: str, password: str, full_name: str | None = None, is_admin: bool = False) -> User:
-    user = User(email=email, full_name=full_name, hashed_password=hash_password(password), is_admin=is_admin)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    data = {"email": email, "full_name": full_name, "hashed_password": hash_password(password), "is_admin": is_admin}
+    return insert_returning(db, User, data)
 
 def authenticate_user(db: Session, email: str, password: str) -> User | None:
     user = get_user_by_email(db, email=email)
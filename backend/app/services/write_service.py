@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import insert, update
+
+from app.core.cache import deferred_invalidations
+from app.database import engine
+
+# Shared write path: one INSERT/UPDATE ... RETURNING statement per write (plain INSERT/UPDATE
+# plus locally known values on backends without RETURNING, e.g. MySQL) and no refresh SELECT.
+# Writes always run on the primary, so its dialect decides.
+
+def in_batch(db: Session) -> bool:
+    return db.info.get("batch", False)
+
+def commit(db: Session) -> None:
+    # inside batch(): flush only, the batch commits (or rolls back) everything at the end
+    if in_batch(db):
+        db.flush()
+    else:
+        db.commit()
+
+@contextmanager
+def batch(db: Session):
+    # one transaction for several service calls; cache invalidations wait for the commit
+    db.info["batch"] = True
+    try:
+        with deferred_invalidations():
+            try:
+                yield db
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+    finally:
+        db.info.pop("batch", None)
+
+@contextmanager
+def atomic(db: Session):
+    # the writes of one service call in one transaction: its own batch(), or the enclosing one
+    if in_batch(db):
+        yield db
+    else:
+        with batch(db):
+            yield db
+
+def insert_returning(db: Session, model, data: dict):
+    table = model.__table__
+    stmt = insert(table).values(**data)
+    if engine.dialect.insert_returning:
+        values = dict(db.execute(stmt.returning(*table.c)).one()._mapping)
+    else:
+        result = db.execute(stmt)
+        values = dict(result.last_inserted_params())
+        values.update(zip((c.name for c in table.primary_key), result.inserted_primary_key))
+    commit(db)
+
+    obj = model(**values)
+    # persistent in this session with every column loaded, without a SELECT
+    make_transient_to_detached(obj)
+    db.add(obj)
+    return obj
+
+def update_returning(db: Session, obj, data: dict):
+    model = type(obj)
+    table = model.__table__
+    pk = {c.name: getattr(obj, c.name) for c in table.primary_key}
+    stmt = update(table).where(*(table.c[name] == value for name, value in pk.items())).values(**data)
+    if engine.dialect.update_returning:
+        values = dict(db.execute(stmt.returning(*table.c)).one()._mapping)
+    else:
+        db.execute(stmt)
+        values = data
+    commit(db)
+
+    for key, value in values.items():
+        set_committed_value(obj, key, value)
+    return obj
@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tasks import task
+
+# Background tasks handed off by the services with app.core.tasks.enqueue(db, "<name>", payload)
+
+@task()
+def refresh_availability(db: Session, merkez_ids: list[int]) -> None:
+    from app.services.availability_service import refresh_availability as refresh
+
+    refresh(db, merkez_ids, datetime.utcnow())
+
+@task()
+def refresh_similar(db: Session) -> None:
+    from app.services.similarity_service import refresh_similar as refresh
+
+    refresh(db)
+
+@task()
+def purge_merkez(db: Session, merkez_id: int) -> None:
+    from app.services.merkez_purge_service import purge_merkez as purge, schedule_purge
+
+    # bounded per run: a huge merkez is purged over several tasks, the queue keeps moving
+    if not purge(db, merkez_id, max_batches=settings.MERKEZ_PURGE_BATCHES_PER_TASK):
+        schedule_purge(db, merkez_id)
+        db.commit()
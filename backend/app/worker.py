@@ -0,0 +1,33 @@
+"""
+Worker de la file de tâches
+Usage: python -m app.worker [--workers 4]
+
+Runs task workers in the foreground until interrupted. Set TASK_WORKERS=0 on the API
+processes when dedicated workers run the queue.
+"""
+import argparse
+import signal
+import sys
+import threading
+
+from app.core.config import settings
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(settings.TASK_WORKERS, 1))
+    args = parser.parse_args(argv)
+
+    from app import models  # noqa: F401
+    from app.core.tasks import pool
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    pool.start(args.workers)
+    print(f"{args.workers} task workers running as {pool.worker_id}")
+    stop.wait()
+    pool.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
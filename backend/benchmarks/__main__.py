@@ -0,0 +1,121 @@
+"""
+Benchmarks Maraakiz
+Usage:
+    python -m benchmarks generate --size small --database-url sqlite:///./bench.db
+    python -m benchmarks run --database-url sqlite:///./bench.db --output run.json
+    python -m benchmarks compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+def _use_database(url: str | None) -> None:
+    # app.database builds its engine at import time, so this must run before any app import
+    if url:
+        os.environ["DATABASE_URL"] = url
+
+def cmd_generate(args: argparse.Namespace) -> None:
+    _use_database(args.database_url)
+    from app.database import engine
+    from benchmarks.datagen import SIZES, generate
+
+    counts = dict(SIZES[args.size])
+    for key in counts:
+        if getattr(args, key) is not None:
+            counts[key] = getattr(args, key)
+    generate(engine, **counts, chunk_size=args.chunk_size, seed=args.seed, reset=args.reset)
+
+def cmd_run(args: argparse.Namespace) -> None:
+    _use_database(args.database_url)
+    from sqlalchemy import func, select
+
+    from app.database import SessionLocal, engine
+    from app.main import app
+    from app.models import Eleve, Merkez
+    from benchmarks.scenarios import SCENARIOS, Dataset, run_scenario
+
+    with SessionLocal() as db:
+        ds = Dataset(
+            merkez=db.execute(select(func.count(Merkez.id))).scalar_one(),
+            eleves=db.execute(select(func.count(Eleve.id))).scalar_one(),
+        )
+    if not ds.merkez:
+        sys.exit("No data: run `python -m benchmarks generate` first")
+
+    names = list(SCENARIOS) if args.scenario == ["all"] else args.scenario
+    results = {}
+    for name in names:
+        requests = args.requests if name != "login_storm" else min(args.requests, args.login_requests)
+        result = asyncio.run(run_scenario(app, name, ds, requests=requests, concurrency=args.concurrency, seed=args.seed))
+        results[name] = result.summary()
+        s = results[name]
+        print(f"{name:<15} {s['throughput_rps']:>9.1f} req/s  p50 {s['p50_ms']:>7.2f}  p95 {s['p95_ms']:>7.2f}  p99 {s['p99_ms']:>7.2f} ms  errors {s['errors']}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": engine.dialect.name,
+            "dataset": {"merkez": ds.merkez, "eleves": ds.eleves},
+            "python": platform.python_version(),
+            "label": args.label,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)["scenarios"]
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)["scenarios"]
+    metrics = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+    print(f"{'scenario':<15}" + "".join(f"{m:>22}" for m in metrics))
+    for name in sorted(set(before) & set(after)):
+        cells = []
+        for m in metrics:
+            b, a = before[name][m], after[name][m]
+            delta = (a - b) / b * 100 if b else 0.0
+            cells.append(f"{b:>8.1f} -> {a:>7.1f} {delta:+5.0f}%")
+        print(f"{name:<15}" + "".join(f"{c:>22}" for c in cells))
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="Bulk insert a synthetic dataset")
+    gen.add_argument("--database-url")
+    gen.add_argument("--size", choices=["tiny", "small", "medium", "large"], default="small")
+    for key in ("merkez", "eleves", "messages", "plannings"):
+        gen.add_argument(f"--{key}", type=int, help=f"override the number of {key} rows")
+    gen.add_argument("--chunk-size", type=int, default=10_000)
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    gen.set_defaults(func=cmd_generate)
+
+    run = sub.add_parser("run", help="Run scenarios in-process against the ASGI app")
+    run.add_argument("--database-url")
+    run.add_argument("--scenario", nargs="+", default=["all"])
+    run.add_argument("--requests", type=int, default=1000)
+    run.add_argument("--login-requests", type=int, default=200, help="cap for the (bcrypt bound) login storm")
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--label", default="")
+    run.add_argument("--output", help="write machine-readable JSON results here")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="Compare two JSON result files")
+    cmp_.add_argument("before")
+    cmp_.add_argument("after")
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
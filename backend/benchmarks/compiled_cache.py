@@ -0,0 +1,92 @@
+"""
+Coût Python par requête des listes filtrées
+Usage: python -m benchmarks.compiled_cache [--rounds 5]
+
+Runs the public merkez listing for every combination of its nine optional filters against
+an empty SQLite database, once rebuilding the select() per call (as before statement
+templates) and once through the service's template, and reports the time per call and the
+compiled-cache outcome of each. Exits 1 when a warm template call misses the compiled cache
+or is not faster than rebuilding the statement.
+"""
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+VALUES = {
+    "type_enseignement": "coran", "format_cours": "groupe", "mode_enseignement": "en_ligne", "niveau": "debutant",
+    "langue": "francophone", "public_cible": "enfants", "prix_min": 10, "prix_max": 50, "disponibilite_immediate": True,
+}
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="passes over the 512 filter combinations")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/compiled.db"
+    os.environ["CACHE_BACKEND"] = "none"
+
+    from sqlalchemy import select
+
+    from app.core.schema import init_schema
+    from app.core.statements import compiled_cache_stats
+    from app.database import SessionLocal, engine
+    from app.models.merkez import Merkez
+    from app.services.merkez_service import _public_listing
+
+    init_schema(engine)
+
+    def templated(db, skip=0, limit=50, **filters):
+        # the page query of list_public_merkez_filtered, without its result cache and single-flight
+        return list(db.execute(_public_listing(tuple(filters)), {**filters, "skip": skip, "limit": limit}).scalars().all())
+
+    def rebuilt(db, prix_min=None, prix_max=None, disponibilite_immediate=None, skip=0, limit=50, **text_filters):
+        stmt = select(Merkez.id).where(Merkez.is_approved == True)  # noqa: E712
+        for name, value in text_filters.items():
+            stmt = stmt.where(getattr(Merkez, name) == value)
+        if prix_min is not None:
+            stmt = stmt.where(Merkez.prix_min >= prix_min)
+        if prix_max is not None:
+            stmt = stmt.where(Merkez.prix_max <= prix_max)
+        if disponibilite_immediate is not None:
+            stmt = stmt.where(Merkez.disponibilite_immediate == disponibilite_immediate)
+        stmt = stmt.order_by(Merkez.id.desc()).offset(skip).limit(limit)
+        return list(db.execute(stmt).scalars().all())
+
+    combos = [
+        {name: VALUES[name] for name, on in zip(VALUES, mask) if on}
+        for mask in itertools.product((False, True), repeat=len(VALUES))
+    ]
+
+    def measure(fn) -> tuple[float, dict]:
+        with SessionLocal() as db:
+            for filters in combos:  # warm-up: fills the compiled cache (and the templates)
+                fn(db, **filters)
+            compiled_cache_stats.reset()
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                for filters in combos:
+                    fn(db, **filters)
+            per_call = (time.perf_counter() - started) / (args.rounds * len(combos)) * 1e6
+        return per_call, compiled_cache_stats.snapshot()
+
+    results = {"rebuilt select()": measure(rebuilt), "template": measure(templated)}
+    for label, (per_call, stats) in results.items():
+        print(f"{label:<18} {per_call:8.1f} us/call  hits {stats['hits']}  misses {stats['misses']}  hit ratio {stats['hit_ratio']}")
+    (before, _), (after, stats) = results["rebuilt select()"], results["template"]
+    print(f"{'saved':<18} {before - after:8.1f} us/call ({before / after:.2f}x)")
+
+    failed = False
+    if stats["misses"] or stats["no_cache_key"]:
+        print("FAIL  warm template calls missed the compiled cache")
+        failed = True
+    if after >= before:
+        print("FAIL  the template is not faster than rebuilding the statement")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
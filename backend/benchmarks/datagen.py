@@ -0,0 +1,196 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import Engine, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.schema import init_schema
+from app.core.security import hash_password
+from app.database import Base
+from app.models import Abonnement, Eleve, Merkez, Message, Planning, User
+from app.services.availability_service import rebuild_availability
+from app.services.eleve_service import search_keys
+from app.services.similarity_service import refresh_similar
+
+BENCH_PASSWORD = "password123"
+
+SIZES = {
+    "tiny": {"merkez": 100, "eleves": 1_000, "messages": 10_000, "plannings": 5_000},
+    "small": {"merkez": 1_000, "eleves": 10_000, "messages": 100_000, "plannings": 50_000},
+    "medium": {"merkez": 10_000, "eleves": 100_000, "messages": 1_000_000, "plannings": 500_000},
+    "large": {"merkez": 100_000, "eleves": 1_000_000, "messages": 10_000_000, "plannings": 5_000_000},
+}
+
+TYPES_ENSEIGNEMENT = ["coran", "tajwid", "arabe", "fiqh", "aqida", "sira"]
+FORMATS_COURS = ["groupe", "individuel", "binome"]
+MODES_ENSEIGNEMENT = ["en_ligne", "en_presentiel", "en_differe"]
+NIVEAUX = ["debutant", "intermediaire", "avance"]
+LANGUES = ["francophone", "arabophone", "anglophone"]
+PUBLICS_CIBLES = ["enfants", "ados", "hommes", "femmes"]
+PRENOMS = ["Ahmed", "Fatima", "Youssef", "Khadija", "Ibrahim", "Maryam", "Omar", "Aicha", "Bilal", "Sarah"]
+NOMS = ["Benali", "El Amrani", "Haddad", "Diallo", "Mansouri", "Cherif", "Toure", "Kaci", "Saidi", "Bakri"]
+
+def bench_email(i: int) -> str:
+    return f"bench{i}@maraakiz.test"
+
+def _chunks(n: int, size: int) -> Iterator[range]:
+    for start in range(1, n + 1, size):
+        yield range(start, min(start + size, n + 1))
+
+def _fast_load(conn) -> None:
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+    elif conn.dialect.name == "mysql":
+        conn.exec_driver_sql("SET unique_checks=0")
+        conn.exec_driver_sql("SET foreign_key_checks=0")
+
+def generate(
+    engine: Engine,
+    merkez: int,
+    eleves: int,
+    messages: int,
+    plannings: int,
+    chunk_size: int = 10_000,
+    seed: int = 42,
+    reset: bool = False,
+    log=print,
+) -> dict[str, float]:
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    init_schema(engine)
+
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar_one():
+            raise RuntimeError("Database is not empty; use reset=True (--reset) to regenerate")
+
+    rng = random.Random(seed)
+    # one bcrypt hash shared by every synthetic account
+    hashed = hash_password(BENCH_PASSWORD)
+    now = datetime.utcnow().replace(microsecond=0)
+    timings: dict[str, float] = {}
+
+    def load(table, n: int, make_row) -> None:
+        # one transaction per chunk: the WAL/undo log and the locks stay bounded by chunk_size
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            _fast_load(conn)
+            for ids in _chunks(n, chunk_size):
+                conn.execute(insert(table), [make_row(i) for i in ids])
+                conn.commit()
+        timings[table.name] = time.perf_counter() - started
+        log(f"{table.name}: {n} rows in {timings[table.name]:.1f}s")
+
+    load(User.__table__, merkez, lambda i: {
+        "id": i,
+        "email": bench_email(i),
+        "full_name": f"{rng.choice(PRENOMS)} {rng.choice(NOMS)}",
+        "hashed_password": hashed,
+        "is_active": True,
+        "is_admin": False,
+        "created_at": now,
+    })
+
+    def merkez_row(i: int) -> dict:
+        prix_min = rng.randrange(10, 60, 5)
+        return {
+            "id": i,
+            "owner_user_id": i,
+            "nom": f"Institut {rng.choice(NOMS)} {i}",
+            "bio": "Enseignement du Coran et de la langue arabe",
+            "email_public": f"contact{i}@maraakiz.test",
+            "type_enseignement": rng.choice(TYPES_ENSEIGNEMENT),
+            "format_cours": rng.choice(FORMATS_COURS),
+            "mode_enseignement": rng.choice(MODES_ENSEIGNEMENT),
+            "niveau": rng.choice(NIVEAUX),
+            "langue": rng.choice(LANGUES),
+            "public_cible": rng.choice(PUBLICS_CIBLES),
+            "prix_min": prix_min,
+            "prix_max": prix_min + rng.randrange(0, 40, 5),
+            "adherer_credo_case": True,
+            "is_approved": rng.random() < 0.9,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    load(Merkez.__table__, merkez, merkez_row)
+
+    load(Abonnement.__table__, merkez, lambda i: {
+        "id": i,
+        "merkez_id": i,
+        "plan_name": "6e_mois",
+        "start_date": date.today() - timedelta(days=rng.randrange(0, 365)),
+        "end_date": date.today() + timedelta(days=rng.randrange(-60, 180)),
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+    def eleve_row(i: int) -> dict:
+        prenom, nom = rng.choice(PRENOMS), rng.choice(NOMS)
+        row = {
+            "id": i,
+            "merkez_id": rng.randint(1, merkez),
+            "prenom": prenom,
+            "nom": nom,
+            "email": f"{prenom.lower()}.{i}@eleve.test",
+            "niveau": rng.choice(NIVEAUX),
+            "statut": rng.choice(["groupe", "individuel"]),
+            "created_at": now,
+            "updated_at": now,
+        }
+        row.update(search_keys(row))
+        return row
+
+    load(Eleve.__table__, eleves, eleve_row)
+
+    def message_row(i: int) -> dict:
+        created = now - timedelta(seconds=rng.randrange(0, 2 * 365 * 86400))
+        sender = rng.randint(1, merkez)
+        return {
+            "id": i,
+            "sender_merkez_id": sender,
+            "receiver_merkez_id": rng.randint(1, merkez) if merkez > 1 else sender,
+            "content": "Salam, je souhaiterais des informations sur vos cours.",
+            "is_read": rng.random() < 0.7,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    load(Message.__table__, messages, message_row)
+
+    def planning_row(i: int) -> dict:
+        start = now + timedelta(hours=rng.randrange(-365 * 24, 90 * 24))
+        duration = rng.choice([30, 45, 60, 90])
+        available = rng.random() < 0.2
+        return {
+            "id": i,
+            "merkez_id": rng.randint(1, merkez),
+            "eleve_id": None if available or not eleves else rng.randint(1, eleves),
+            "title": "Cours de tajwid",
+            "start_at": start,
+            "end_at": start + timedelta(minutes=duration),
+            "duration_minutes": duration,
+            "is_available_slot": available,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    load(Planning.__table__, plannings, planning_row)
+
+    # disponibilite_immediate / next_available_at are derived from the plannings just loaded
+    with Session(engine) as db:
+        rebuild_availability(db, now)
+        refresh_similar(db, full=True, now=now)
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+        elif conn.dialect.name == "mysql":
+            for table in Base.metadata.sorted_tables:
+                conn.execute(text(f"ANALYZE TABLE {table.name}"))
+    return timings
@@ -0,0 +1,93 @@
+"""
+Recherche d'élèves dans un grand merkez
+Usage: python -m benchmarks.eleve_search [--eleves 50000] [--budget-ms 10]
+
+Fills a throwaway SQLite database with one merkez of --eleves students (generated names, some
+with accents and compound names), then times eleve_service.search_eleves for prefixes of two
+or more characters (the route's minimum), full names, two-word queries and emails. Exits 1 when the p95 of any
+query kind goes over --budget-ms, or when a search misses the student it was built from.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+SYLLABLES = ["a", "ab", "ba", "bi", "da", "di", "el", "fa", "ha", "ib", "ja", "ka", "la", "li", "ma", "mé", "na", "ni", "ou", "ra", "ré", "sa", "si", "ta", "ya", "za", "zé"]
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eleves", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200, help="queries per kind")
+    parser.add_argument("--budget-ms", type=float, default=10.0, help="p95 budget per query kind")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/search.db"
+    os.environ["CACHE_BACKEND"] = "none"
+
+    from datetime import datetime
+
+    from sqlalchemy import insert
+
+    from app.core.schema import init_schema
+    from app.database import SessionLocal, engine
+    from app.models import Eleve, Merkez, User
+    from app.services.eleve_service import search_eleves, search_keys
+
+    init_schema(engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    students = []
+    for i in range(1, args.eleves + 1):
+        prenom = _name(rng)
+        nom = _name(rng) if rng.random() < 0.9 else f"{_name(rng)} {_name(rng)}"
+        students.append({
+            "id": i, "merkez_id": 1, "prenom": prenom, "nom": nom, "email": f"{prenom.lower()}.{i}@eleve.test",
+            "niveau": rng.choice(["debutant", "intermediaire", "avance"]), "statut": rng.choice(["groupe", "individuel"]),
+            "created_at": now, "updated_at": now,
+        })
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__).values(id=1, email="search@maraakiz.test", hashed_password="-", is_active=True, is_admin=False, created_at=now))
+        conn.execute(insert(Merkez.__table__).values(
+            id=1, owner_user_id=1, nom="Recherche", type_enseignement="coran", format_cours="groupe", mode_enseignement="en_ligne",
+            niveau="debutant", langue="francophone", public_cible="enfants", adherer_credo_case=True, is_approved=True, created_at=now, updated_at=now,
+        ))
+        conn.execute(insert(Eleve.__table__), [{**row, **search_keys(row)} for row in students])
+        conn.exec_driver_sql("ANALYZE")
+
+    picks = [rng.choice(students) for _ in range(args.queries)]
+    kinds = {
+        "2 chars": lambda s: s["prenom"][:2],
+        "3 chars": lambda s: s["nom"][:3].upper(),
+        "full nom": lambda s: s["nom"],
+        "nom + prenom": lambda s: f"{s['nom'].split()[0]} {s['prenom'][:3]}",
+        "email": lambda s: s["email"][:-5],
+        "with niveau": lambda s: s["prenom"][:2],
+    }
+
+    failed = False
+    with SessionLocal() as db:
+        for kind, query in kinds.items():
+            timings, missed = [], 0
+            for student in picks:
+                niveau = student["niveau"] if kind == "with niveau" else None
+                started = time.perf_counter()
+                found = search_eleves(db, 1, query(student), niveau=niveau, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+                if len(found) < 20 and student["id"] not in {e.id for e in found}:
+                    missed += 1
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            over = p95 > args.budget_ms
+            failed |= over or bool(missed)
+            print(f"{'FAIL' if over or missed else 'ok':<5} {kind:<13} p50 {statistics.median(timings):6.2f} ms  p95 {p95:6.2f} ms" + (f"  {missed} missed" if missed else ""))
+            db.expunge_all()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Plans d'exécution des requêtes des services
+Usage: python -m benchmarks.explain_plans [--verbose]
+
+Migrates a throwaway SQLite database to head, runs every hot service read once, and
+EXPLAINs each statement it issued. Exits 1 when a plan scans a whole table instead of
+searching an index, or when app.core.schema.SCHEMA_REVISION is not the migrations head.
+Tables are left empty and un-ANALYZEd, so the planner picks plans as for large tables.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+# "SCAN t" / "SCAN t USING INDEX i" read the whole table or index; "SEARCH" is a range lookup.
+FULL_SCAN = re.compile(r"\bSCAN (?!CONSTANT ROW)")
+# Scans of a derived table (anon_N) are only accepted for the queries listed here, whose
+# subqueries are LIMITed index range reads (their own plan lines are checked as usual)
+DERIVED_SCAN = re.compile(r"\bSCAN anon_\d+$")
+BOUNDED_DERIVED = {"eleve search", "eleve search two words"}
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/plans.db"
+    os.environ["CACHE_BACKEND"] = "none"
+
+    from app.core.profiling import profiler
+    from app.core.schema import SCHEMA_REVISION, head_revision, init_schema
+    from app.core.tasks import enqueue, pool, purge_finished
+    from app.database import SessionLocal, engine
+    from app.services import abonnement_service, availability_service, dashboard_service, eleve_service, feed_service, merkez_purge_service, merkez_service
+    from app.services import message_archive_service, messages_service, planning_service, similarity_service, stats_service, sync_service, user_service
+
+    init_schema(engine)
+    profiler.install(engine)
+    now = datetime.utcnow()
+    sync_token = sync_service.encode_token(1, now, {name: (now, 1) for name in sync_service.ENTITIES})
+
+    queries = {
+        "public listing": lambda db: merkez_service.list_public_merkez_filtered(db),
+        "public listing by type": lambda db: merkez_service.list_public_merkez_filtered(db, type_enseignement="coran"),
+        "public listing available": lambda db: merkez_service.list_public_merkez_filtered(db, disponibilite_immediate=True),
+        "public listing by type + filters": lambda db: merkez_service.list_public_merkez_filtered(db, type_enseignement="coran", niveau="debutant", langue="francophone"),
+        "public profile": lambda db: merkez_service.get_public_merkez(db, 1),
+        "similar merkez": lambda db: similarity_service.list_similar(db, 1),
+        "user by email": lambda db: user_service.get_user_by_email(db, "prof@maraakiz.com"),
+        "eleves of merkez": lambda db: eleve_service.list_eleves(db, merkez_id=1),
+        "eleves of merkez by niveau": lambda db: eleve_service.list_eleves(db, merkez_id=1, niveau="debutant", statut="groupe"),
+        "eleve search": lambda db: eleve_service.search_eleves(db, 1, "Élo"),
+        "eleve search two words": lambda db: eleve_service.search_eleves(db, 1, "ben ali", niveau="debutant"),
+        "plannings of merkez": lambda db: planning_service.list_plannings(db, merkez_id=1),
+        "plannings of eleve": lambda db: planning_service.list_plannings(db, eleve_id=1),
+        "plannings of merkez in a week": lambda db: planning_service.list_plannings(db, merkez_id=1, start=now, end=now + timedelta(weeks=1)),
+        "calendar feed validators": lambda db: feed_service.feed_validators(db, 1),
+        "calendar feed validators of eleve": lambda db: feed_service.feed_validators(db, 1, 1),
+        "calendar feed": lambda db: list(feed_service.render_feed(1, None, "feed")),
+        "calendar feed of eleve": lambda db: list(feed_service.render_feed(1, 1, "feed")),
+        "inbox": lambda db: messages_service.list_messages_for_merkez(db, 1),
+        "conversation": lambda db: messages_service.list_conversation(db, 1, 2),
+        "abonnements of merkez": lambda db: abonnement_service.list_abonnements(db, merkez_id=1),
+        "active abonnement flag": lambda db: abonnement_service.has_active_abonnement(db, 1),
+        "abonnement expiry sweep": lambda db: abonnement_service.deactivate_expired_abonnements(db, date.today()),
+        "availability refresh": lambda db: availability_service.refresh_availability(db, [1, 2], now),
+        "availability sweep": lambda db: availability_service.sweep_availability(db, now),
+        "message archival": lambda db: message_archive_service.archive_messages(db, now),
+        "count eleves": lambda db: stats_service.count_eleves(db, merkez_id=1),
+        "count messages": lambda db: stats_service.count_messages(db, merkez_id=1),
+        "count plannings": lambda db: stats_service.count_plannings(db, merkez_id=1),
+        "dashboard stats": lambda db: dashboard_service._stats(db, 1, 0),
+        "sync delta": lambda db: sync_service.sync_changes(db, 1, sync_token),
+        "tombstone purge": lambda db: sync_service.purge_tombstones(db, now),
+        "task enqueue": lambda db: (enqueue(db, "refresh_availability", {"merkez_ids": [1]}, dedup_key="availability:1"), db.commit()),
+        "task claim and run": lambda db: pool.run_once(),
+        "task purge": lambda db: purge_finished(db, now),
+        "merkez delete estimate": lambda db: merkez_purge_service.count_children(db, 1, 10),
+        "merkez purge sweep": lambda db: merkez_purge_service.sweep_deleted(db),
+    }
+
+    failed = False
+    head = head_revision()
+    if head != SCHEMA_REVISION:
+        print(f"FAIL  SCHEMA_REVISION is {SCHEMA_REVISION!r} but the migrations head is {head!r}")
+        failed = True
+
+    with engine.connect() as conn:
+        for label, run in queries.items():
+            with SessionLocal() as db, profiler.collect(label) as profile:
+                run(db)
+            plans = []
+            for query in profile.queries:
+                if not query.statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT")):
+                    continue
+                parameters = query.parameters
+                if isinstance(parameters, list):  # executemany: one parameter set is enough
+                    parameters = parameters[0]
+                cursor = conn.connection.dbapi_connection.cursor()
+                cursor.execute("EXPLAIN QUERY PLAN " + query.statement, parameters)
+                plans.append((query.shape, [row[-1] for row in cursor.fetchall()]))
+                cursor.close()
+            scans = [
+                (shape, line) for shape, lines in plans for line in lines
+                if FULL_SCAN.search(line) and not (label in BOUNDED_DERIVED and DERIVED_SCAN.search(line))
+            ]
+            failed |= bool(scans)
+            print(f"{'FAIL' if scans else 'ok':<5} {label} ({len(plans)} statements)")
+            for shape, lines in plans if args.verbose else []:
+                print(f"        {shape}\n          " + "\n          ".join(lines))
+            for shape, line in scans:
+                print(f"        {line}\n          in {shape}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+import httpx
+
+from benchmarks.datagen import (
+    BENCH_PASSWORD,
+    FORMATS_COURS,
+    LANGUES,
+    MODES_ENSEIGNEMENT,
+    NIVEAUX,
+    TYPES_ENSEIGNEMENT,
+    bench_email,
+)
+
+@dataclass
+class Dataset:
+    merkez: int
+    eleves: int
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    params: dict | None = None
+    data: dict | None = None
+
+def public_search(rng: random.Random, ds: Dataset) -> Request:
+    filters = {
+        "type_enseignement": rng.choice(TYPES_ENSEIGNEMENT),
+        "format_cours": rng.choice(FORMATS_COURS),
+        "mode_enseignement": rng.choice(MODES_ENSEIGNEMENT),
+        "niveau": rng.choice(NIVEAUX),
+        "langue": rng.choice(LANGUES),
+        "disponibilite_immediate": rng.choice(["true", "false"]),
+        "prix_max": rng.randrange(30, 100, 10),
+    }
+    picked = dict(rng.sample(sorted(filters.items()), rng.randint(0, 3)))
+    picked["skip"] = rng.choice([0, 0, 0, 50, 100])
+    return Request("GET", "/api/public/merkez", params=picked)
+
+def inbox(rng: random.Random, ds: Dataset) -> Request:
+    return Request("GET", "/api/messages", params={"merkez_id": rng.randint(1, ds.merkez), "limit": 50})
+
+def calendar_week(rng: random.Random, ds: Dataset) -> Request:
+    # one week of the datagen span (a year back, 90 days ahead), Monday to Monday
+    today = date.today()
+    monday = datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time())
+    start = monday + timedelta(weeks=rng.randint(-52, 12))
+    params = {"merkez_id": rng.randint(1, ds.merkez), "start": start.isoformat(), "end": (start + timedelta(weeks=1)).isoformat()}
+    return Request("GET", "/api/plannings", params=params)
+
+def login_storm(rng: random.Random, ds: Dataset) -> Request:
+    return Request("POST", "/api/auth/login", data={"username": bench_email(rng.randint(1, ds.merkez)), "password": BENCH_PASSWORD})
+
+SCENARIOS: dict[str, Callable[[random.Random, Dataset], Request]] = {
+    "public_search": public_search,
+    "inbox": inbox,
+    "calendar_week": calendar_week,
+    "login_storm": login_storm,
+}
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    concurrency: int
+    duration_s: float
+    latencies_ms: list[float] = field(default_factory=list, repr=False)
+    errors: int = 0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "concurrency": self.concurrency,
+            "errors": self.errors,
+            "duration_s": round(self.duration_s, 3),
+            "throughput_rps": round(self.requests / self.duration_s, 1) if self.duration_s else 0.0,
+            "mean_ms": round(sum(self.latencies_ms) / len(self.latencies_ms), 2) if self.latencies_ms else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(max(self.latencies_ms), 2) if self.latencies_ms else 0.0,
+        }
+
+async def run_scenario(app, name: str, ds: Dataset, requests: int, concurrency: int, seed: int = 42) -> ScenarioResult:
+    make_request = SCENARIOS[name]
+    rng = random.Random(seed)
+    planned = [make_request(rng, ds) for _ in range(requests)]
+    result = ScenarioResult(name=name, requests=requests, concurrency=concurrency, duration_s=0.0)
+    queue: asyncio.Queue[Request] = asyncio.Queue()
+    for req in planned:
+        queue.put_nowait(req)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker() -> None:
+            while not queue.empty():
+                req = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    resp = await client.request(req.method, req.url, params=req.params, data=req.data)
+                    if resp.status_code >= 400:
+                        result.errors += 1
+                except Exception:  # noqa: BLE001 - counted as an error, the run continues
+                    result.errors += 1
+                result.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        result.duration_s = time.perf_counter() - started
+    return result
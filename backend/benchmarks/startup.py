@@ -0,0 +1,98 @@
+"""
+Budget de démarrage
+Usage: python -m benchmarks.startup [--import-budget-ms 100] [--first-request-budget-ms 800]
+
+Exits 1 when `import app.main` (measured with -X importtime) or a cold start up to the
+first served request exceeds its budget, or when an optional subsystem is imported eagerly.
+Budgets are what the app adds on top of `import fastapi`, measured in the same run, so they
+hold on slower machines (the framework alone takes 400-700 ms).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Optional subsystems that must only load on first use
+LAZY_MODULES = ["passlib", "jose", "app.core.profiling", "numpy"]
+
+FIRST_REQUEST = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import fastapi
+framework = time.perf_counter()
+from app.main import app
+
+async def main():
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+             "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)}
+    await app(scope, receive, send)
+    assert messages[0]["status"] == 200, messages[0]
+
+asyncio.run(main())
+ms = (time.perf_counter() - framework) * 1000
+print(json.dumps({"ms": ms, "framework_ms": (framework - started) * 1000, "eager": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./startup-check.db")
+    return env
+
+def import_times(module: str = "app.main") -> dict[str, int]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+def first_request() -> dict:
+    proc = subprocess.run([sys.executable, "-c", FIRST_REQUEST], capture_output=True, text=True, env=_env(), check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--import-budget-ms", type=float, default=100, help="over import fastapi")
+    parser.add_argument("--first-request-budget-ms", type=float, default=800, help="over import fastapi")
+    parser.add_argument("--runs", type=int, default=3, help="best of N, to skip cold .pyc compilation")
+    args = parser.parse_args(argv)
+
+    # each run subtracts its own `import fastapi`, so machine load hits both sides alike
+    failures = []
+    runs = [import_times() for _ in range(args.runs)]
+    framework_ms = min(r["fastapi"] for r in runs) / 1000
+    import_ms = min(r["app.main"] - r["fastapi"] for r in runs) / 1000
+    print(f"import fastapi: {framework_ms:.0f} ms (baseline)")
+    print(f"import app.main: +{import_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    if import_ms > args.import_budget_ms:
+        failures.append("import budget exceeded")
+    eager = [m for m in LAZY_MODULES if m in runs[-1]]
+
+    firsts = [first_request() for _ in range(args.runs)]
+    first_ms = min(r["ms"] for r in firsts)
+    print(f"cold start to first request: +{first_ms:.0f} ms (budget {args.first_request_budget_ms:.0f} ms)")
+    if first_ms > args.first_request_budget_ms:
+        failures.append("first request budget exceeded")
+    eager += [m for m in firsts[-1]["eager"] if m not in eager]
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
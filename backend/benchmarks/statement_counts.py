@@ -0,0 +1,139 @@
+"""
+Nombre de requêtes SQL par endpoint
+Usage: python -m benchmarks.statement_counts
+
+Runs every write endpoint once against a throwaway SQLite database and exits 1 when the
+number of SQL statements differs from the pinned value (a refresh SELECT after a write
+would show up here as one extra statement). Then runs the read endpoints over several rows
+under app.core.profiling.query_budget: a per-row query (N+1) exceeds its budget.
+"""
+import os
+import sys
+import tempfile
+
+# statements per request: lookups the route needs + exactly one write statement
+EXPECTED = {
+    "POST /api/auth/register": 2,
+    "POST /api/merkez": 1,
+    "PATCH /api/merkez/{id}": 3,  # + the similar lists showing the merkez, to invalidate them
+    "POST /api/eleves": 1,
+    "PATCH /api/eleves/{id}": 2,
+    "POST /api/plannings": 2,  # + the eleve name of the response, as GET
+    "PATCH /api/plannings/{id}": 3,
+    "POST /api/messages": 2,  # + the merkez names of the response, as GET
+    "PATCH /api/messages/{id}/read": 3,
+    "POST /api/abonnements": 1,
+    "PATCH /api/abonnements/{id}": 2,
+}
+
+# read endpoints: at most this many statements, with READ_ROWS rows of each kind listed
+# (a per-row lookup would add READ_ROWS more)
+BUDGETS = {
+    "GET /api/merkez/{id}": 1,
+    "GET /api/eleves": 1,
+    "GET /api/plannings": 2,  # + eleve names, one batched query
+    "GET /api/messages": 3,  # hot table, archive, merkez names
+    "GET /api/messages/conversation": 4,
+    "GET /api/abonnements": 2,
+    "GET /api/public/merkez": 2,  # page ids, then the rows missing from the profile cache
+    "GET /api/public/merkez/{id}": 1,
+    "GET /api/public/merkez/{id}/similar": 1,
+    "GET /api/merkez/{id}/dashboard": 8,
+    "GET /api/sync": 6,
+}
+READ_ROWS = 5
+
+def main() -> int:
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/statements.db"
+
+    from fastapi.testclient import TestClient
+
+    from app.core.profiling import QueryBudgetExceeded, profiler, query_budget
+    from app.core.schema import init_schema
+    from app.database import SessionLocal, engine
+    from app.main import create_app
+    from app.services.similarity_service import refresh_similar
+
+    init_schema(engine)
+    profiler.install(engine)
+    client = TestClient(create_app())
+    merkez = {
+        "nom": "Institut Test", "type_enseignement": "coran", "format_cours": "groupe",
+        "mode_enseignement": "en_ligne", "niveau": "debutant", "langue": "francophone", "public_cible": "enfants",
+    }
+
+    counts: dict[str, int] = {}
+
+    def call(label: str, method: str, url: str, **kwargs) -> dict:
+        with profiler.collect(label) as profile:
+            resp = client.request(method, url, **kwargs)
+        resp.raise_for_status()
+        counts[label] = profile.count
+        return resp.json()
+
+    user = call("POST /api/auth/register", "POST", "/api/auth/register", json={"email": "prof@maraakiz.com", "password": "secret123"})
+    m = call("POST /api/merkez", "POST", "/api/merkez", json={**merkez, "owner_user_id": user["id"]})
+    call("PATCH /api/merkez/{id}", "PATCH", f"/api/merkez/{m['id']}", json={"bio": "Nouvelle bio"})
+    e = call("POST /api/eleves", "POST", "/api/eleves", json={"merkez_id": m["id"], "prenom": "Ali", "nom": "Haddad", "niveau": "debutant", "statut": "groupe"})
+    call("PATCH /api/eleves/{id}", "PATCH", f"/api/eleves/{e['id']}", json={"niveau": "avance"})
+    p = call("POST /api/plannings", "POST", "/api/plannings", json={
+        "merkez_id": m["id"], "eleve_id": e["id"], "title": "Tajwid",
+        "start_at": "2030-01-01T10:00:00", "end_at": "2030-01-01T11:00:00",
+    })
+    call("PATCH /api/plannings/{id}", "PATCH", f"/api/plannings/{p['id']}", json={"title": "Tajwid avancé"})
+    msg = call("POST /api/messages", "POST", "/api/messages", json={"sender_merkez_id": m["id"], "receiver_merkez_id": m["id"], "content": "Salam"})
+    call("PATCH /api/messages/{id}/read", "PATCH", f"/api/messages/{msg['id']}/read")
+    a = call("POST /api/abonnements", "POST", "/api/abonnements", json={"merkez_id": m["id"], "start_date": "2030-01-01"})
+    call("PATCH /api/abonnements/{id}", "PATCH", f"/api/abonnements/{a['id']}", json={"plan_name": "annuel"})
+
+    failed = False
+    for label, expected in EXPECTED.items():
+        status = "ok" if counts.get(label) == expected else "FAIL"
+        failed |= status == "FAIL"
+        print(f"{status:<5} {label:<32} {counts.get(label)} statements (expected {expected})")
+
+    # several rows of everything the read endpoints list, from several approved merkez
+    approved = {"is_approved": True, "adherer_credo_case": True}
+    client.patch(f"/api/merkez/{m['id']}", json=approved).raise_for_status()
+    for i in range(READ_ROWS):
+        other = client.post("/api/auth/register", json={"email": f"autre{i}@maraakiz.com", "password": "secret123"}).json()
+        m2 = client.post("/api/merkez", json={**merkez, "nom": f"Institut {i}", "owner_user_id": other["id"]}).json()
+        client.patch(f"/api/merkez/{m2['id']}", json=approved).raise_for_status()
+        eleve = client.post("/api/eleves", json={"merkez_id": m["id"], "prenom": f"Eleve{i}", "nom": "Test", "niveau": "debutant", "statut": "groupe"}).json()
+        client.post("/api/plannings", json={
+            "merkez_id": m["id"], "eleve_id": eleve["id"], "title": f"Cours {i}",
+            "start_at": f"2030-01-0{i + 2}T10:00:00", "end_at": f"2030-01-0{i + 2}T11:00:00",
+        }).raise_for_status()
+        client.post("/api/messages", json={"sender_merkez_id": m2["id"], "receiver_merkez_id": m["id"], "content": f"Message {i}"}).raise_for_status()
+        client.post("/api/abonnements", json={"merkez_id": m["id"], "start_date": "2030-01-01"}).raise_for_status()
+    for i in range(READ_ROWS):
+        client.post("/api/messages", json={"sender_merkez_id": m["id"], "receiver_merkez_id": m2["id"], "content": f"Réponse {i}"}).raise_for_status()
+    with SessionLocal() as db:
+        refresh_similar(db, full=True)
+
+    reads = {
+        "GET /api/merkez/{id}": f"/api/merkez/{m['id']}",
+        "GET /api/eleves": f"/api/eleves?merkez_id={m['id']}",
+        "GET /api/plannings": f"/api/plannings?merkez_id={m['id']}",
+        "GET /api/messages": f"/api/messages?merkez_id={m['id']}",
+        "GET /api/messages/conversation": f"/api/messages/conversation?merkez_a={m['id']}&merkez_b={m2['id']}",
+        "GET /api/abonnements": f"/api/abonnements?merkez_id={m['id']}",
+        "GET /api/public/merkez": "/api/public/merkez",
+        "GET /api/public/merkez/{id}": f"/api/public/merkez/{m['id']}",
+        "GET /api/public/merkez/{id}/similar": f"/api/public/merkez/{m['id']}/similar",
+        "GET /api/merkez/{id}/dashboard": f"/api/merkez/{m['id']}/dashboard",
+        "GET /api/sync": f"/api/sync?merkez_id={m['id']}",
+    }
+    for label, budget in BUDGETS.items():
+        try:
+            with query_budget(budget, label) as profile:
+                client.get(reads[label]).raise_for_status()
+            print(f"ok    {label:<36} {profile.count} statements (budget {budget})")
+        except QueryBudgetExceeded as exc:
+            failed = True
+            print(f"FAIL  {exc}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
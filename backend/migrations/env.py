@@ -0,0 +1,43 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+import app.models  # noqa: F401 - registers every table on Base.metadata
+from app.core.config import settings
+from app.database import Base, _create_engine
+
+config = context.config
+# app.core.schema passes its engine in and keeps the app's logging as is
+bind = config.attributes.get("engine")
+if bind is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline() -> None:
+    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connectable = bind if bind is not None else _create_engine(settings.DATABASE_URL)
+    with connectable.connect() as connection:
+        sqlite = connection.dialect.name == "sqlite"
+        if sqlite:
+            # a batch rebuild drops and recreates the table: with foreign keys enforced, the
+            # DROP would cascade into (or be refused by) the child tables. Only takes effect
+            # outside a transaction, hence the commit.
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+        # SQLite cannot ALTER most things: batch mode rebuilds the table instead
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=sqlite)
+        with context.begin_transaction():
+            context.run_migrations()
+        if sqlite:
+            connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+            connection.commit()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
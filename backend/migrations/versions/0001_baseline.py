@@ -0,0 +1,139 @@
+"""baseline: the schema create_all produced before the schema_version table existed
+
+Revision ID: 0001
+Revises:
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('full_name', sa.String(length=255), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_admin', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_table('merkez',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_user_id', sa.Integer(), nullable=False),
+    sa.Column('nom', sa.String(length=255), nullable=False),
+    sa.Column('photo_url', sa.String(length=500), nullable=True),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('email_public', sa.String(length=255), nullable=True),
+    sa.Column('type_enseignement', sa.String(length=255), nullable=False),
+    sa.Column('format_cours', sa.String(length=255), nullable=False),
+    sa.Column('mode_enseignement', sa.String(length=255), nullable=False),
+    sa.Column('niveau', sa.String(length=255), nullable=False),
+    sa.Column('langue', sa.String(length=255), nullable=False),
+    sa.Column('public_cible', sa.String(length=255), nullable=False),
+    sa.Column('prix_min', sa.Integer(), nullable=False),
+    sa.Column('prix_max', sa.Integer(), nullable=False),
+    sa.Column('disponibilite_immediate', sa.Boolean(), nullable=False),
+    sa.Column('cursus', sa.Text(), nullable=True),
+    sa.Column('livres_programmes', sa.Text(), nullable=True),
+    sa.Column('adherer_credo_case', sa.Boolean(), nullable=False),
+    sa.Column('is_approved', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('owner_user_id')
+    )
+    op.create_index('ix_merkez_id', 'merkez', ['id'], unique=False)
+    op.create_table('abonnements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('merkez_id', sa.Integer(), nullable=False),
+    sa.Column('plan_name', sa.String(length=120), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['merkez_id'], ['merkez.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_abonnements_id', 'abonnements', ['id'], unique=False)
+    op.create_index('ix_abonnements_merkez_id', 'abonnements', ['merkez_id'], unique=False)
+    op.create_table('eleves',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('merkez_id', sa.Integer(), nullable=False),
+    sa.Column('prenom', sa.String(length=120), nullable=False),
+    sa.Column('nom', sa.String(length=120), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('niveau', sa.String(length=120), nullable=False),
+    sa.Column('statut', sa.String(length=120), nullable=False),
+    sa.Column('remarques', sa.Text(), nullable=True),
+    sa.Column('lien_visio', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['merkez_id'], ['merkez.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_eleves_id', 'eleves', ['id'], unique=False)
+    op.create_index('ix_eleves_merkez_id', 'eleves', ['merkez_id'], unique=False)
+    op.create_table('messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sender_merkez_id', sa.Integer(), nullable=False),
+    sa.Column('receiver_merkez_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['receiver_merkez_id'], ['merkez.id'], ),
+    sa.ForeignKeyConstraint(['sender_merkez_id'], ['merkez.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_messages_id', 'messages', ['id'], unique=False)
+    op.create_index('ix_messages_receiver_merkez_id', 'messages', ['receiver_merkez_id'], unique=False)
+    op.create_index('ix_messages_sender_merkez_id', 'messages', ['sender_merkez_id'], unique=False)
+    op.create_table('plannings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('merkez_id', sa.Integer(), nullable=False),
+    sa.Column('eleve_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=False),
+    sa.Column('end_at', sa.DateTime(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('is_available_slot', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['eleve_id'], ['eleves.id'], ),
+    sa.ForeignKeyConstraint(['merkez_id'], ['merkez.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_plannings_eleve_id', 'plannings', ['eleve_id'], unique=False)
+    op.create_index('ix_plannings_id', 'plannings', ['id'], unique=False)
+    op.create_index('ix_plannings_merkez_id', 'plannings', ['merkez_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_plannings_merkez_id', table_name='plannings')
+    op.drop_index('ix_plannings_id', table_name='plannings')
+    op.drop_index('ix_plannings_eleve_id', table_name='plannings')
+    op.drop_table('plannings')
+    op.drop_index('ix_messages_sender_merkez_id', table_name='messages')
+    op.drop_index('ix_messages_receiver_merkez_id', table_name='messages')
+    op.drop_index('ix_messages_id', table_name='messages')
+    op.drop_table('messages')
+    op.drop_index('ix_eleves_merkez_id', table_name='eleves')
+    op.drop_index('ix_eleves_id', table_name='eleves')
+    op.drop_table('eleves')
+    op.drop_index('ix_abonnements_merkez_id', table_name='abonnements')
+    op.drop_index('ix_abonnements_id', table_name='abonnements')
+    op.drop_table('abonnements')
+    op.drop_index('ix_merkez_id', table_name='merkez')
+    op.drop_table('merkez')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
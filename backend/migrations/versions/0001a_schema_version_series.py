@@ -0,0 +1,67 @@
+"""objects the create_all schema gained through schema_version 1-4
+
+Revision ID: 0001a
+Revises: 0001
+
+Pre-migration databases are stamped at 0001 whatever schema_version they reached, so every
+object here is only created when missing; a baseline database also gets next_available_at
+computed from its upcoming slots.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# (table, index, columns)
+INDEXES = [
+    ('merkez', 'ix_merkez_next_available_at', ['next_available_at']),
+    ('merkez', 'ix_merkez_approved_dispo', ['is_approved', 'disponibilite_immediate']),
+    ('abonnements', 'ix_abonnements_active_end', ['is_active', 'end_date']),
+    ('messages', 'ix_messages_created_at', ['created_at']),
+    ('messages_archive', 'ix_messages_archive_id', ['id']),
+    ('messages_archive', 'ix_messages_archive_sender_merkez_id', ['sender_merkez_id']),
+    ('messages_archive', 'ix_messages_archive_receiver_merkez_id', ['receiver_merkez_id']),
+    ('messages_archive', 'ix_messages_archive_created_at', ['created_at']),
+    ('plannings', 'ix_plannings_merkez_slot_start', ['merkez_id', 'is_available_slot', 'start_at']),
+]
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'next_available_at' not in {c['name'] for c in inspector.get_columns('merkez')}:
+        op.add_column('merkez', sa.Column('next_available_at', sa.DateTime(), nullable=True))
+        op.execute(
+            "UPDATE merkez SET next_available_at = (SELECT MIN(p.start_at) FROM plannings p"
+            " WHERE p.merkez_id = merkez.id AND p.is_available_slot = 1 AND p.start_at > CURRENT_TIMESTAMP)"
+        )
+        op.execute("UPDATE merkez SET disponibilite_immediate = (next_available_at IS NOT NULL)")
+    if not inspector.has_table('messages_archive'):
+        op.create_table('messages_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sender_merkez_id', sa.Integer(), nullable=False),
+        sa.Column('receiver_merkez_id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['receiver_merkez_id'], ['merkez.id'], ),
+        sa.ForeignKeyConstraint(['sender_merkez_id'], ['merkez.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    existing = {
+        table: {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+        for table in {table for table, _, _ in INDEXES}
+    }
+    for table, name, columns in INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, columns, unique=False)
+
+def downgrade() -> None:
+    for table, name, _ in reversed(INDEXES):
+        if table != 'messages_archive':
+            op.drop_index(name, table_name=table)
+    op.drop_table('messages_archive')
+    with op.batch_alter_table('merkez') as batch_op:
+        batch_op.drop_column('next_available_at')
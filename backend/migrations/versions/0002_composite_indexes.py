@@ -0,0 +1,51 @@
+"""composite indexes matched to the service queries
+
+Revision ID: 0002
+Revises: 0001a
+
+Single-column foreign key indexes are replaced by composites starting with the same column;
+every composite is created before the index it replaces is dropped (MySQL keeps an index
+behind each foreign key).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001a'
+branch_labels = None
+depends_on = None
+
+# (table, new index, columns, replaced single-column indexes)
+INDEXES = [
+    ('plannings', 'ix_plannings_merkez_start', ['merkez_id', 'start_at'], ['ix_plannings_merkez_id']),
+    ('plannings', 'ix_plannings_eleve_start', ['eleve_id', 'start_at'], ['ix_plannings_eleve_id']),
+    ('messages', 'ix_messages_sender_receiver_created', ['sender_merkez_id', 'receiver_merkez_id', 'created_at'], ['ix_messages_sender_merkez_id']),
+    ('messages', 'ix_messages_receiver_created', ['receiver_merkez_id', 'created_at'], ['ix_messages_receiver_merkez_id']),
+    ('messages_archive', 'ix_messages_archive_sender_receiver_created', ['sender_merkez_id', 'receiver_merkez_id', 'created_at'], ['ix_messages_archive_sender_merkez_id']),
+    ('messages_archive', 'ix_messages_archive_receiver_created', ['receiver_merkez_id', 'created_at'], ['ix_messages_archive_receiver_merkez_id']),
+    ('merkez', 'ix_merkez_approved_id', ['is_approved', 'id'], []),
+    ('merkez', 'ix_merkez_approved_type', ['is_approved', 'type_enseignement', 'id'], []),
+    ('eleves', 'ix_eleves_merkez_id_id', ['merkez_id', 'id'], ['ix_eleves_merkez_id']),
+]
+
+def upgrade() -> None:
+    for table, name, columns, _ in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    for table, _, columns, replaced in INDEXES:
+        for old in replaced:
+            op.drop_index(old, table_name=table)
+    # ordered listing on the availability filter
+    op.drop_index('ix_merkez_approved_dispo', table_name='merkez')
+    op.create_index('ix_merkez_approved_dispo', 'merkez', ['is_approved', 'disponibilite_immediate', 'id'], unique=False)
+    # the pre-migration version stamp
+    if sa.inspect(op.get_bind()).has_table('schema_version'):
+        op.drop_table('schema_version')
+
+def downgrade() -> None:
+    op.drop_index('ix_merkez_approved_dispo', table_name='merkez')
+    op.create_index('ix_merkez_approved_dispo', 'merkez', ['is_approved', 'disponibilite_immediate'], unique=False)
+    for table, _, columns, replaced in INDEXES:
+        for old in replaced:
+            op.create_index(old, table, columns[:1], unique=False)
+    for table, name, _, _ in INDEXES:
+        op.drop_index(name, table_name=table)
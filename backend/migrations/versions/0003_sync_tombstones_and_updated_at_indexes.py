@@ -0,0 +1,41 @@
+"""sync tombstones and updated_at indexes
+
+Revision ID: 0003
+Revises: 0002
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('merkez_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'], unique=False)
+    op.create_index('ix_tombstones_merkez_deleted', 'tombstones', ['merkez_id', 'deleted_at'], unique=False)
+    op.create_index('ix_eleves_merkez_updated', 'eleves', ['merkez_id', 'updated_at'], unique=False)
+    op.create_index('ix_messages_receiver_updated', 'messages', ['receiver_merkez_id', 'updated_at'], unique=False)
+    op.create_index('ix_messages_sender_updated', 'messages', ['sender_merkez_id', 'updated_at'], unique=False)
+    op.create_index('ix_messages_archive_receiver_updated', 'messages_archive', ['receiver_merkez_id', 'updated_at'], unique=False)
+    op.create_index('ix_messages_archive_sender_updated', 'messages_archive', ['sender_merkez_id', 'updated_at'], unique=False)
+    op.create_index('ix_plannings_merkez_updated', 'plannings', ['merkez_id', 'updated_at'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_plannings_merkez_updated', table_name='plannings')
+    op.drop_index('ix_messages_archive_sender_updated', table_name='messages_archive')
+    op.drop_index('ix_messages_archive_receiver_updated', table_name='messages_archive')
+    op.drop_index('ix_messages_sender_updated', table_name='messages')
+    op.drop_index('ix_messages_receiver_updated', table_name='messages')
+    op.drop_index('ix_eleves_merkez_updated', table_name='eleves')
+    op.drop_index('ix_tombstones_merkez_deleted', table_name='tombstones')
+    op.drop_index('ix_tombstones_deleted_at', table_name='tombstones')
+    op.drop_table('tombstones')
@@ -0,0 +1,29 @@
+"""merkez_similar: precomputed similar institutes
+
+Revision ID: 0004
+Revises: 0003
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('merkez_similar',
+    sa.Column('merkez_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('similar_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['merkez_id'], ['merkez.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_id'], ['merkez.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('merkez_id', 'rank')
+    )
+    op.create_index('ix_merkez_similar_similar_id', 'merkez_similar', ['similar_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_merkez_similar_similar_id', table_name='merkez_similar')
+    op.drop_table('merkez_similar')
@@ -0,0 +1,43 @@
+"""merkez: ON DELETE CASCADE on every child foreign key, deleted_at for chunked purges
+
+Revision ID: 0006
+Revises: 0005
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# The baseline created these foreign keys unnamed: SQLite batch mode names them with this
+# convention when it reflects the table, other databases report their own names.
+NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+FOREIGN_KEYS = {
+    'eleves': [('merkez_id', 'merkez')],
+    'plannings': [('merkez_id', 'merkez'), ('eleve_id', 'eleves')],
+    'abonnements': [('merkez_id', 'merkez')],
+    'messages': [('sender_merkez_id', 'merkez'), ('receiver_merkez_id', 'merkez')],
+    'messages_archive': [('sender_merkez_id', 'merkez'), ('receiver_merkez_id', 'merkez')],
+}
+
+def _replace_foreign_keys(ondelete: str | None) -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in FOREIGN_KEYS.items():
+        reflected = {fk['constrained_columns'][0]: fk['name'] for fk in inspector.get_foreign_keys(table)}
+        with op.batch_alter_table(table, naming_convention=NAMING) as batch_op:
+            for column, referred in columns:
+                name = f'fk_{table}_{column}_{referred}'
+                batch_op.drop_constraint(reflected.get(column) or name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+def upgrade() -> None:
+    op.add_column('merkez', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_merkez_deleted_at', 'merkez', ['deleted_at'], unique=False)
+    _replace_foreign_keys('CASCADE')
+
+def downgrade() -> None:
+    _replace_foreign_keys(None)
+    op.drop_index('ix_merkez_deleted_at', table_name='merkez')
+    op.drop_column('merkez', 'deleted_at')
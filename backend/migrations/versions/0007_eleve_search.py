@@ -0,0 +1,63 @@
+"""eleves: accent-insensitive search keys on prenom, nom and email
+
+Revision ID: 0007
+Revises: 0006
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.services.eleve_service.normalize as of this revision
+_SEPARATORS = re.compile(r"[\s\-'’]+")
+
+def _normalize(value, length):
+    if not value:
+        return None
+    value = "".join(c for c in unicodedata.normalize("NFKD", value) if not unicodedata.combining(c))
+    return _SEPARATORS.sub(" ", value.casefold()).strip()[:length]
+
+def upgrade() -> None:
+    op.add_column('eleves', sa.Column('search_prenom', sa.String(length=120), nullable=True))
+    op.add_column('eleves', sa.Column('search_nom', sa.String(length=120), nullable=True))
+    op.add_column('eleves', sa.Column('search_email', sa.String(length=255), nullable=True))
+
+    eleves = sa.table(
+        'eleves', sa.column('id', sa.Integer), sa.column('prenom', sa.String), sa.column('nom', sa.String), sa.column('email', sa.String),
+        sa.column('search_prenom', sa.String), sa.column('search_nom', sa.String), sa.column('search_email', sa.String),
+    )
+    bind = op.get_bind()
+    last = 0
+    while True:
+        rows = bind.execute(
+            sa.select(eleves.c.id, eleves.c.prenom, eleves.c.nom, eleves.c.email).where(eleves.c.id > last).order_by(eleves.c.id).limit(5000)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            eleves.update().where(eleves.c.id == sa.bindparam('eleve_id')),
+            [
+                {'eleve_id': r.id, 'search_prenom': _normalize(r.prenom, 120), 'search_nom': _normalize(r.nom, 120), 'search_email': _normalize(r.email, 255)}
+                for r in rows
+            ],
+        )
+        last = rows[-1].id
+
+    op.create_index('ix_eleves_merkez_search_email', 'eleves', ['merkez_id', 'search_email'], unique=False)
+    op.create_index('ix_eleves_merkez_search_nom', 'eleves', ['merkez_id', 'search_nom'], unique=False)
+    op.create_index('ix_eleves_merkez_search_prenom', 'eleves', ['merkez_id', 'search_prenom'], unique=False)
+
+def downgrade() -> None:
+    with op.batch_alter_table('eleves', schema=None) as batch_op:
+        batch_op.drop_index('ix_eleves_merkez_search_prenom')
+        batch_op.drop_index('ix_eleves_merkez_search_nom')
+        batch_op.drop_index('ix_eleves_merkez_search_email')
+        batch_op.drop_column('search_email')
+        batch_op.drop_column('search_nom')
+        batch_op.drop_column('search_prenom')
@@ -0,0 +1,33 @@
+"""messages: ids never reused once archived (SQLite AUTOINCREMENT)
+
+Revision ID: 0008
+Revises: 0007
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# A plain SQLite rowid restarts at max(id) + 1: after archival empties `messages`, new rows
+# would take ids already in `messages_archive`. The sequence starts past both tables.
+
+def _last_id(bind) -> int:
+    return max(bind.execute(sa.text(f'SELECT COALESCE(MAX(id), 0) FROM {table}')).scalar() for table in ('messages', 'messages_archive'))
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        with op.batch_alter_table('messages', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+        bind.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'messages'"))
+        bind.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES ('messages', :seq)"), {'seq': _last_id(bind)})
+    elif bind.dialect.name == 'mysql':
+        op.execute(f'ALTER TABLE messages AUTO_INCREMENT = {_last_id(bind) + 1}')
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('messages', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
@@ -0,0 +1,30 @@
+"""task_queue: at most one queued task per dedup_key, enforced by a unique index
+
+Revision ID: 0009
+Revises: 0008
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # duplicates left by racing enqueues: the oldest queued task of each key stays (derived
+    # table: MySQL cannot select from the table a DELETE targets)
+    op.execute(
+        "DELETE FROM task_queue WHERE status = 'queued' AND dedup_key IS NOT NULL AND id NOT IN ("
+        "SELECT id FROM (SELECT MIN(id) AS id FROM task_queue WHERE status = 'queued' AND dedup_key IS NOT NULL GROUP BY dedup_key) AS keep)"
+    )
+    op.add_column('task_queue', sa.Column(
+        'queued_dedup_key', sa.String(length=255), sa.Computed("CASE WHEN status = 'queued' THEN dedup_key END"), nullable=True
+    ))
+    op.create_index('uq_task_queue_queued_dedup', 'task_queue', ['queued_dedup_key'], unique=True)
+    op.drop_index('ix_task_queue_dedup_status', table_name='task_queue')
+
+def downgrade() -> None:
+    op.create_index('ix_task_queue_dedup_status', 'task_queue', ['dedup_key', 'status'], unique=False)
+    op.drop_index('uq_task_queue_queued_dedup', table_name='task_queue')
+    op.drop_column('task_queue', 'queued_dedup_key')
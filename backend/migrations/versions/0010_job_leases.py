@@ -0,0 +1,23 @@
+"""job_leases: one run of each periodic job per interval across processes
+
+Revision ID: 0010
+Revises: 0009
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('job_leases',
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('locked_by', sa.String(length=120), nullable=False),
+    sa.Column('locked_until', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+def downgrade() -> None:
+    op.drop_table('job_leases')
@@ -0,0 +1,23 @@
+"""merkez.owner_user_id nullable: a merkez waiting for its purge no longer holds its owner
+
+Revision ID: 0011
+Revises: 0010
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('merkez') as batch_op:
+        batch_op.alter_column('owner_user_id', existing_type=sa.Integer(), nullable=True)
+
+def downgrade() -> None:
+    pending = op.get_bind().execute(sa.text('SELECT COUNT(*) FROM merkez WHERE owner_user_id IS NULL')).scalar()
+    if pending:
+        raise RuntimeError(f'{pending} merkez are waiting for their purge: run the purge_merkez tasks first')
+    with op.batch_alter_table('merkez') as batch_op:
+        batch_op.alter_column('owner_user_id', existing_type=sa.Integer(), nullable=False)
@@ -5,7 +5,7 @@ Usage: python seed_data.py
 from app.database import SessionLocal
 from app.models.user import User
 from app.models.merkez import Merkez
-from app.core.security import get_password_hash
+from app.core.security import hash_password
 
 def seed_data():
     db = SessionLocal()
@@ -37,7 +37,6 @@ def seed_data():
                 "public_cible": "enfants",
                 "prix_min": 30,
                 "prix_max": 50,
-                "disponibilite_immediate": True,
                 "cursus": "Méthode Nourania, Tajwid, Mémorisation",
                 "adherer_credo_case": True,
                 "is_approved": True,
@@ -54,7 +53,6 @@ def seed_data():
                 "public_cible": "hommes",
                 "prix_min": 40,
                 "prix_max": 60,
-                "disponibilite_immediate": True,
                 "cursus": "Diplômé d'Al-Azhar",
                 "adherer_credo_case": True,
                 "is_approved": True,
@@ -71,7 +69,6 @@ def seed_data():
                 "public_cible": "ados",
                 "prix_min": 25,
                 "prix_max": 45,
-                "disponibilite_immediate": False,
                 "cursus": "Programme complet sur 3 ans",
                 "adherer_credo_case": True,
                 "is_approved": True,
@@ -82,7 +79,7 @@ def seed_data():
             # Créer l'utilisateur
             user = User(
                 email=user_data["email"],
-                hashed_password=get_password_hash(user_data["password"]),
+                hashed_password=hash_password(user_data["password"]),
                 is_active=True,
             )
             db.add(user)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from itertools import count
+
+import pytest
+
+# app.database builds its engine at import: point it at a throwaway SQLite file first
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tests.db"
+
+_ids = count(1)
+
+@pytest.fixture(scope="session")
+def schema():
+    from app.core.schema import init_schema
+
+    init_schema()
+
+@pytest.fixture
+def db(schema):
+    from app.database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
+
+@pytest.fixture
+def make_merkez(db):
+    from app.models.merkez import Merkez
+    from app.models.user import User
+
+    def make():
+        n = next(_ids)
+        owner = User(email=f"owner{n}@example.com", hashed_password="x")
+        db.add(owner)
+        db.flush()
+        row = Merkez(
+            owner_user_id=owner.id, nom=f"Merkez {n}", type_enseignement="coran", format_cours="individuel",
+            mode_enseignement="en_ligne", niveau="debutant", langue="francophone", public_cible="adultes",
+            adherer_credo_case=True, is_approved=True,
+        )
+        db.add(row)
+        db.commit()
+        return row
+    return make
+
+@pytest.fixture
+def merkez(make_merkez):
+    return make_merkez()
@@ -0,0 +1,104 @@
+CREATE TABLE users (
+	id INTEGER NOT NULL, 
+	email VARCHAR(255) NOT NULL, 
+	full_name VARCHAR(255), 
+	hashed_password VARCHAR(255) NOT NULL, 
+	is_active BOOLEAN NOT NULL, 
+	is_admin BOOLEAN NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE INDEX ix_users_id ON users (id);
+CREATE TABLE merkez (
+	id INTEGER NOT NULL, 
+	owner_user_id INTEGER NOT NULL, 
+	nom VARCHAR(255) NOT NULL, 
+	photo_url VARCHAR(500), 
+	bio TEXT, 
+	email_public VARCHAR(255), 
+	type_enseignement VARCHAR(255) NOT NULL, 
+	format_cours VARCHAR(255) NOT NULL, 
+	mode_enseignement VARCHAR(255) NOT NULL, 
+	niveau VARCHAR(255) NOT NULL, 
+	langue VARCHAR(255) NOT NULL, 
+	public_cible VARCHAR(255) NOT NULL, 
+	prix_min INTEGER NOT NULL, 
+	prix_max INTEGER NOT NULL, 
+	disponibilite_immediate BOOLEAN NOT NULL, 
+	cursus TEXT, 
+	livres_programmes TEXT, 
+	adherer_credo_case BOOLEAN NOT NULL, 
+	is_approved BOOLEAN NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	UNIQUE (owner_user_id), 
+	FOREIGN KEY(owner_user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_merkez_id ON merkez (id);
+CREATE TABLE eleves (
+	id INTEGER NOT NULL, 
+	merkez_id INTEGER NOT NULL, 
+	prenom VARCHAR(120) NOT NULL, 
+	nom VARCHAR(120) NOT NULL, 
+	email VARCHAR(255), 
+	niveau VARCHAR(120) NOT NULL, 
+	statut VARCHAR(120) NOT NULL, 
+	remarques TEXT, 
+	lien_visio VARCHAR(500), 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(merkez_id) REFERENCES merkez (id)
+);
+CREATE INDEX ix_eleves_merkez_id ON eleves (merkez_id);
+CREATE INDEX ix_eleves_id ON eleves (id);
+CREATE TABLE abonnements (
+	id INTEGER NOT NULL, 
+	merkez_id INTEGER NOT NULL, 
+	plan_name VARCHAR(120) NOT NULL, 
+	start_date DATE NOT NULL, 
+	end_date DATE, 
+	is_active BOOLEAN NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(merkez_id) REFERENCES merkez (id)
+);
+CREATE INDEX ix_abonnements_id ON abonnements (id);
+CREATE INDEX ix_abonnements_merkez_id ON abonnements (merkez_id);
+CREATE TABLE messages (
+	id INTEGER NOT NULL, 
+	sender_merkez_id INTEGER NOT NULL, 
+	receiver_merkez_id INTEGER NOT NULL, 
+	content TEXT NOT NULL, 
+	is_read BOOLEAN NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(sender_merkez_id) REFERENCES merkez (id), 
+	FOREIGN KEY(receiver_merkez_id) REFERENCES merkez (id)
+);
+CREATE INDEX ix_messages_id ON messages (id);
+CREATE INDEX ix_messages_sender_merkez_id ON messages (sender_merkez_id);
+CREATE INDEX ix_messages_receiver_merkez_id ON messages (receiver_merkez_id);
+CREATE TABLE plannings (
+	id INTEGER NOT NULL, 
+	merkez_id INTEGER NOT NULL, 
+	eleve_id INTEGER, 
+	title VARCHAR(255) NOT NULL, 
+	description TEXT, 
+	start_at DATETIME NOT NULL, 
+	end_at DATETIME NOT NULL, 
+	duration_minutes INTEGER NOT NULL, 
+	is_available_slot BOOLEAN NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	updated_at DATETIME NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(merkez_id) REFERENCES merkez (id), 
+	FOREIGN KEY(eleve_id) REFERENCES eleves (id)
+);
+CREATE INDEX ix_plannings_eleve_id ON plannings (eleve_id);
+CREATE INDEX ix_plannings_merkez_id ON plannings (merkez_id);
+CREATE INDEX ix_plannings_id ON plannings (id);
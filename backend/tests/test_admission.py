@@ -0,0 +1,27 @@
+"""Admission control: slots handed to a waiter that goes away are not lost."""
+import asyncio
+
+from app.core.admission import RouteGroup
+
+def test_cancelled_waiter_gives_its_slot_back():
+    async def scenario():
+        group = RouteGroup("dashboard", limit=1, max_queue=10, queue_timeout=5)
+        await group.acquire()
+        cancelled = asyncio.ensure_future(group.acquire())
+        next_in_line = asyncio.ensure_future(group.acquire())
+        await asyncio.sleep(0)
+        group.release(1.0)  # hands the slot to the first waiter...
+        cancelled.cancel()  # ...whose client disconnects before it runs
+        try:
+            await cancelled
+        except asyncio.CancelledError:
+            pass
+        else:
+            # before 3.12 wait_for returns the result despite the cancel: the request runs
+            group.release(1.0)
+        await asyncio.wait_for(next_in_line, 1)
+        assert group.in_flight == 1
+        group.release(1.0)
+        assert group.in_flight == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+"""Availability refresh tasks are queued in the planning write's transaction; a new slot only
+drops the cached pages filtered on availability."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.cache import cache
+from app.models.planning import Planning
+from app.models.queued_task import QueuedTask
+from app.services import availability_service
+from app.services.merkez_service import PUBLIC_MERKEZ, PUBLIC_MERKEZ_AVAILABLE, list_public_merkez_filtered
+from app.services.planning_service import create_planning, delete_planning, update_planning
+
+def _slot(db, merkez):
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    return create_planning(db, {
+        "merkez_id": merkez.id, "title": "Créneau", "start_at": start, "end_at": start + timedelta(hours=1),
+        "duration_minutes": 60, "is_available_slot": True,
+    })
+
+def _queued(db, merkez):
+    return db.scalar(select(QueuedTask.id).where(QueuedTask.dedup_key == f"availability:{merkez.id}", QueuedTask.status == "queued"))
+
+def test_update_queues_refresh_with_the_write(db, merkez):
+    planning = _slot(db, merkez)
+    update_planning(db, planning, {"is_available_slot": False})
+    db.expire_all()
+    assert db.get(Planning, planning.id).is_available_slot is False
+    assert _queued(db, merkez) is not None
+
+def test_failed_enqueue_rolls_back_the_write(db, merkez, monkeypatch):
+    planning = _slot(db, merkez)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr(availability_service, "enqueue", fail)
+    with pytest.raises(RuntimeError):
+        delete_planning(db, planning)
+    db.expire_all()
+    assert db.get(Planning, planning.id) is not None
+    assert _queued(db, merkez) is None
+
+def test_new_slot_keeps_the_unfiltered_pages(db, merkez):
+    assert merkez.id in [m.id for m in list_public_merkez_filtered(db)]
+    versions = cache._version(PUBLIC_MERKEZ), cache._version(PUBLIC_MERKEZ_AVAILABLE)
+    _slot(db, merkez)
+    assert cache._version(PUBLIC_MERKEZ) == versions[0]
+    assert cache._version(PUBLIC_MERKEZ_AVAILABLE) > versions[1]
+    # the page keeps its ids, the row comes from the dropped profile entry
+    db.expire_all()
+    listed = {m.id: m for m in list_public_merkez_filtered(db)}
+    assert listed[merkez.id].disponibilite_immediate is True
+    assert merkez.id in [m.id for m in list_public_merkez_filtered(db, disponibilite_immediate=True)]
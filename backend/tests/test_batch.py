@@ -0,0 +1,25 @@
+"""Batch updates change the fields the operation sets, nothing else."""
+import pytest
+
+from app.schemas.batch import BatchOperation
+from app.services.batch_service import BatchError, run_batch
+from app.services.eleve_service import create_eleve, get_eleve
+
+def _eleve(db, merkez):
+    return create_eleve(db, {
+        "merkez_id": merkez.id, "prenom": "Yusuf", "nom": "Karim", "email": "yusuf@example.com",
+        "niveau": "debutant", "statut": "individuel", "remarques": "à revoir",
+    })
+
+def test_update_sets_only_given_fields_and_null_clears(db, merkez):
+    eleve = _eleve(db, merkez)
+    run_batch(db, [BatchOperation(entity="eleve", action="update", id=eleve.id, data={"remarques": None, "niveau": "avance"})])
+    db.expire_all()
+    updated = get_eleve(db, eleve.id)
+    assert (updated.remarques, updated.niveau, updated.email) == (None, "avance", "yusuf@example.com")
+
+def test_null_on_required_field_is_rejected(db, merkez):
+    eleve = _eleve(db, merkez)
+    with pytest.raises(BatchError) as exc:
+        run_batch(db, [BatchOperation(entity="eleve", action="update", id=eleve.id, data={"nom": None})])
+    assert (exc.value.index, exc.value.status_code) == (0, 422)
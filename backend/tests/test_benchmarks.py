@@ -0,0 +1,13 @@
+"""The query-shape checks in benchmarks/, each in its own process (they build their own database)."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+@pytest.mark.parametrize("module", ["benchmarks.statement_counts", "benchmarks.explain_plans"])
+def test_benchmark_passes(module):
+    proc = subprocess.run([sys.executable, "-m", module], cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
@@ -0,0 +1,25 @@
+"""Cache fills come from the primary; a per-process cache is refused with several workers."""
+import pytest
+from sqlalchemy import create_engine
+
+from app.core import cache as cache_module
+from app.core.config import settings
+from app.database import SessionLocal, engine, from_primary, replicas
+
+def test_fill_reads_from_the_primary(monkeypatch):
+    replica = create_engine("sqlite://")
+    monkeypatch.setattr(replicas, "pick", lambda: replica)
+    with SessionLocal() as db:
+        db.info["read_only"] = True
+        assert from_primary(db, db.get_bind)() is engine
+        assert db.get_bind() is replica  # the rest of the request still reads from the replica
+    replica.dispose()
+
+def test_memory_backend_needs_one_worker(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(settings, "CACHE_SQLITE_PATH", "")
+    with pytest.raises(ValueError):
+        cache_module._build()
+    monkeypatch.setattr(settings, "CACHE_SQLITE_PATH", str(tmp_path / "cache.db"))
+    assert isinstance(cache_module._build().backend, cache_module.SQLiteBackend)
@@ -0,0 +1,22 @@
+"""Eleve search pages: one row per eleve, full pages, best match first."""
+from app.services.eleve_service import create_eleve, normalize, search_eleves
+
+def test_pages_are_full_and_distinct(db, merkez):
+    # "Ali" matches prenom and nom of most rows, and the email of some
+    names = [("Ali", "Alioui"), ("Alice", "Ben Ali"), ("Karim", "Ali"), ("Ali", "Ali"), ("Sara", "Benali"), ("Alia", "Diallo")]
+    for i in range(30):
+        prenom, nom = names[i % len(names)]
+        create_eleve(db, {
+            "merkez_id": merkez.id, "prenom": prenom, "nom": nom, "niveau": "debutant", "statut": "individuel",
+            "email": f"ali{i}@example.com" if i % 3 == 0 else f"x{i}@example.com",
+        })
+
+    def best(eleve):
+        keys = [("0", normalize(eleve.prenom)), ("0", normalize(eleve.nom)), ("1", normalize(eleve.email))]
+        return min(rank + key for rank, key in keys if key.startswith("ali")), eleve.id
+
+    everything = search_eleves(db, merkez.id, "ali", limit=1000)
+    assert [e.id for e in everything] == [e.id for e in sorted(everything, key=best)]
+    pages = [search_eleves(db, merkez.id, "ali", skip=skip, limit=4) for skip in range(0, len(everything), 4)]
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert [e.id for page in pages for e in page] == [e.id for e in everything]
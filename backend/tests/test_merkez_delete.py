@@ -0,0 +1,42 @@
+"""A merkez whose purge is deferred is hidden at once and frees its owner."""
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.services.abonnement_service import list_abonnements
+from app.services.eleve_service import create_eleve, list_eleves, search_eleves
+from app.services.merkez_purge_service import purge_merkez
+from app.services.merkez_service import create_merkez, delete_merkez
+from app.services.messages_service import create_message, list_conversation, list_messages_for_merkez
+from app.services.planning_service import create_planning, list_plannings
+
+def test_deferred_delete_hides_children_and_frees_owner(db, make_merkez, monkeypatch):
+    monkeypatch.setattr(settings, "GROUP_COMMIT", False)
+    monkeypatch.setattr(settings, "MERKEZ_DELETE_SYNC_MAX_ROWS", 0)
+    gone, other = make_merkez(), make_merkez()
+    eleve = create_eleve(db, {"merkez_id": gone.id, "prenom": "Amine", "nom": "Haddad", "niveau": "debutant", "statut": "individuel"})
+    start = datetime.utcnow() + timedelta(days=1)
+    create_planning(db, {
+        "merkez_id": gone.id, "eleve_id": eleve.id, "title": "Cours", "start_at": start, "end_at": start + timedelta(hours=1),
+        "duration_minutes": 60, "is_available_slot": False,
+    })
+    create_message(db, {"sender_merkez_id": gone.id, "receiver_merkez_id": other.id, "content": "salam"})
+    create_message(db, {"sender_merkez_id": other.id, "receiver_merkez_id": other.id, "content": "note"})
+    owner_id = gone.owner_user_id
+
+    assert delete_merkez(db, gone) is True
+
+    assert list_eleves(db, merkez_id=gone.id) == [] and eleve.id not in [e.id for e in list_eleves(db)]
+    assert search_eleves(db, gone.id, "ami") == []
+    assert list_plannings(db, merkez_id=gone.id) == [] and list_plannings(db, eleve_id=eleve.id) == []
+    assert list_abonnements(db, merkez_id=gone.id) == []
+    assert [m.content for m in list_messages_for_merkez(db, other.id)] == ["note"]
+    assert list_conversation(db, gone.id, other.id) == []
+
+    # the owner account can open a new merkez before the purge runs
+    replacement = create_merkez(db, {
+        "owner_user_id": owner_id, "nom": "Nouveau", "type_enseignement": "coran", "format_cours": "individuel",
+        "mode_enseignement": "en_ligne", "niveau": "debutant", "langue": "francophone", "public_cible": "adultes",
+        "adherer_credo_case": True,
+    })
+    assert replacement.owner_user_id == owner_id
+    assert purge_merkez(db, gone.id) is True
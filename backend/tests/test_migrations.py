@@ -0,0 +1,74 @@
+"""Upgrading databases created with create_all before migrations existed."""
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.schema import SCHEMA_REVISION, current_revision, init_schema
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: (
+            sorted(column["name"] for column in inspector.get_columns(table)),
+            sorted(index["name"] for index in inspector.get_indexes(table)),
+        )
+        for table in inspector.get_table_names()
+    }
+
+@pytest.fixture
+def head_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/head.db")
+    init_schema(engine)
+    yield _schema(engine)
+    engine.dispose()
+
+def _legacy_database(path: Path, fixture: str) -> None:
+    # Built with the DDL create_all emitted at that time, outside SQLAlchemy
+    conn = sqlite3.connect(path)
+    conn.executescript((FIXTURES / fixture).read_text())
+    now = datetime.utcnow()
+    conn.execute(
+        "INSERT INTO users (id, email, hashed_password, is_active, is_admin, created_at)"
+        " VALUES (1, 'a@example.com', 'x', 1, 0, ?)", (now,),
+    )
+    conn.execute(
+        "INSERT INTO merkez (id, owner_user_id, nom, type_enseignement, format_cours, mode_enseignement,"
+        " niveau, langue, public_cible, prix_min, prix_max, disponibilite_immediate, adherer_credo_case,"
+        " is_approved, created_at, updated_at)"
+        " VALUES (1, 1, 'Merkez', 'coran', 'individuel', 'en_ligne', 'debutant', 'francophone', 'adultes',"
+        " 10, 20, 0, 1, 1, ?, ?)", (now, now),
+    )
+    conn.execute(
+        "INSERT INTO plannings (merkez_id, title, start_at, end_at, duration_minutes, is_available_slot,"
+        " created_at, updated_at) VALUES (1, 'Créneau', ?, ?, 60, 1, ?, ?)",
+        (now + timedelta(days=1), now + timedelta(days=1, hours=1), now, now),
+    )
+    conn.execute(
+        "INSERT INTO messages (sender_merkez_id, receiver_merkez_id, content, is_read, created_at, updated_at)"
+        " VALUES (1, 1, 'salam', 0, ?, ?)", (now, now),
+    )
+    conn.commit()
+    conn.close()
+
+@pytest.mark.parametrize("fixture", ["schema_baseline.sql", "schema_version_4.sql"])
+def test_init_schema_upgrades_pre_migration_database(tmp_path, head_schema, fixture):
+    path = tmp_path / "legacy.db"
+    _legacy_database(path, fixture)
+    engine = create_engine(f"sqlite:///{path}")
+
+    init_schema(engine)
+
+    assert current_revision(engine) == SCHEMA_REVISION
+    assert _schema(engine) == head_schema
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM messages")).scalar() == 1
+        merkez = conn.execute(text("SELECT next_available_at, disponibilite_immediate FROM merkez")).one()
+    if fixture == "schema_baseline.sql":
+        # the column is new: computed from the upcoming slot
+        assert merkez.next_available_at is not None and merkez.disponibilite_immediate
+    engine.dispose()
@@ -0,0 +1,39 @@
+"""Plannings: calendar windows ([start, end)) and the names on write responses."""
+import random
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.services.eleve_service import create_eleve
+from app.services.planning_service import create_planning, list_plannings
+from benchmarks.scenarios import Dataset, calendar_week
+
+def test_week_window(db, merkez):
+    monday = datetime(2026, 3, 2)
+    for day in (-1, 0, 3, 7):
+        start = monday + timedelta(days=day, hours=9)
+        create_planning(db, {
+            "merkez_id": merkez.id, "title": f"Cours {day}", "start_at": start, "end_at": start + timedelta(hours=1),
+            "duration_minutes": 60, "is_available_slot": False,
+        })
+    week = list_plannings(db, merkez_id=merkez.id, start=monday, end=monday + timedelta(weeks=1))
+    assert [p.title for p in week] == ["Cours 3", "Cours 0"]
+
+def test_calendar_week_scenario_asks_for_one_week():
+    params = calendar_week(random.Random(1), Dataset(merkez=10, eleves=10)).params
+    start, end = datetime.fromisoformat(params["start"]), datetime.fromisoformat(params["end"])
+    assert end - start == timedelta(weeks=1) and start.weekday() == 0
+
+def test_write_responses_carry_names(db, merkez):
+    eleve = create_eleve(db, {"merkez_id": merkez.id, "prenom": "Ali", "nom": "Haddad", "niveau": "debutant", "statut": "groupe"})
+    client = TestClient(create_app())
+    planning = client.post("/api/plannings", json={
+        "merkez_id": merkez.id, "eleve_id": eleve.id, "title": "Tajwid",
+        "start_at": "2030-01-01T10:00:00", "end_at": "2030-01-01T11:00:00",
+    }).json()
+    assert planning["eleve_nom"] == "Ali Haddad"
+    assert client.patch(f"/api/plannings/{planning['id']}", json={"title": "Tajwid avancé"}).json()["eleve_nom"] == "Ali Haddad"
+    message = client.post("/api/messages", json={"sender_merkez_id": merkez.id, "receiver_merkez_id": merkez.id, "content": "Salam"}).json()
+    assert message["sender_nom"] == message["receiver_nom"] == merkez.nom
+    assert client.patch(f"/api/messages/{message['id']}/read").json()["sender_nom"] == merkez.nom
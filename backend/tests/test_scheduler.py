@@ -0,0 +1,30 @@
+"""Periodic jobs: one run per interval across processes."""
+from sqlalchemy import delete
+
+from app.core.scheduler import Scheduler
+from app.models.job_lease import JobLease
+
+def _job():
+    return "ran"
+
+def test_register_twice_keeps_one_job():
+    scheduler = Scheduler()
+    scheduler.every(60, _job)
+    scheduler.every(30, _job)
+    assert [(job.name, job.interval) for job in scheduler.jobs] == [("_job", 30)]
+
+def test_one_process_wins_the_lease(db):
+    db.execute(delete(JobLease))
+    db.commit()
+    first, second = Scheduler(), Scheduler()
+    second.worker_id = "other-host:1"
+    for scheduler in (first, second):
+        scheduler.every(60, _job)
+
+    assert first._lease(first.jobs[0])
+    assert not second._lease(second.jobs[0])
+    assert not first._lease(first.jobs[0])  # held until the next interval
+
+    db.execute(JobLease.__table__.update().values(locked_until=JobLease.locked_until.op("-")(3600)))
+    db.commit()
+    assert second._lease(second.jobs[0])  # expired: taken over
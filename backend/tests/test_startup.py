@@ -0,0 +1,28 @@
+"""Cold start: import/first-request budgets and the schema check in lifespan."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.core.schema import SchemaOutOfDate, init_schema, require_schema
+from benchmarks import startup
+
+def test_startup_budgets(capsys):
+    assert startup.main([]) == 0, capsys.readouterr().out
+
+def test_require_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/schema.db")
+    with pytest.raises(SchemaOutOfDate):
+        require_schema(engine)
+    init_schema(engine)
+    require_schema(engine)
+    engine.dispose()
+
+def test_lifespan_refuses_outdated_schema(monkeypatch):
+    from app.main import create_app
+
+    monkeypatch.setattr(settings, "AUTO_CREATE_SCHEMA", False)
+    monkeypatch.setattr("app.core.schema.SCHEMA_REVISION", "9999")
+    with pytest.raises(SchemaOutOfDate):
+        with TestClient(create_app()):
+            pass